@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+Bench commands for Hotel Management
+Usage: bench --site [site] rebuild-hotel-kpis [--from-date YYYY-MM-DD] [--to-date YYYY-MM-DD]
+"""
+
+import click
+from frappe.commands import get_site, pass_context
+
+
+@click.command("rebuild-hotel-kpis")
+@click.option("--from-date", help="First date to rebuild (default: first stay on record)")
+@click.option("--to-date", help="Last date to rebuild (default: today + horizon)")
+@pass_context
+def rebuild_hotel_kpis(context, from_date=None, to_date=None):
+    """Rebuild the Hotel Daily KPI table from reservations"""
+    import frappe
+    from hotel_management.hotel_management.doctype.hotel_daily_kpi.hotel_daily_kpi import rebuild_kpis
+
+    site = get_site(context)
+    frappe.init(site=site)
+    frappe.connect()
+    try:
+        rows = rebuild_kpis(from_date, to_date)
+        frappe.db.commit()
+        click.echo(f"Rebuilt {rows} Hotel Daily KPI rows")
+    finally:
+        frappe.destroy()
+
+
+commands = [rebuild_hotel_kpis]
@@ -25,7 +25,132 @@ fixtures = [
 # Document Events - Trigger functions on document actions
 doc_events = {
 	"Reservation": {
-		"on_update_after_submit": "hotel_management.hotel_management.doctype.guest.guest.update_guest_statistics"
+		"on_update": [
+			"hotel_management.hotel_management.doctype.calendar_tombstone.calendar_tombstone.record_reservation_tombstones"
+		],
+		"on_trash": [
+			"hotel_management.hotel_management.doctype.calendar_tombstone.calendar_tombstone.record_reservation_tombstones"
+		],
+		"on_update_after_submit": [
+			"hotel_management.hotel_management.doctype.property_unit.property_unit.clear_reservation_unit_stats",
+			"hotel_management.hotel_management.doctype.property_unit.property_unit.update_reservation_unit_pointers",
+			"hotel_management.hotel_management.doctype.calendar_tombstone.calendar_tombstone.record_reservation_tombstones",
+			"hotel_management.hotel_management.doctype.guest.guest.update_guest_statistics",
+			"hotel_management.hotel_management.doctype.hotel_daily_kpi.hotel_daily_kpi.update_kpis_for_reservation",
+			"hotel_management.hotel_management.report_cache.on_reservation_change",
+			"hotel_management.hotel_management.dashboard_api.on_dashboard_doc_change",
+			"hotel_management.hotel_management.realtime.publish_doc_change",
+			"hotel_management.hotel_management.availability_heatmap.on_heatmap_doc_change"
+		],
+		"on_submit": [
+			"hotel_management.hotel_management.doctype.property_unit.property_unit.clear_reservation_unit_stats",
+			"hotel_management.hotel_management.doctype.property_unit.property_unit.update_reservation_unit_pointers",
+			"hotel_management.hotel_management.doctype.hotel_daily_kpi.hotel_daily_kpi.update_kpis_for_reservation",
+			"hotel_management.hotel_management.report_cache.on_reservation_change",
+			"hotel_management.hotel_management.dashboard_api.on_dashboard_doc_change",
+			"hotel_management.hotel_management.realtime.publish_doc_change",
+			"hotel_management.hotel_management.live_counters.on_reservation_transition",
+			"hotel_management.hotel_management.availability_heatmap.on_heatmap_doc_change"
+		],
+		"on_cancel": [
+			"hotel_management.hotel_management.doctype.property_unit.property_unit.clear_reservation_unit_stats",
+			"hotel_management.hotel_management.doctype.property_unit.property_unit.update_reservation_unit_pointers",
+			"hotel_management.hotel_management.doctype.calendar_tombstone.calendar_tombstone.record_reservation_tombstones",
+			"hotel_management.hotel_management.waitlist_matcher.queue_waitlist_matching",
+			"hotel_management.hotel_management.doctype.hotel_daily_kpi.hotel_daily_kpi.update_kpis_for_reservation",
+			"hotel_management.hotel_management.report_cache.on_reservation_change",
+			"hotel_management.hotel_management.dashboard_api.on_dashboard_doc_change",
+			"hotel_management.hotel_management.realtime.publish_doc_change",
+			"hotel_management.hotel_management.live_counters.on_reservation_transition",
+			"hotel_management.hotel_management.availability_heatmap.on_heatmap_doc_change"
+		],
+		# Custom event raised by Reservation.change_status (check-in / check-out)
+		"on_status_change": [
+			"hotel_management.hotel_management.doctype.property_unit.property_unit.clear_reservation_unit_stats",
+			"hotel_management.hotel_management.doctype.property_unit.property_unit.update_reservation_unit_pointers",
+			"hotel_management.hotel_management.doctype.hotel_daily_kpi.hotel_daily_kpi.update_kpis_for_reservation",
+			"hotel_management.hotel_management.report_cache.on_reservation_change",
+			"hotel_management.hotel_management.dashboard_api.on_dashboard_doc_change",
+			"hotel_management.hotel_management.realtime.publish_doc_change",
+			"hotel_management.hotel_management.live_counters.on_reservation_transition",
+			"hotel_management.hotel_management.availability_heatmap.on_heatmap_doc_change"
+		]
+	},
+	"Owner Settlement": {
+		"on_update": [
+			"hotel_management.hotel_management.dashboard_api.on_dashboard_doc_change"
+		],
+		"on_trash": [
+			"hotel_management.hotel_management.dashboard_api.on_dashboard_doc_change"
+		],
+		"on_submit": [
+			"hotel_management.hotel_management.report_cache.on_settlement_change",
+			"hotel_management.hotel_management.dashboard_api.on_dashboard_doc_change"
+		],
+		"on_cancel": [
+			"hotel_management.hotel_management.report_cache.on_settlement_change",
+			"hotel_management.hotel_management.dashboard_api.on_dashboard_doc_change"
+		],
+		"on_update_after_submit": [
+			"hotel_management.hotel_management.report_cache.on_settlement_change",
+			"hotel_management.hotel_management.dashboard_api.on_dashboard_doc_change"
+		]
+	},
+	"Housekeeping Task": {
+		"on_update": [
+			"hotel_management.hotel_management.dashboard_api.on_dashboard_doc_change",
+			"hotel_management.hotel_management.realtime.publish_doc_change",
+			"hotel_management.hotel_management.live_counters.on_doc_transition"
+		],
+		"on_trash": [
+			"hotel_management.hotel_management.dashboard_api.on_dashboard_doc_change",
+			"hotel_management.hotel_management.realtime.publish_doc_change",
+			"hotel_management.hotel_management.live_counters.on_doc_transition"
+		]
+	},
+	"Maintenance Request": {
+		"on_update": [
+			"hotel_management.hotel_management.report_cache.on_maintenance_change",
+			"hotel_management.hotel_management.dashboard_api.on_dashboard_doc_change",
+			"hotel_management.hotel_management.realtime.publish_doc_change",
+			"hotel_management.hotel_management.live_counters.on_doc_transition"
+		],
+		"on_trash": [
+			"hotel_management.hotel_management.report_cache.on_maintenance_change",
+			"hotel_management.hotel_management.dashboard_api.on_dashboard_doc_change",
+			"hotel_management.hotel_management.realtime.publish_doc_change",
+			"hotel_management.hotel_management.live_counters.on_doc_transition"
+		]
+	},
+	"Property Unit": {
+		"on_update": [
+			"hotel_management.hotel_management.unit_status.log_form_status_change",
+			"hotel_management.hotel_management.doctype.hotel_daily_kpi.hotel_daily_kpi.update_rooms_available",
+			"hotel_management.hotel_management.dashboard_api.on_dashboard_doc_change",
+			"hotel_management.hotel_management.realtime.publish_doc_change",
+			"hotel_management.hotel_management.live_counters.on_doc_transition",
+			"hotel_management.hotel_management.availability_heatmap.on_heatmap_doc_change"
+		],
+		"after_delete": [
+			"hotel_management.hotel_management.doctype.hotel_daily_kpi.hotel_daily_kpi.update_rooms_available",
+			"hotel_management.hotel_management.dashboard_api.on_dashboard_doc_change",
+			"hotel_management.hotel_management.realtime.publish_doc_change",
+			"hotel_management.hotel_management.live_counters.on_doc_transition",
+			"hotel_management.hotel_management.availability_heatmap.on_heatmap_doc_change"
+		]
+	},
+	"Rate Plan": {
+		"on_update": [
+			"hotel_management.hotel_management.availability_heatmap.on_heatmap_doc_change"
+		],
+		"on_trash": [
+			"hotel_management.hotel_management.availability_heatmap.on_heatmap_doc_change"
+		]
+	},
+	"Unit Type": {
+		"on_update": [
+			"hotel_management.hotel_management.availability_heatmap.on_heatmap_doc_change"
+		]
 	}
 }
 
@@ -38,9 +163,16 @@ scheduler_events = {
 		]
 	},
 	
+	# Correct drift in unit statuses and the live dashboard counters
+	"hourly": [
+		"hotel_management.hotel_management.unit_status.reconcile_unit_statuses",
+		"hotel_management.hotel_management.live_counters.reconcile_counters"
+	],
+	
 	# Alternative: Run daily check (more flexible)
 	"daily": [
-		"hotel_management.hotel_management.doctype.owner_settlement.owner_settlement.check_and_generate_settlements"
+		"hotel_management.hotel_management.doctype.owner_settlement.owner_settlement.check_and_generate_settlements",
+		"hotel_management.hotel_management.night_audit.run_night_audit"
 	]
 }
 
@@ -65,6 +197,7 @@ after_install = "hotel_management.install.after_install"
 # App JS
 # ------
 app_include_js = [
+    "/assets/hotel_management/js/compact_format.js",
     # "/assets/hotel_management/js/dashboard_widgets.js"
 	# إضافة الملفات الجديدة
     # "/assets/hotel_management/js/reservation_enhanced.js",
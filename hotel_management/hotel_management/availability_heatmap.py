@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""
+Availability Heatmap
+Remaining inventory and current price per property x unit type x night, a year ahead
+Path: hotel_management/hotel_management/availability_heatmap.py
+
+Per property, built with NumPy from:
+    - one inventory aggregate: sellable units per type (not in Maintenance),
+      and the stays booked on them grouped by
+      (unit type, check-in, check-out) -> difference array -> cumulative sum
+    - the compiled rate calendar (rate_plan.compile_rate_calendar), nights
+      without a plan at the unit type's default rate
+
+Payload (dense, unit types x nights):
+    {"property", "start", "days", "unit_types": [...], "capacity": [...],
+     "remaining": [[...], ...], "price": [[...], ...]}
+
+The HEATMAP_DAYS view from today is cached per property and dropped by
+booking, rate plan, unit and unit type events; other windows inside it are
+sliced from the cached view.
+"""
+
+import frappe
+import numpy as np
+from frappe import _
+from frappe.utils import add_days, cint, flt, getdate, now_datetime, today
+
+HEATMAP_DAYS = 365
+HEATMAP_KEY = "hotel_availability_heatmap"
+HEATMAP_TTL = 6 * 60 * 60
+
+
+# ========================================
+# Build
+# ========================================
+
+def build_heatmap(property, start, days):
+    from hotel_management.hotel_management.doctype.rate_plan.rate_plan import compile_rate_calendar
+
+    start = getdate(start)
+    unit_types = frappe.db.sql("""
+        SELECT pu.unit_type, COUNT(*) as units, ut.default_rate
+        FROM `tabProperty Unit` pu
+        LEFT JOIN `tabUnit Type` ut ON ut.name = pu.unit_type
+        WHERE pu.property = %s
+        AND pu.status != 'Maintenance'
+        GROUP BY pu.unit_type, ut.default_rate
+        ORDER BY pu.unit_type
+    """, property, as_dict=1)
+    names = [row.unit_type for row in unit_types]
+    index = {name: i for i, name in enumerate(names)}
+
+    booked = frappe.db.sql("""
+        SELECT pu.unit_type,
+            COALESCE(ru.check_in, r.check_in) as check_in,
+            COALESCE(ru.check_out, r.check_out) as check_out,
+            COUNT(*) as units
+        FROM `tabReservation Unit` ru
+        JOIN `tabReservation` r ON r.name = ru.parent
+        JOIN `tabProperty Unit` pu ON pu.name = ru.unit
+        WHERE pu.property = %(property)s
+        AND pu.status != 'Maintenance'
+        AND r.docstatus = 1
+        AND r.status IN ('Confirmed', 'Checked-In')
+        AND COALESCE(ru.check_in, r.check_in) < %(end)s
+        AND COALESCE(ru.check_out, r.check_out) > %(start)s
+        GROUP BY pu.unit_type, COALESCE(ru.check_in, r.check_in), COALESCE(ru.check_out, r.check_out)
+    """, {"property": property, "start": start, "end": add_days(start, days)}, as_dict=1)
+
+    # +units on the first night, -units on the check-out night
+    diff = np.zeros((len(names), days + 1), dtype=np.int64)
+    if booked:
+        rows = np.array([index[row.unit_type] for row in booked])
+        starts = np.clip([(getdate(row.check_in) - start).days for row in booked], 0, days)
+        ends = np.clip([(getdate(row.check_out) - start).days for row in booked], 0, days)
+        counts = np.array([cint(row.units) for row in booked])
+        np.add.at(diff, (rows, starts), counts)
+        np.add.at(diff, (rows, ends), -counts)
+
+    capacity = np.array([cint(row.units) for row in unit_types], dtype=np.int64)
+    remaining = capacity[:, None] - np.cumsum(diff[:, :days], axis=1)
+
+    calendar = compile_rate_calendar(property, names, start, days)
+    price = np.array([
+        np.where(np.isnan(calendar[row.unit_type]), flt(row.default_rate), calendar[row.unit_type])
+        for row in unit_types
+    ]).reshape(len(names), days)
+
+    return {
+        "property": property,
+        "start": str(start),
+        "days": days,
+        "unit_types": names,
+        "capacity": capacity.tolist(),
+        "remaining": remaining.tolist(),
+        "price": np.round(price, 2).tolist(),
+        "generated_at": str(now_datetime())
+    }
+
+
+def slice_heatmap(heatmap, start, days):
+    offset = (getdate(start) - getdate(heatmap["start"])).days
+    return dict(heatmap,
+        start=str(getdate(start)),
+        days=days,
+        remaining=[row[offset:offset + days] for row in heatmap["remaining"]],
+        price=[row[offset:offset + days] for row in heatmap["price"]])
+
+
+# ========================================
+# Cache
+# ========================================
+
+def get_heatmap_key(property):
+    return "{0}|{1}".format(HEATMAP_KEY, property)
+
+
+def get_property_heatmap(property, start=None, days=None):
+    """Cached year view from today; windows outside it are built directly"""
+    start = getdate(start or today())
+    days = cint(days) or HEATMAP_DAYS
+    offset = (start - getdate(today())).days
+    if offset < 0 or offset + days > HEATMAP_DAYS:
+        return build_heatmap(property, start, days)
+
+    cache = frappe.cache()
+    key = get_heatmap_key(property)
+    heatmap = cache.get_value(key)
+    if not heatmap or heatmap["start"] != today():
+        heatmap = build_heatmap(property, today(), HEATMAP_DAYS)
+        cache.set_value(key, heatmap, expires_in_sec=HEATMAP_TTL)
+
+    if offset == 0 and days == HEATMAP_DAYS:
+        return heatmap
+    return slice_heatmap(heatmap, start, days)
+
+
+def invalidate_heatmap(properties=None):
+    """Drop the cached heatmaps of the given properties (all when None)"""
+    cache = frappe.cache()
+    if properties is None:
+        cache.delete_keys(HEATMAP_KEY + "|")
+        return
+
+    for property in properties:
+        if property:
+            cache.delete_value(get_heatmap_key(property))
+
+
+def queue_heatmap_invalidation(properties=None):
+    """Drop the heatmaps once the change commits - a read before then would re-cache old data"""
+    pending = frappe.flags.hotel_heatmap_stale
+    if pending is None:
+        pending = frappe.flags.hotel_heatmap_stale = set()
+        frappe.db.after_commit.add(flush_heatmap_invalidation)
+        frappe.db.after_rollback.add(discard_heatmap_invalidation)
+
+    if properties is None:
+        pending.add(None)
+    else:
+        pending.update(property for property in properties if property)
+
+
+def flush_heatmap_invalidation():
+    pending = frappe.flags.hotel_heatmap_stale or set()
+    frappe.flags.hotel_heatmap_stale = None
+    invalidate_heatmap(None if None in pending else list(pending))
+
+
+def discard_heatmap_invalidation():
+    frappe.flags.hotel_heatmap_stale = None
+
+
+def on_heatmap_doc_change(doc, method=None):
+    """doc_event: bookings, rate plans, units (incl. in / out of Maintenance) and unit types"""
+    from hotel_management.hotel_management.dashboard_api import get_doc_properties
+
+    before = doc.get_doc_before_save() if method == "on_update" else None
+
+    if doc.doctype == "Unit Type":
+        # Default rates are shared by every property using the type
+        if not before or flt(before.default_rate) != flt(doc.default_rate):
+            queue_heatmap_invalidation()
+        return
+
+    if doc.doctype == "Rate Plan":
+        queue_heatmap_invalidation([doc.property, before.property if before else None])
+        return
+
+    if doc.doctype == "Property Unit" and method == "on_update":
+        if (before and before.property == doc.property and before.unit_type == doc.unit_type
+                and (before.status == "Maintenance") == (doc.status == "Maintenance")):
+            return
+        queue_heatmap_invalidation([doc.property, before.property if before else None])
+        return
+
+    queue_heatmap_invalidation(get_doc_properties(doc) or [])
+
+
+# ========================================
+# API
+# ========================================
+
+@frappe.whitelist()
+def get_availability_heatmap(property=None, start_date=None, days=None):
+    """
+    API: remaining units and price per unit type and night
+    One heatmap per property (all readable properties when none is given)
+    """
+    days = cint(days) or HEATMAP_DAYS
+    if days < 1 or days > HEATMAP_DAYS:
+        frappe.throw(_("Days must be between 1 and {0}").format(HEATMAP_DAYS))
+
+    if property:
+        frappe.has_permission("Property", "read", doc=property, throw=True)
+        properties = [property]
+    else:
+        properties = frappe.get_list("Property", pluck="name", order_by="name")
+
+    return {
+        "start": str(getdate(start_date or today())),
+        "days": days,
+        "properties": [get_property_heatmap(name, start_date, days) for name in properties]
+    }
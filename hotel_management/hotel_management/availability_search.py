@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+"""
+Flexible Dates Search
+"Any 3 nights next month?" - every feasible check-in in a window, for a range of stay lengths
+Path: hotel_management/hotel_management/availability_search.py
+
+Built once per call, for the unit type's units over the window:
+    busy[u, n]   1 when unit u is taken on night n (one stays query, plus
+                 nights held by open waitlist offers)
+    price[u, n]  plan rate for the night (compiled rate calendar), else the unit's rate
+
+With prefix sums along the nights, any stay [d, d + L) costs two lookups:
+    busy nights = B[:, d + L] - B[:, d]   -> the unit is free for the stay when 0
+    stay price  = P[:, d + L] - P[:, d]
+so every (check-in, length) pair is answered by a few array operations per
+length instead of one availability query per candidate window.
+"""
+
+import frappe
+import numpy as np
+from frappe import _
+from frappe.utils import add_days, cint, date_diff, flt, getdate
+
+FLEXIBLE_SEARCH_MAX_DAYS = 366
+FLEXIBLE_SEARCH_MAX_NIGHTS = 30
+
+RESULT_COLUMNS = ["check_in", "check_out", "nights", "free_units", "cheapest_total", "cheapest_per_night"]
+
+
+def get_unit_type_grid(property, unit_type, start, days):
+    """(units, busy, price) for the unit type's sellable units (not in Maintenance) over [start, start + days)"""
+    from hotel_management.hotel_management.doctype.rate_plan.rate_plan import compile_rate_calendar
+    from hotel_management.hotel_management.waitlist_matcher import get_held_stays
+
+    units = frappe.get_all("Property Unit",
+        filters={"property": property, "unit_type": unit_type, "status": ["!=", "Maintenance"]},
+        fields=["name", "rate_per_night"], order_by="name")
+    position = {unit.name: i for i, unit in enumerate(units)}
+    busy = np.zeros((len(units), days), dtype=bool)
+    if not units:
+        return units, busy, np.zeros((0, days))
+
+    stays = frappe.db.sql("""
+        SELECT ru.unit, COALESCE(ru.check_in, r.check_in) as check_in,
+            COALESCE(ru.check_out, r.check_out) as check_out
+        FROM `tabReservation Unit` ru
+        JOIN `tabReservation` r ON r.name = ru.parent
+        WHERE ru.unit IN %(units)s
+        AND r.docstatus = 1
+        AND r.status IN ('Confirmed', 'Checked-In')
+        AND COALESCE(ru.check_in, r.check_in) < %(end)s
+        AND COALESCE(ru.check_out, r.check_out) > %(start)s
+    """, {"units": list(position), "start": start, "end": add_days(start, days)}, as_dict=1)
+    stays += get_held_stays(list(position), start, add_days(start, days))
+
+    for stay in stays:
+        lo = max((getdate(stay.check_in) - start).days, 0)
+        hi = min((getdate(stay.check_out) - start).days, days)
+        busy[position[stay.unit], lo:hi] = True
+
+    default_rate = flt(frappe.db.get_value("Unit Type", unit_type, "default_rate"))
+    unit_rates = np.array([flt(unit.rate_per_night) or default_rate for unit in units])
+    plan_rates = compile_rate_calendar(property, [unit_type], start, days)[unit_type]
+
+    # A plan rate applies to every unit of the type; other nights use the unit's own rate
+    price = np.where(np.isnan(plan_rates)[None, :], unit_rates[:, None], plan_rates[None, :])
+    return units, busy, price
+
+
+def find_flexible_stays(busy, price, min_nights, max_nights):
+    """
+    Every (check-in offset, nights) with at least one unit free for the whole stay
+    -> list of (offset, nights, free_units, cheapest_total); stays end inside the grid
+    """
+    units, days = busy.shape
+    zeros = np.zeros((units, 1))
+    busy_sums = np.hstack((zeros, np.cumsum(busy, axis=1)))
+    price_sums = np.hstack((zeros, np.cumsum(price, axis=1)))
+
+    results = []
+    for nights in range(min_nights, min(max_nights, days) + 1):
+        free = (busy_sums[:, nights:] - busy_sums[:, :-nights]) == 0
+        totals = np.where(free, price_sums[:, nights:] - price_sums[:, :-nights], np.inf)
+
+        counts = free.sum(axis=0)
+        cheapest = totals.min(axis=0, initial=np.inf)
+        for offset in np.flatnonzero(counts):
+            results.append((int(offset), nights, int(counts[offset]), float(cheapest[offset])))
+
+    results.sort()
+    return results
+
+
+@frappe.whitelist()
+def search_flexible_dates(property, unit_type, window_start, window_end, min_nights, max_nights=None, format=None):
+    """
+    API: every check-in in the window with a stay of min_nights..max_nights that fits
+    before window_end, with the number of free units and the cheapest total.
+    format="compact" returns a compact table.
+    """
+    frappe.has_permission("Reservation", "read", throw=True)
+
+    start = getdate(window_start)
+    days = date_diff(window_end, start)
+    min_nights = cint(min_nights)
+    max_nights = cint(max_nights) or min_nights
+    if days <= 0:
+        frappe.throw(_("Window end must be after window start"))
+    if days > FLEXIBLE_SEARCH_MAX_DAYS:
+        frappe.throw(_("Search window cannot exceed {0} days").format(FLEXIBLE_SEARCH_MAX_DAYS))
+    if min_nights < 1 or max_nights < min_nights or max_nights > FLEXIBLE_SEARCH_MAX_NIGHTS:
+        frappe.throw(_("Length of stay must be between 1 and {0} nights").format(FLEXIBLE_SEARCH_MAX_NIGHTS))
+
+    _units, busy, price = get_unit_type_grid(property, unit_type, start, days)
+    results = [{
+        "check_in": str(add_days(start, offset)),
+        "check_out": str(add_days(start, offset + nights)),
+        "nights": nights,
+        "free_units": free_units,
+        "cheapest_total": round(total, 2),
+        "cheapest_per_night": round(total / nights, 2)
+    } for offset, nights, free_units, total in find_flexible_stays(busy, price, min_nights, max_nights)]
+
+    from hotel_management.hotel_management.compact_format import encode_table, is_compact
+    if is_compact(format):
+        return encode_table(results, RESULT_COLUMNS)
+
+    return results
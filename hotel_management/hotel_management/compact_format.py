@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+"""
+Compact Response Format
+Opt-in columnar encoding for list-heavy API responses (format="compact")
+Path: hotel_management/hotel_management/compact_format.py
+
+Table:
+    {"format": "compact", "columns": [...], "rows": [[...], ...],
+     "dicts": {"status": ["Confirmed", ...]}}
+    Columns listed in "dicts" hold an index into that list instead of the string.
+
+Runs (per-day series):
+    [[value, length], ...] - e.g. [[-1, 3], [0, 4]] = 3 free days, then 4 days of row 0
+    encode_row_runs() does the same for every row of a 2-D NumPy array
+
+Decoder: public/js/compact_format.js (hotel_management.compact.decode_table / expand_runs)
+"""
+
+import json
+
+import frappe
+import numpy as np
+
+COMPACT = "compact"
+
+
+def is_compact(format):
+    return (format or "").lower() == COMPACT
+
+
+def encode_table(rows, columns, dict_columns=()):
+    """Rows (dicts) -> column list + row arrays, with string columns dictionary-encoded"""
+    dicts = {column: [] for column in dict_columns}
+    lookup = {column: {} for column in dict_columns}
+
+    encoded = []
+    for row in rows:
+        values = []
+        for column in columns:
+            value = row.get(column)
+            if column in lookup:
+                index = lookup[column].get(value)
+                if index is None:
+                    index = lookup[column][value] = len(dicts[column])
+                    dicts[column].append(value)
+                value = index
+            values.append(value)
+        encoded.append(values)
+
+    return {
+        "format": COMPACT,
+        "columns": list(columns),
+        "dicts": dicts,
+        "rows": encoded
+    }
+
+
+def encode_runs(values):
+    """Run-length encode a sequence: [[value, length], ...]"""
+    runs = []
+    for value in values:
+        if runs and runs[-1][0] == value:
+            runs[-1][1] += 1
+        else:
+            runs.append([value, 1])
+    return runs
+
+
+def encode_row_runs(matrix):
+    """Run-length encode each row of a 2-D array: one [[value, length], ...] list per row"""
+    matrix = np.asarray(matrix)
+    if not matrix.size:
+        return [[] for _ in range(matrix.shape[0])]
+
+    runs = []
+    for row in matrix:
+        # Run starts: index 0 plus every position whose value differs from the previous day
+        starts = np.concatenate(([0], np.flatnonzero(row[1:] != row[:-1]) + 1))
+        lengths = np.diff(np.append(starts, len(row)))
+        runs.append([[int(v), int(n)] for v, n in zip(row[starts], lengths)])
+    return runs
+
+
+def payload_size(payload):
+    """Bytes on the wire for a JSON payload (as frappe serializes it, before gzip)"""
+    return len(json.dumps(payload, default=str, separators=(",", ":")).encode())
+
+
+def measure(verbose, compact):
+    verbose_bytes = payload_size(verbose)
+    compact_bytes = payload_size(compact)
+    return {
+        "verbose_bytes": verbose_bytes,
+        "compact_bytes": compact_bytes,
+        "reduction_percent": round(100.0 * (1 - compact_bytes / verbose_bytes), 1) if verbose_bytes else 0
+    }
+
+
+@frappe.whitelist()
+def measure_compact_payloads(start=None, end=None, unit_name=None, property=None):
+    """
+    API: payload size of each endpoint in verbose vs compact format
+    Uses real data for the given range / unit so the numbers reflect this site
+    """
+    from frappe.utils import add_months, today
+
+    from hotel_management.hotel_management.doctype.property_unit.property_unit import get_unit_occupancy_calendar
+    from hotel_management.hotel_management.doctype.reservation.reservation import get_available_units
+    from hotel_management.hotel_management.page.hotel_calendar.hotel_calendar import get_calendar_events
+
+    frappe.only_for(("System Manager", "Hotel Manager"))
+
+    start = start or today()
+    end = end or add_months(start, 1)
+    results = {
+        "get_calendar_events": measure(
+            get_calendar_events(start, end, property=property),
+            get_calendar_events(start, end, property=property, format=COMPACT)),
+        "get_available_units": measure(
+            get_available_units(property, check_in=start, check_out=end),
+            get_available_units(property, check_in=start, check_out=end, format=COMPACT)),
+    }
+
+    unit_name = unit_name or frappe.db.get_value("Property Unit",
+        {"property": property} if property else {}, "name")
+    if unit_name:
+        results["get_unit_occupancy_calendar"] = measure(
+            get_unit_occupancy_calendar(unit_name, start, end),
+            get_unit_occupancy_calendar(unit_name, start, end, format=COMPACT))
+
+    return results
@@ -5,33 +5,235 @@ Provides real-time data for workspace widgets
 Path: hotel_management/hotel_management/dashboard_api.py
 """
 
+import time
+
 import frappe
 from frappe import _
-from frappe.utils import today, now_datetime, add_days, getdate
+from frappe.utils import today, now_datetime, add_days, getdate, flt, get_first_day
+
+# Snapshots are rebuilt at most this often, and dropped early by doc events
+DASHBOARD_SNAPSHOT_TTL = 120
+SNAPSHOT_KEY = "hotel_dashboard_snapshot"
 
 @frappe.whitelist()
-def get_dashboard_data():
+def get_dashboard_data(property=None):
     """
     Get all dashboard statistics in one call
-    Returns comprehensive data for all widgets
+    Returns comprehensive data for all widgets (cached snapshot, optionally per property)
     """
-    
+    return get_dashboard_snapshot(property)
+
+# ========================================
+# Cached snapshot
+# ========================================
+
+def get_snapshot_key(property=None):
+    return "{0}|{1}".format(SNAPSHOT_KEY, property or "all")
+
+def get_dashboard_snapshot(property=None):
+    """
+    Return the cached snapshot, building it once per change
+    A short lock keeps simultaneous cache misses from all running the queries
+    """
+    cache = frappe.cache()
+    key = get_snapshot_key(property)
+
+    snapshot = cache.get_value(key)
+    if snapshot is not None:
+        return snapshot
+
+    lock_key = cache.make_key(key + "|lock")
+    acquired = cache.set(lock_key, 1, nx=True, ex=10)
+    if not acquired:
+        # Someone else is building it - wait briefly instead of piling on
+        for _attempt in range(20):
+            time.sleep(0.1)
+            snapshot = cache.get_value(key)
+            if snapshot is not None:
+                return snapshot
+
+    try:
+        snapshot = build_dashboard_snapshot(property)
+        cache.set_value(key, snapshot, expires_in_sec=DASHBOARD_SNAPSHOT_TTL)
+    finally:
+        # A waiter that gave up builds too, but the lock is still the builder's
+        if acquired:
+            cache.delete(lock_key)
+
+    return snapshot
+
+def build_dashboard_snapshot(property=None):
+    """
+    Compute every widget from the live counters (one HGETALL) plus two queries:
+    the first few arrival / departure rows for the widget details, and
+    today + month-to-date from the Hotel Daily KPI table with pending settlements
+    """
+    from hotel_management.hotel_management.live_counters import get_widget_counts
+
+    values = {"today": today(), "month_start": get_first_day(today()), "property": property}
+
+    reservation_scope = unit_scope = ""
+    if property:
+        reservation_scope = """AND EXISTS (
+            SELECT 1 FROM `tabReservation Unit` ru
+            JOIN `tabProperty Unit` pu ON pu.name = ru.unit
+            WHERE ru.parent = r.name AND pu.property = %(property)s)"""
+        unit_scope = "AND x.property_unit IN (SELECT name FROM `tabProperty Unit` WHERE property = %(property)s)"
+
+    movements = frappe.db.sql("""
+        (SELECT r.name, r.customer, r.primary_guest, r.status
+        FROM `tabReservation` r
+        WHERE r.docstatus = 1 AND r.status = 'Confirmed' AND r.check_in = %(today)s
+        {reservation_scope}
+        ORDER BY r.name LIMIT 5)
+
+        UNION ALL
+
+        (SELECT r.name, r.customer, r.primary_guest, r.status
+        FROM `tabReservation` r
+        WHERE r.docstatus = 1 AND r.status = 'Checked-In' AND r.check_out = %(today)s
+        {reservation_scope}
+        ORDER BY r.name LIMIT 5)
+    """.format(reservation_scope=reservation_scope), values, as_dict=1)
+
+    kpi = frappe.db.sql("""
+        SELECT
+            COALESCE(SUM(IF(date = %(today)s, rooms_available, 0)), 0) as rooms_available,
+            COALESCE(SUM(IF(date = %(today)s, rooms_sold, 0)), 0) as rooms_sold,
+            COALESCE(SUM(IF(date = %(today)s, room_revenue, 0)), 0) as room_revenue_today,
+            COALESCE(SUM(room_revenue), 0) as room_revenue_month,
+            (
+                SELECT COUNT(*) FROM `tabOwner Settlement` x
+                WHERE x.docstatus = 0 AND x.status IN ('Draft', 'Calculated') {unit_scope}
+            ) as pending_settlements
+        FROM `tabHotel Daily KPI`
+        WHERE date BETWEEN %(month_start)s AND %(today)s
+        {kpi_scope}
+    """.format(
+        kpi_scope="AND property = %(property)s" if property else "",
+        unit_scope=unit_scope
+    ), values, as_dict=1)[0]
+
+    return assemble_snapshot(movements, get_widget_counts(property), kpi)
+
+def assemble_snapshot(movements, counts, kpi):
+    """Shape counters and query results into the widget payload the dashboard page expects"""
+    arrivals = [r for r in movements if r.status == "Confirmed"]
+    departures = [r for r in movements if r.status == "Checked-In"]
+
+    def details(rows):
+        return [{"name": r.name, "customer": r.customer, "primary_guest": r.primary_guest} for r in rows[:5]]
+
+    total_units = int(kpi.rooms_available)
+    occupied_units = int(kpi.rooms_sold)
+    occupancy_percentage = (occupied_units / total_units) * 100 if total_units else 0
+    if occupancy_percentage >= 80:
+        occupancy_color = "green"
+    elif occupancy_percentage >= 50:
+        occupancy_color = "orange"
+    else:
+        occupancy_color = "red"
+
+    revenue = flt(kpi.room_revenue_month, 2)
+
     return {
-        "available_units": get_available_units_count(),
-        "todays_arrivals": get_todays_arrivals(),
-        "todays_departures": get_todays_departures(),
-        "current_occupancy": get_current_occupancy(),
-        "pending_tasks": get_pending_tasks_count(),
-        "in_house_guests": get_in_house_guests(),
-        "pending_settlements": get_pending_settlements(),
-        "revenue_this_month": get_revenue_this_month()
+        "available_units": {
+            "value": counts["available_units"],
+            "label": _("Available Units"),
+            "color": "green"
+        },
+        "todays_arrivals": {
+            "value": counts["arrivals"],
+            "label": _("Today's Arrivals"),
+            "color": "blue",
+            "details": details(arrivals)
+        },
+        "todays_departures": {
+            "value": counts["departures"],
+            "label": _("Today's Departures"),
+            "color": "orange",
+            "details": details(departures)
+        },
+        "current_occupancy": {
+            "value": occupied_units,
+            "total": total_units,
+            "percentage": f"{occupancy_percentage:.1f}%",
+            "adr": flt(kpi.room_revenue_today / occupied_units, 2) if occupied_units else 0,
+            "revpar": flt(kpi.room_revenue_today / total_units, 2) if total_units else 0,
+            "label": _("Current Occupancy"),
+            "color": occupancy_color
+        },
+        "pending_tasks": {
+            "value": counts["tasks_pending"],
+            "overdue": counts["tasks_overdue"],
+            "label": _("Pending Tasks"),
+            "color": "yellow" if counts["tasks_overdue"] == 0 else "red"
+        },
+        "in_house_guests": {
+            "value": counts["in_house"],
+            "label": _("In-House Guests"),
+            "color": "purple"
+        },
+        "pending_settlements": {
+            "value": int(kpi.pending_settlements),
+            "label": _("Pending Settlements"),
+            "color": "cyan"
+        },
+        "revenue_this_month": {
+            "value": revenue,
+            "label": _("Revenue This Month"),
+            "color": "green",
+            "formatted": frappe.format_value(revenue, {"fieldtype": "Currency"})
+        },
+        "unit_status_breakdown": counts["unit_status"],
+        "open_maintenance": counts["maintenance_open"],
+        "generated_at": str(now_datetime())
     }
 
+def invalidate_dashboard_snapshot(properties=None):
+    """Drop the all-properties snapshot and those of the given properties (all when None)"""
+    cache = frappe.cache()
+    if properties is None:
+        cache.delete_keys(SNAPSHOT_KEY + "|")
+        return
+
+    cache.delete_value(get_snapshot_key())
+    for property in properties:
+        if property:
+            cache.delete_value(get_snapshot_key(property))
+
+def get_doc_properties(doc):
+    """Properties a Reservation / Housekeeping / Maintenance / Settlement / Unit doc belongs to"""
+    if doc.doctype == "Property Unit":
+        return [doc.property]
+
+    if doc.doctype == "Reservation":
+        units = [row.unit for row in doc.get("units_reserved") or [] if row.unit]
+    else:
+        units = [doc.get("property_unit")] if doc.get("property_unit") else []
+
+    if not units:
+        return None
+
+    return frappe.get_all("Property Unit",
+        filters={"name": ["in", units]}, pluck="property", distinct=True)
+
+def on_dashboard_doc_change(doc, method=None):
+    """doc_event: any change that moves a dashboard number"""
+    if doc.doctype == "Property Unit" and method == "on_update":
+        before = doc.get_doc_before_save()
+        if before and before.status == doc.status and before.property == doc.property:
+            return
+
+    invalidate_dashboard_snapshot(get_doc_properties(doc))
+
 @frappe.whitelist()
 def get_available_units_count():
     """Get count of available units"""
     try:
-        count = frappe.db.count("Property Unit", {"status": "Available"})
+        from hotel_management.hotel_management.live_counters import get_widget_counts
+        
+        count = get_widget_counts()["available_units"]
         return {
             "value": count,
             "label": _("Available Units"),
@@ -105,11 +307,12 @@ def get_todays_departures():
 
 @frappe.whitelist()
 def get_current_occupancy():
-    """Get current occupancy percentage"""
+    """Get tonight's occupancy from the Hotel Daily KPI table"""
     try:
-        total_units = frappe.db.count("Property Unit")
+        kpi = get_kpi_totals(today(), today())
+        total_units = kpi.rooms_available
         
-        if total_units == 0:
+        if not total_units:
             return {
                 "value": 0,
                 "label": _("Current Occupancy"),
@@ -117,10 +320,7 @@ def get_current_occupancy():
                 "percentage": "0%"
             }
         
-        occupied_units = frappe.db.count("Property Unit", {
-            "status": ["in", ["Occupied", "Booked"]]
-        })
-        
+        occupied_units = kpi.rooms_sold
         occupancy_percentage = (occupied_units / total_units) * 100
         
         # Determine color based on occupancy
@@ -135,6 +335,8 @@ def get_current_occupancy():
             "value": occupied_units,
             "total": total_units,
             "percentage": f"{occupancy_percentage:.1f}%",
+            "adr": kpi.adr,
+            "revpar": kpi.revpar,
             "label": _("Current Occupancy"),
             "color": color
         }
@@ -146,16 +348,11 @@ def get_current_occupancy():
 def get_pending_tasks_count():
     """Get count of pending housekeeping tasks"""
     try:
-        count = frappe.db.count("Housekeeping Task", {
-            "status": ["in", ["Pending", "In Progress"]],
-            "scheduled_date": ["<=", today()]
-        })
+        from hotel_management.hotel_management.live_counters import get_widget_counts
         
-        # Get overdue count
-        overdue = frappe.db.count("Housekeeping Task", {
-            "status": ["in", ["Pending", "In Progress"]],
-            "scheduled_date": ["<", today()]
-        })
+        counts = get_widget_counts()
+        count = counts["tasks_pending"]
+        overdue = counts["tasks_overdue"]
         
         return {
             "value": count,
@@ -171,10 +368,9 @@ def get_pending_tasks_count():
 def get_in_house_guests():
     """Get current in-house guests count"""
     try:
-        count = frappe.db.count("Reservation", {
-            "status": "Checked-In",
-            "docstatus": 1
-        })
+        from hotel_management.hotel_management.live_counters import get_widget_counts
+        
+        count = get_widget_counts()["in_house"]
         
         return {
             "value": count,
@@ -205,31 +401,47 @@ def get_pending_settlements():
 
 @frappe.whitelist()
 def get_revenue_this_month():
-    """Get total revenue for current month"""
+    """Get room revenue for the current month to date"""
     try:
-        from frappe.utils import get_first_day, get_last_day
-        
-        first_day = get_first_day(today())
-        last_day = get_last_day(today())
-        
-        revenue = frappe.db.sql("""
-            SELECT COALESCE(SUM(total_amount), 0) as total
-            FROM `tabReservation`
-            WHERE docstatus = 1
-            AND status = 'Checked-Out'
-            AND check_out BETWEEN %s AND %s
-        """, (first_day, last_day), as_dict=1)
+        kpi = get_kpi_totals(get_first_day(today()), today())
         
         return {
-            "value": revenue[0].total if revenue else 0,
+            "value": kpi.room_revenue,
             "label": _("Revenue This Month"),
             "color": "green",
-            "formatted": frappe.format_value(revenue[0].total if revenue else 0, {"fieldtype": "Currency"})
+            "formatted": frappe.format_value(kpi.room_revenue, {"fieldtype": "Currency"})
         }
     except Exception as e:
         frappe.log_error(frappe.get_traceback(), "Get Revenue This Month Failed")
         return {"value": 0, "label": _("Revenue This Month"), "color": "green"}
 
+def get_kpi_totals(from_date, to_date, property=None):
+    """Sum Hotel Daily KPI rows over a date range (all unit types)"""
+    conditions = ""
+    if property:
+        conditions = "AND property = %(property)s"
+    
+    totals = frappe.db.sql("""
+        SELECT
+            COALESCE(SUM(rooms_available), 0) as rooms_available,
+            COALESCE(SUM(rooms_sold), 0) as rooms_sold,
+            COALESCE(SUM(room_revenue), 0) as room_revenue
+        FROM `tabHotel Daily KPI`
+        WHERE date BETWEEN %(from_date)s AND %(to_date)s
+        {conditions}
+    """.format(conditions=conditions), {
+        "from_date": from_date,
+        "to_date": to_date,
+        "property": property
+    }, as_dict=1)[0]
+    
+    totals.rooms_available = int(totals.rooms_available)
+    totals.rooms_sold = int(totals.rooms_sold)
+    totals.room_revenue = flt(totals.room_revenue, 2)
+    totals.adr = flt(totals.room_revenue / totals.rooms_sold, 2) if totals.rooms_sold else 0
+    totals.revpar = flt(totals.room_revenue / totals.rooms_available, 2) if totals.rooms_available else 0
+    return totals
+
 @frappe.whitelist()
 def get_unit_status_breakdown():
     """Get breakdown of units by status"""
@@ -295,9 +507,10 @@ def get_critical_maintenance_requests():
         return {"count": 0, "requests": []}
 
 @frappe.whitelist()
-def refresh_dashboard():
+def refresh_dashboard(property=None):
     """
     Refresh all dashboard data
-    Called when user clicks refresh button
+    Called when user clicks refresh button - rebuilds the snapshot
     """
-    return get_dashboard_data()
\ No newline at end of file
+    frappe.cache().delete_value(get_snapshot_key(property))
+    return get_dashboard_data(property)
\ No newline at end of file
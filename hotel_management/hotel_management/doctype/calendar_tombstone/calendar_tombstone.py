@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, VRPnext and contributors
+# For license information, please see license.txt
+
+from __future__ import unicode_literals
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, now
+
+# Calendar clients with an older `since` cursor must do a full reload
+TOMBSTONE_RETENTION_DAYS = 30
+
+TOMBSTONE_FIELDS = [
+	"name", "creation", "modified", "owner", "modified_by",
+	"reservation", "unit", "reason", "check_in", "check_out"
+]
+
+class CalendarTombstone(Document):
+	pass
+
+def on_doctype_update():
+	frappe.db.add_index("Calendar Tombstone", ["creation"])
+
+def write_tombstones(reservation, rows, reason):
+	"""Bulk insert one tombstone per removed (reservation, unit) row"""
+	if not rows:
+		return
+
+	timestamp = now()
+	user = frappe.session.user
+	frappe.db.bulk_insert("Calendar Tombstone", TOMBSTONE_FIELDS, [
+		(
+			frappe.generate_hash(length=10), timestamp, timestamp, user, user,
+			reservation, row.unit, reason, row.check_in, row.check_out
+		)
+		for row in rows
+	])
+
+def record_reservation_tombstones(doc, method=None):
+	"""
+	doc_event (Reservation): log calendar bars that disappear
+	on_cancel / on_trash remove every row; updates remove dropped unit rows
+	"""
+	if method in ("on_cancel", "on_trash"):
+		write_tombstones(doc.name, doc.get("units_reserved") or [],
+			"Cancelled" if method == "on_cancel" else "Deleted")
+		return
+
+	before = doc.get_doc_before_save()
+	if not before:
+		return
+
+	current = {(row.unit, str(row.check_in), str(row.check_out)) for row in doc.get("units_reserved") or []}
+	dropped = [
+		row for row in before.get("units_reserved") or []
+		if (row.unit, str(row.check_in), str(row.check_out)) not in current
+	]
+	write_tombstones(doc.name, dropped, "Unit Removed")
+
+def purge_tombstones():
+	"""Night audit step: forget tombstones past the retention window"""
+	frappe.db.sql("""
+		DELETE FROM `tabCalendar Tombstone`
+		WHERE creation < %s
+	""", (add_days(now(), -TOMBSTONE_RETENTION_DAYS),))
@@ -69,21 +69,55 @@ def get_guest_history(guest_id):
 	)
 	return reservations
 
-def update_guest_statistics(guest_id):
-	"""Update guest statistics after reservation"""
+def update_guest_statistics(guest_id, method=None):
+	"""
+	Update guest statistics after reservation
+	Accepts a Guest name, or a Reservation doc when used as a doc_event
+	"""
+	if not isinstance(guest_id, str):
+		guest_id = guest_id.get("primary_guest")
+	
+	if not guest_id:
+		return
+	
 	stats = frappe.db.sql("""
 		SELECT 
 			COUNT(*) as total_visits,
+			COALESCE(SUM(nights), 0) as total_nights,
 			MAX(check_out) as last_visit,
-			SUM(total_amount) as lifetime_revenue
+			COALESCE(SUM(total_amount), 0) as lifetime_revenue
 		FROM `tabReservation`
 		WHERE primary_guest = %s
+		AND docstatus = 1
 		AND status = 'Checked-Out'
-	""", (guest_id,), as_dict=1)
+	""", (guest_id,), as_dict=1)[0]
 	
-	if stats and stats[0].total_visits:
-		frappe.db.set_value("Guest", guest_id, {
-			"total_visits": stats[0].total_visits,
-			"last_visit_date": stats[0].last_visit,
-			"lifetime_revenue": stats[0].lifetime_revenue or 0
-		})
\ No newline at end of file
+	frappe.db.set_value("Guest", guest_id, {
+		"total_visits": stats.total_visits,
+		"total_nights": stats.total_nights,
+		"last_visit_date": stats.last_visit,
+		"lifetime_revenue": stats.lifetime_revenue
+	}, update_modified=False)
+
+def rebuild_guest_statistics():
+	"""Recompute statistics for every guest in one set-based UPDATE"""
+	frappe.db.sql("""
+		UPDATE `tabGuest` g
+		LEFT JOIN (
+			SELECT 
+				primary_guest,
+				COUNT(*) as total_visits,
+				COALESCE(SUM(nights), 0) as total_nights,
+				MAX(check_out) as last_visit,
+				COALESCE(SUM(total_amount), 0) as lifetime_revenue
+			FROM `tabReservation`
+			WHERE docstatus = 1
+			AND status = 'Checked-Out'
+			GROUP BY primary_guest
+		) s ON s.primary_guest = g.name
+		SET 
+			g.total_visits = COALESCE(s.total_visits, 0),
+			g.total_nights = COALESCE(s.total_nights, 0),
+			g.last_visit_date = s.last_visit,
+			g.lifetime_revenue = COALESCE(s.lifetime_revenue, 0)
+	""")
@@ -0,0 +1,315 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, VRPnext and contributors
+# For license information, please see license.txt
+
+from __future__ import unicode_literals
+import frappe
+from frappe.model.document import Document
+from frappe import _
+from frappe.utils import flt, getdate, today, add_days, add_months, date_diff, now
+import numpy as np
+
+# Rows are kept for this many days ahead of today (forward-looking occupancy)
+KPI_HORIZON_DAYS = 365
+
+# Reservation statuses that count as a sold room night
+SOLD_STATUSES = ("Confirmed", "Checked-In", "Checked-Out")
+
+KPI_FIELDS = [
+	"name", "creation", "modified", "owner", "modified_by",
+	"date", "property", "unit_type",
+	"rooms_available", "rooms_sold", "occupancy",
+	"room_revenue", "adr", "revpar",
+	"arrivals", "departures", "no_shows"
+]
+
+class HotelDailyKPI(Document):
+	pass
+
+def on_doctype_update():
+	"""One row per (date, property, unit_type)"""
+	frappe.db.add_unique("Hotel Daily KPI", ["date", "property", "unit_type"],
+		constraint_name="unique_date_property_unit_type")
+	frappe.db.add_index("Hotel Daily KPI", ["property", "date"])
+
+# ========================================
+# Computation
+# ========================================
+
+def compute_kpis(from_date, to_date, property=None, unit_type=None):
+	"""
+	Compute daily KPIs for every (property, unit_type) in [from_date, to_date]
+
+	One query for unit counts and one for overlapping stays; nights are laid
+	onto per-day arrays with difference arrays (+1 at check-in, -1 at check-out).
+
+	Returns:
+		tuple: (groups, arrays) where groups is a list of (property, unit_type)
+		and arrays is a dict of (groups x days) NumPy arrays
+	"""
+	from_date = getdate(from_date)
+	to_date = getdate(to_date)
+	days = date_diff(to_date, from_date) + 1
+
+	values = {
+		"from_date": from_date,
+		"to_date": to_date,
+		"property": property,
+		"unit_type": unit_type,
+		"statuses": SOLD_STATUSES
+	}
+	conditions = ""
+	if property:
+		conditions += " AND pu.property = %(property)s"
+	if unit_type:
+		conditions += " AND pu.unit_type = %(unit_type)s"
+
+	unit_counts = frappe.db.sql("""
+		SELECT pu.property, pu.unit_type, COUNT(*) as total_units
+		FROM `tabProperty Unit` pu
+		WHERE 1=1 {conditions}
+		GROUP BY pu.property, pu.unit_type
+	""".format(conditions=conditions), values)
+
+	# Stays touching the window (check_out == from_date still counts as a departure)
+	stays = frappe.db.sql("""
+		SELECT
+			pu.property,
+			pu.unit_type,
+			r.status,
+			DATEDIFF(ru.check_in, %(from_date)s) as start_idx,
+			DATEDIFF(ru.check_out, %(from_date)s) as end_idx,
+			COALESCE(ru.total_amount / NULLIF(ru.qty_nights, 0), ru.rate_per_night, 0) as nightly_rate
+		FROM `tabReservation Unit` ru
+		JOIN `tabReservation` r ON r.name = ru.parent
+		JOIN `tabProperty Unit` pu ON pu.name = ru.unit
+		WHERE r.docstatus = 1
+		AND r.status IN %(statuses)s
+		AND ru.check_in <= %(to_date)s
+		AND ru.check_out >= %(from_date)s
+		{conditions}
+	""".format(conditions=conditions), values)
+
+	group_index = {}
+	available = []
+	for row in unit_counts:
+		group_index[(row[0], row[1])] = len(group_index)
+		available.append(row[2])
+	for row in stays:
+		if (row[0], row[1]) not in group_index:
+			group_index[(row[0], row[1])] = len(group_index)
+			available.append(0)
+
+	n = len(group_index)
+	shape = (n, days + 1)
+	sold = np.zeros(shape, dtype=np.int64)
+	revenue = np.zeros(shape, dtype=np.float64)
+	arrivals = np.zeros(shape, dtype=np.int64)
+	departures = np.zeros(shape, dtype=np.int64)
+	no_shows = np.zeros(shape, dtype=np.int64)
+
+	if stays:
+		count = len(stays)
+		g = np.fromiter((group_index[(s[0], s[1])] for s in stays), dtype=np.int64, count=count)
+		start = np.fromiter((s[3] for s in stays), dtype=np.int64, count=count)
+		end = np.fromiter((s[4] for s in stays), dtype=np.int64, count=count)
+		rate = np.fromiter((flt(s[5]) for s in stays), dtype=np.float64, count=count)
+		confirmed = np.fromiter((s[2] == "Confirmed" for s in stays), dtype=bool, count=count)
+
+		# Nights sold: clip stays to the window, then difference arrays
+		s_clip = np.clip(start, 0, days)
+		e_clip = np.clip(end, 0, days)
+		np.add.at(sold, (g, s_clip), 1)
+		np.add.at(sold, (g, e_clip), -1)
+		np.add.at(revenue, (g, s_clip), rate)
+		np.add.at(revenue, (g, e_clip), -rate)
+
+		arriving = (start >= 0) & (start < days)
+		np.add.at(arrivals, (g[arriving], start[arriving]), 1)
+
+		departing = (end >= 0) & (end < days)
+		np.add.at(departures, (g[departing], end[departing]), 1)
+
+		# Still "Confirmed" after the arrival day has passed -> no-show
+		today_idx = date_diff(today(), from_date)
+		missed = arriving & confirmed & (start < today_idx)
+		np.add.at(no_shows, (g[missed], start[missed]), 1)
+
+	rooms_available = np.repeat(np.array(available, dtype=np.int64).reshape(-1, 1), days, axis=1)
+	rooms_sold = np.cumsum(sold, axis=1)[:, :days]
+	room_revenue = np.cumsum(revenue, axis=1)[:, :days]
+
+	arrays = {
+		"rooms_available": rooms_available,
+		"rooms_sold": rooms_sold,
+		"room_revenue": room_revenue,
+		"occupancy": np.divide(rooms_sold * 100.0, rooms_available,
+			out=np.zeros(rooms_sold.shape), where=rooms_available > 0),
+		"adr": np.divide(room_revenue, rooms_sold,
+			out=np.zeros(room_revenue.shape), where=rooms_sold > 0),
+		"revpar": np.divide(room_revenue, rooms_available,
+			out=np.zeros(room_revenue.shape), where=rooms_available > 0),
+		"arrivals": arrivals[:, :days],
+		"departures": departures[:, :days],
+		"no_shows": no_shows[:, :days]
+	}
+
+	return list(group_index), arrays
+
+def write_kpis(from_date, to_date, property=None, unit_type=None):
+	"""Recompute and replace KPI rows for a date range (optionally one property / unit type)"""
+	from_date = getdate(from_date)
+	to_date = getdate(to_date)
+	if to_date < from_date:
+		return 0
+
+	groups, arrays = compute_kpis(from_date, to_date, property, unit_type)
+
+	conditions = ""
+	if property:
+		conditions += " AND property = %(property)s"
+	if unit_type:
+		conditions += " AND unit_type = %(unit_type)s"
+
+	frappe.db.sql("""
+		DELETE FROM `tabHotel Daily KPI`
+		WHERE date BETWEEN %(from_date)s AND %(to_date)s
+		{conditions}
+	""".format(conditions=conditions), {
+		"from_date": from_date,
+		"to_date": to_date,
+		"property": property,
+		"unit_type": unit_type
+	})
+
+	# Reports reading the KPI table must not keep serving the replaced rows
+	from hotel_management.hotel_management.report_cache import invalidate_report_cache
+	invalidate_report_cache([property] if property else None, from_date, to_date)
+
+	if not groups:
+		return 0
+
+	timestamp = now()
+	user = frappe.session.user
+	days = date_diff(to_date, from_date) + 1
+	dates = [add_days(from_date, d) for d in range(days)]
+
+	values = []
+	for i, (group_property, group_unit_type) in enumerate(groups):
+		for d, date in enumerate(dates):
+			values.append((
+				frappe.generate_hash(length=10), timestamp, timestamp, user, user,
+				date, group_property, group_unit_type,
+				int(arrays["rooms_available"][i, d]),
+				int(arrays["rooms_sold"][i, d]),
+				flt(arrays["occupancy"][i, d], 2),
+				flt(arrays["room_revenue"][i, d], 2),
+				flt(arrays["adr"][i, d], 2),
+				flt(arrays["revpar"][i, d], 2),
+				int(arrays["arrivals"][i, d]),
+				int(arrays["departures"][i, d]),
+				int(arrays["no_shows"][i, d])
+			))
+
+	frappe.db.bulk_insert("Hotel Daily KPI", KPI_FIELDS, values, chunk_size=5000)
+	return len(values)
+
+# ========================================
+# Incremental maintenance (doc_events)
+# ========================================
+
+def update_kpis_for_reservation(doc, method=None):
+	"""Recompute only the (property, unit_type, date) cells a reservation touches"""
+	if not doc.get("units_reserved"):
+		return
+
+	units = list({row.unit for row in doc.units_reserved if row.unit})
+	if not units:
+		return
+
+	start = min(getdate(row.check_in or doc.check_in) for row in doc.units_reserved)
+	end = max(getdate(row.check_out or doc.check_out) for row in doc.units_reserved)
+
+	groups = frappe.get_all("Property Unit",
+		filters={"name": ["in", units]},
+		fields=["property", "unit_type"],
+		distinct=True
+	)
+
+	for group in groups:
+		write_kpis(start, end, group.property, group.unit_type)
+
+def update_rooms_available(doc, method=None):
+	"""Refresh forward-looking rows when a unit is added, moved or deleted"""
+	groups = set()
+
+	if method == "after_delete":
+		groups.add((doc.property, doc.unit_type))
+	else:
+		before = doc.get_doc_before_save()
+		if before and before.property == doc.property and before.unit_type == doc.unit_type:
+			return
+		groups.add((doc.property, doc.unit_type))
+		if before:
+			groups.add((before.property, before.unit_type))
+
+	horizon_end = add_days(today(), KPI_HORIZON_DAYS)
+	for property, unit_type in groups:
+		if property and unit_type:
+			write_kpis(today(), horizon_end, property, unit_type)
+
+def refresh_recent_kpis():
+	"""
+	Night audit step: re-settle yesterday and today (no-shows, late check-ins)
+	and roll the forward horizon by one day
+	"""
+	write_kpis(add_days(today(), -1), today())
+
+	horizon_day = add_days(today(), KPI_HORIZON_DAYS)
+	write_kpis(horizon_day, horizon_day)
+
+# ========================================
+# Full rebuild
+# ========================================
+
+def rebuild_kpis(from_date=None, to_date=None):
+	"""
+	Rebuild the KPI table from reservations, one month at a time
+	Defaults to the first stay on record through today + KPI_HORIZON_DAYS
+	"""
+	if not from_date:
+		from_date = frappe.db.sql("SELECT MIN(check_in) FROM `tabReservation Unit`")[0][0] or today()
+	if not to_date:
+		to_date = add_days(today(), KPI_HORIZON_DAYS)
+
+	from_date = getdate(from_date)
+	to_date = getdate(to_date)
+
+	total = 0
+	chunk_start = from_date
+	while chunk_start <= to_date:
+		chunk_end = min(add_days(add_months(chunk_start, 1), -1), to_date)
+		total += write_kpis(chunk_start, chunk_end)
+		frappe.db.commit()
+		chunk_start = add_days(chunk_end, 1)
+
+	frappe.logger().info(f"Rebuilt Hotel Daily KPI: {total} rows from {from_date} to {to_date}")
+	return total
+
+@frappe.whitelist()
+def enqueue_rebuild_kpis(from_date=None, to_date=None):
+	"""API: rebuild the KPI table in the background"""
+	frappe.only_for("System Manager")
+
+	frappe.enqueue(
+		rebuild_kpis,
+		queue="long",
+		timeout=7200,
+		from_date=from_date,
+		to_date=to_date
+	)
+
+	return {
+		"success": True,
+		"message": _("Hotel Daily KPI rebuild queued")
+	}
@@ -37,7 +37,8 @@ class HousekeepingTask(Document):
 			self.completion_time = now_datetime().strftime("%H:%M:%S")
 		
 		# Update unit status to Available
-		frappe.db.set_value("Property Unit", self.property_unit, "status", "Available")
+		from hotel_management.hotel_management.unit_status import set_unit_status
+		set_unit_status(self.property_unit, "Available", reference=self)
 		frappe.msgprint(_("Unit {0} is now Available").format(self.property_unit))
 
 @frappe.whitelist()
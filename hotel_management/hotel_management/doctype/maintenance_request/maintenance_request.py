@@ -7,6 +7,7 @@ import frappe
 from frappe.model.document import Document
 from frappe import _
 from frappe.utils import today
+from hotel_management.hotel_management.unit_status import set_unit_status
 
 class MaintenanceRequest(Document):
 	def validate(self):
@@ -28,7 +29,7 @@ class MaintenanceRequest(Document):
 		if self.priority == "Critical" and self.status in ["Open", "In Progress"]:
 			current_status = frappe.db.get_value("Property Unit", self.property_unit, "status")
 			if current_status != "Maintenance":
-				frappe.db.set_value("Property Unit", self.property_unit, "status", "Maintenance")
+				set_unit_status(self.property_unit, "Maintenance", reference=self)
 				frappe.msgprint(
 					_("Unit {0} status changed to Maintenance").format(self.property_unit),
 					indicator="orange"
@@ -50,7 +51,7 @@ class MaintenanceRequest(Document):
 		# Update unit status back to Available if it was Maintenance
 		unit_status = frappe.db.get_value("Property Unit", self.property_unit, "status")
 		if unit_status == "Maintenance":
-			frappe.db.set_value("Property Unit", self.property_unit, "status", "Available")
+			set_unit_status(self.property_unit, "Available", reference=self)
 			frappe.msgprint(_("Unit {0} is now Available").format(self.property_unit))
 	
 	def on_update(self):
@@ -20,6 +20,17 @@ frappe.ui.form.on('Owner', {
 			frm.add_custom_button(__('View Settlements'), function() {
 				frappe.set_route('List', 'Owner Settlement', {'owner': frm.doc.name});
 			});
+			
+			// Stats of every owned unit in one call
+			frm.add_custom_button(__('Unit Statistics'), function() {
+				frappe.call({
+					method: 'hotel_management.hotel_management.doctype.property_unit.property_unit.get_units_stats',
+					args: {property_owner: frm.doc.name},
+					callback: function(r) {
+						if (r.message) show_owner_unit_stats(r.message);
+					}
+				});
+			});
 		}
 	},
 	
@@ -32,4 +43,47 @@ frappe.ui.form.on('Owner', {
 			}
 		}
 	}
-});
\ No newline at end of file
+});
+
+function show_owner_unit_stats(stats) {
+	let units = Object.keys(stats);
+	if (!units.length) {
+		frappe.msgprint(__('No units found for this owner'));
+		return;
+	}
+
+	let totals = {reservations: 0, revenue: 0, nights: 0};
+	let rows = units.map(unit => {
+		let s = stats[unit];
+		totals.reservations += s.total_reservations;
+		totals.revenue += s.total_revenue;
+		totals.nights += s.occupied_nights_this_month;
+		return `<tr>
+			<td>${unit}</td>
+			<td class="text-right">${s.total_reservations}</td>
+			<td class="text-right">${format_currency(s.total_revenue)}</td>
+			<td class="text-right">${s.occupied_nights_this_month}</td>
+		</tr>`;
+	}).join('');
+
+	frappe.msgprint({
+		title: __('Unit Statistics'),
+		wide: true,
+		message: `
+			<table class="table table-bordered">
+				<thead><tr>
+					<th>${__('Unit')}</th>
+					<th class="text-right">${__('Total Reservations')}</th>
+					<th class="text-right">${__('Total Revenue')}</th>
+					<th class="text-right">${__('Nights This Month')}</th>
+				</tr></thead>
+				<tbody>${rows}</tbody>
+				<tfoot><tr>
+					<th>${__('Total')}</th>
+					<th class="text-right">${totals.reservations}</th>
+					<th class="text-right">${format_currency(totals.revenue)}</th>
+					<th class="text-right">${totals.nights}</th>
+				</tr></tfoot>
+			</table>`
+	});
+}
\ No newline at end of file
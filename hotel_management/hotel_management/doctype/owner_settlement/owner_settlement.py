@@ -7,6 +7,7 @@ import frappe
 from frappe.model.document import Document
 from frappe import _
 from frappe.utils import flt, getdate, today, get_first_day, get_last_day, add_months
+from hotel_management.hotel_management.doctype.owner_settlement.settlement_engine import settle_single
 
 class OwnerSettlement(Document):
 	def validate(self):
@@ -129,7 +130,7 @@ class OwnerSettlement(Document):
 		self.total_revenue = total_revenue
 	
 	def calculate_expenses_with_allocation(self, unit_names):
-		"""Calculate expenses with smart allocation based on type"""
+		"""Collect expense rows for the period (allocation is applied in calculate_net_payable_with_method)"""
 		# Get all maintenance costs
 		maintenance_data = frappe.db.sql("""
 			SELECT 
@@ -149,70 +150,42 @@ class OwnerSettlement(Document):
 			"period_end": self.period_end
 		}, as_dict=1)
 		
-		total_expenses = 0
-		owner_share = 0
-		management_share = 0
-		
+		# Owner / management split is decided by the settlement core
 		for row in maintenance_data:
-			expense_type = "Maintenance"
-			amount = flt(row.amount)
-			
-			# Determine who pays based on allocation method
-			owner_pays = self.should_owner_pay_expense(expense_type)
-			
 			self.append("expense_details", {
-				"expense_type": expense_type,
+				"expense_type": "Maintenance",
 				"reference_doctype": "Maintenance Request",
 				"reference_name": row.reference_name,
 				"property_unit": row.property_unit,
 				"expense_date": row.expense_date,
-				"amount": amount,
-				"description": row.description,
-				"paid_by": "Owner" if owner_pays else "Management"
+				"amount": flt(row.amount),
+				"description": row.description
 			})
-			
-			total_expenses += amount
-			
-			if owner_pays:
-				owner_share += amount
-			else:
-				management_share += amount
-		
-		self.total_expenses = total_expenses
-		self.owner_share_expenses = owner_share
-		self.management_share_expenses = management_share
-	
-	def should_owner_pay_expense(self, expense_type):
-		"""Determine if owner should pay this expense type"""
-		if self.expense_allocation_method == "Owner Pays All":
-			return True
-		elif self.expense_allocation_method == "Management Pays All":
-			return False
-		else:  # Shared Based on Rules
-			if expense_type == "Maintenance":
-				return self.include_maintenance_expenses
-			elif expense_type == "Cleaning":
-				return self.include_cleaning_expenses
-			elif expense_type == "Utilities":
-				return self.include_utility_expenses
-			else:
-				return True  # Default: owner pays
 	
 	def calculate_net_payable_with_method(self):
-		"""Calculate commission and net payable based on selected method"""
+		"""Calculate allocation, commission and net payable with the vectorized settlement core"""
+		result = settle_single(
+			[row.amount for row in self.revenue_details],
+			[row.expense_type for row in self.expense_details],
+			[row.amount for row in self.expense_details],
+			self.commission_rate,
+			self.commission_calculation_method,
+			self.expense_allocation_method,
+			self.include_maintenance_expenses,
+			self.include_cleaning_expenses,
+			self.include_utility_expenses
+		)
 		
-		# Method A: Commission on Gross Revenue
-		if self.commission_calculation_method == "On Gross Revenue":
-			self.commission_base_amount = self.total_revenue
-			self.commission_amount = (flt(self.total_revenue) * flt(self.commission_rate)) / 100
-			self.net_payable = flt(self.total_revenue) - flt(self.owner_share_expenses) - flt(self.commission_amount)
+		for row, owner_pays in zip(self.expense_details, result["owner_pays"]):
+			row.paid_by = "Owner" if owner_pays else "Management"
 		
-		# Method B: Commission on Net Revenue (After Expenses)
-		else:  # "On Net Revenue (After Expenses)"
-			net_after_expenses = flt(self.total_revenue) - flt(self.owner_share_expenses)
-			self.commission_base_amount = net_after_expenses
-			self.commission_amount = (net_after_expenses * flt(self.commission_rate)) / 100
-			self.net_payable = net_after_expenses - flt(self.commission_amount)
+		self.total_revenue = result["total_revenue"]
+		self.total_expenses = result["total_expenses"]
+		self.owner_share_expenses = result["owner_share_expenses"]
+		self.management_share_expenses = result["management_share_expenses"]
+		self.commission_base_amount = result["commission_base_amount"]
+		self.commission_amount = result["commission_amount"]
+		self.net_payable = result["net_payable"]
 		
 		# Warning if negative
 		if self.net_payable < 0:
@@ -598,7 +571,16 @@ def auto_generate_monthly_settlements():
 		# Send notification if any settlements created
 		if created_count > 0:
 			send_settlement_notification(created_count, last_month_start, last_month_end)
-		
+
+			# Pre-render owner statements so they are cache hits when requested
+			frappe.enqueue(
+				"hotel_management.hotel_management.doctype.owner_settlement.owner_statement.run_statement_batch",
+				queue="long",
+				timeout=3600,
+				period_start=last_month_start,
+				period_end=last_month_end
+			)
+
 	except Exception as e:
 		frappe.log_error(frappe.get_traceback(), "Auto-Generate Settlements Failed")
 
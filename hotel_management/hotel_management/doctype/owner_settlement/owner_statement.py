@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, VRPnext and contributors
+# For license information, please see license.txt
+
+"""
+Owner Statement Batch Renderer
+Renders Owner Settlement PDFs in a worker pool and caches them on disk.
+
+Cached files are keyed by settlement name + modified timestamp, so regenerating
+an unchanged statement is a cache hit and never reaches wkhtmltopdf.
+"""
+
+from __future__ import unicode_literals
+import os
+import re
+import shutil
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import frappe
+from frappe import _
+from frappe.utils import cint, get_datetime, now_datetime
+
+PRINT_FORMAT = "Owner Settlement"
+STATEMENTS_FOLDER = "owner_statements"
+DEFAULT_WORKERS = 4
+MAX_WORKERS = 16
+
+
+def get_statements_path(*parts):
+	"""Absolute path inside the private statements folder of the current site"""
+	return frappe.get_site_path("private", "files", STATEMENTS_FOLDER, *parts)
+
+
+def safe_filename(value):
+	"""Make a settlement / owner name usable as a file name"""
+	return re.sub(r"[^\w\-.]+", "_", str(value)).strip("_") or "unnamed"
+
+
+def get_cache_file(name, modified):
+	"""Cache file for a settlement version (name + modified)"""
+	stamp = get_datetime(modified).strftime("%Y%m%d%H%M%S%f")
+	return get_statements_path("cache", "{0}--{1}.pdf".format(safe_filename(name), stamp))
+
+
+def prune_stale_versions(name, keep_path):
+	"""Remove cached PDFs of older versions of the same settlement"""
+	cache_dir = get_statements_path("cache")
+	prefix = safe_filename(name) + "--"
+	keep = os.path.basename(keep_path)
+
+	for filename in os.listdir(cache_dir):
+		if filename.startswith(prefix) and filename != keep:
+			try:
+				os.remove(os.path.join(cache_dir, filename))
+			except OSError:
+				pass
+
+
+def render_statement_chunk(site, user, jobs):
+	"""
+	Worker: render a chunk of statements with its own site connection.
+	Each thread needs its own frappe.local, so we init/connect/destroy here.
+
+	Returns list of (settlement_name, error or None)
+	"""
+	frappe.init(site=site)
+	frappe.connect()
+	results = []
+
+	try:
+		frappe.set_user(user)
+
+		for name, path in jobs:
+			try:
+				pdf = frappe.get_print("Owner Settlement", name, print_format=PRINT_FORMAT, as_pdf=True)
+
+				# Write atomically so a half-written file is never a cache hit
+				tmp_path = path + ".tmp"
+				with open(tmp_path, "wb") as f:
+					f.write(pdf)
+				os.replace(tmp_path, path)
+
+				prune_stale_versions(name, path)
+				results.append((name, None))
+			except Exception as e:
+				frappe.log_error(frappe.get_traceback(), f"Owner Statement Render Failed - {name}")
+				results.append((name, str(e)))
+	finally:
+		frappe.destroy()
+
+	return results
+
+
+def get_statement_settlements(settlements=None, period_start=None, period_end=None, property_owner=None):
+	"""Submitted settlements to render, with the fields needed for cache keys"""
+	filters = {"docstatus": 1}
+
+	if settlements:
+		filters["name"] = ["in", settlements]
+	if property_owner:
+		filters["property_owner"] = property_owner
+	if period_start:
+		filters["period_start"] = [">=", period_start]
+	if period_end:
+		filters["period_end"] = ["<=", period_end]
+
+	return frappe.get_all("Owner Settlement",
+		filters=filters,
+		fields=["name", "property_owner", "period_start", "period_end", "modified"],
+		order_by="property_owner asc, period_start asc"
+	)
+
+
+def render_owner_statements(settlements=None, period_start=None, period_end=None,
+		property_owner=None, package="zip", workers=None):
+	"""
+	Render owner statements in parallel and package them on local disk
+
+	Args:
+		settlements: Optional list of Owner Settlement names
+		period_start / period_end / property_owner: Optional filters
+		package: "zip" (one archive) or "owner" (one folder per owner)
+		workers: Worker pool size (default 4)
+
+	Returns:
+		dict: counts of rendered / cached / failed statements and output path
+	"""
+	if package not in ("zip", "owner"):
+		frappe.throw(_("Package must be 'zip' or 'owner'"))
+
+	rows = get_statement_settlements(settlements, period_start, period_end, property_owner)
+	if not rows:
+		return {
+			"total": 0,
+			"rendered": 0,
+			"cached": 0,
+			"failed": [],
+			"output": None
+		}
+
+	os.makedirs(get_statements_path("cache"), exist_ok=True)
+
+	# Split into cache hits and statements that need rendering
+	pending = []
+	cached = 0
+	for row in rows:
+		row.pdf_path = get_cache_file(row.name, row.modified)
+		if os.path.exists(row.pdf_path):
+			cached += 1
+		else:
+			pending.append((row.name, row.pdf_path))
+
+	failed = []
+	if pending:
+		pool_size = max(1, min(cint(workers) or DEFAULT_WORKERS, MAX_WORKERS, len(pending)))
+		chunks = [pending[i::pool_size] for i in range(pool_size)]
+
+		with ThreadPoolExecutor(max_workers=pool_size) as pool:
+			futures = [
+				pool.submit(render_statement_chunk, frappe.local.site, frappe.session.user, chunk)
+				for chunk in chunks
+			]
+			for future in futures:
+				failed.extend({"settlement": name, "error": error}
+					for name, error in future.result() if error)
+
+	failed_names = {f["settlement"] for f in failed}
+	ready = [row for row in rows if row.name not in failed_names]
+
+	if package == "zip":
+		output = package_as_zip(ready)
+	else:
+		output = package_per_owner(ready)
+
+	summary = {
+		"total": len(rows),
+		"rendered": len(pending) - len(failed),
+		"cached": cached,
+		"failed": failed,
+		"output": output
+	}
+
+	frappe.logger().info(f"Owner statements: {summary['rendered']} rendered, {cached} cached, {len(failed)} failed -> {output}")
+	return summary
+
+
+def package_as_zip(rows):
+	"""Bundle cached statements into a single zip, grouped by owner folder"""
+	os.makedirs(get_statements_path("batches"), exist_ok=True)
+	zip_path = get_statements_path("batches",
+		"owner-statements-{0}.zip".format(now_datetime().strftime("%Y%m%d-%H%M%S")))
+
+	# PDFs are already compressed; storing avoids burning CPU for nothing
+	with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_STORED) as zf:
+		for row in rows:
+			arcname = "{0}/{1}.pdf".format(safe_filename(row.property_owner), safe_filename(row.name))
+			zf.write(row.pdf_path, arcname)
+
+	return zip_path
+
+
+def package_per_owner(rows):
+	"""Copy cached statements into one folder per owner"""
+	owners_path = get_statements_path("owners")
+
+	for row in rows:
+		owner_dir = os.path.join(owners_path, safe_filename(row.property_owner))
+		os.makedirs(owner_dir, exist_ok=True)
+		shutil.copyfile(row.pdf_path, os.path.join(owner_dir, safe_filename(row.name) + ".pdf"))
+
+	return owners_path
+
+
+def run_statement_batch(user=None, **kwargs):
+	"""
+	Background job wrapper: render and notify the requesting user
+	Scheduled pre-renders have no user and notify nobody (user=None would broadcast)
+	"""
+	try:
+		summary = render_owner_statements(**kwargs)
+		if user:
+			frappe.publish_realtime("owner_statements_ready", summary, user=user)
+	except Exception:
+		frappe.log_error(frappe.get_traceback(), "Owner Statement Batch Failed")
+		if user:
+			frappe.publish_realtime("owner_statements_ready", {"error": True}, user=user)
+
+
+@frappe.whitelist()
+def generate_owner_statements(settlements=None, period_start=None, period_end=None,
+		property_owner=None, package="zip"):
+	"""
+	API: queue a batch statement render
+	Result is pushed to the user via the 'owner_statements_ready' realtime event
+	"""
+	frappe.has_permission("Owner Settlement", "print", throw=True)
+
+	if isinstance(settlements, str):
+		settlements = frappe.parse_json(settlements)
+
+	frappe.enqueue(
+		run_statement_batch,
+		queue="long",
+		timeout=3600,
+		user=frappe.session.user,
+		settlements=settlements,
+		period_start=period_start,
+		period_end=period_end,
+		property_owner=property_owner,
+		package=package
+	)
+
+	return {
+		"success": True,
+		"message": _("Owner statements are being generated. You will be notified when ready.")
+	}
@@ -0,0 +1,312 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, VRPnext and contributors
+# For license information, please see license.txt
+
+"""
+Settlement Math Core
+Vectorized commission and expense allocation over columnar (NumPy) data.
+
+Rows are grouped by an integer group index (owner or unit), so a whole year of
+revenue and expense rows for every owner is settled in a handful of array ops.
+OwnerSettlement uses the same functions for a single settlement, which keeps
+the per-document and bulk numbers identical.
+"""
+
+from __future__ import unicode_literals
+import numpy as np
+
+import frappe
+from frappe import _
+from frappe.utils import flt
+
+# Commission methods
+COMMISSION_ON_GROSS = "On Gross Revenue"
+COMMISSION_ON_NET = "On Net Revenue (After Expenses)"
+
+# Expense allocation methods
+OWNER_PAYS_ALL = "Owner Pays All"
+MANAGEMENT_PAYS_ALL = "Management Pays All"
+SHARED_BY_RULES = "Shared Based on Rules"
+
+ALLOCATION_CODES = {OWNER_PAYS_ALL: 0, MANAGEMENT_PAYS_ALL: 1, SHARED_BY_RULES: 2}
+
+# Column order of the rules matrix (matches Owner Settlement Expense Item options)
+EXPENSE_TYPES = ["Maintenance", "Cleaning", "Utilities", "Supplies", "Other"]
+EXPENSE_TYPE_CODES = {t: i for i, t in enumerate(EXPENSE_TYPES)}
+
+
+def encode_expense_types(expense_types):
+	"""Map expense type labels to rule-matrix column codes (unknown -> Other)"""
+	other = EXPENSE_TYPE_CODES["Other"]
+	return np.fromiter(
+		(EXPENSE_TYPE_CODES.get(t, other) for t in expense_types),
+		dtype=np.int64, count=len(expense_types)
+	)
+
+
+def build_rules_matrix(include_maintenance, include_cleaning, include_utilities):
+	"""
+	Build the per-group "owner pays" rules matrix (groups x expense types)
+	used by the Shared Based on Rules method. Supplies and Other default to owner.
+	"""
+	include_maintenance = np.asarray(include_maintenance, dtype=bool)
+	n = include_maintenance.shape[0]
+
+	rules = np.ones((n, len(EXPENSE_TYPES)), dtype=bool)
+	rules[:, EXPENSE_TYPE_CODES["Maintenance"]] = include_maintenance
+	rules[:, EXPENSE_TYPE_CODES["Cleaning"]] = np.asarray(include_cleaning, dtype=bool)
+	rules[:, EXPENSE_TYPE_CODES["Utilities"]] = np.asarray(include_utilities, dtype=bool)
+	return rules
+
+
+def owner_pays_mask(expense_group, expense_type, allocation, rules):
+	"""
+	Vectorized should_owner_pay_expense: one boolean per expense row
+
+	Args:
+		expense_group: int array, group index of each expense row
+		expense_type: int array, EXPENSE_TYPE_CODES of each row
+		allocation: int array per group, ALLOCATION_CODES
+		rules: bool matrix (groups x expense types)
+	"""
+	row_allocation = allocation[expense_group]
+	return np.where(
+		row_allocation == ALLOCATION_CODES[OWNER_PAYS_ALL], True,
+		np.where(
+			row_allocation == ALLOCATION_CODES[MANAGEMENT_PAYS_ALL], False,
+			rules[expense_group, expense_type]
+		)
+	)
+
+
+def settle(n_groups, revenue_group, revenue_amount, expense_group, expense_type,
+		expense_amount, commission_rate, on_gross, allocation, rules):
+	"""
+	Settle every group at once
+
+	Args:
+		n_groups: number of groups (owners or units)
+		revenue_group / revenue_amount: revenue rows (columnar)
+		expense_group / expense_type / expense_amount: expense rows (columnar)
+		commission_rate: float array per group (percent)
+		on_gross: bool array per group, True for "On Gross Revenue"
+		allocation: int array per group, ALLOCATION_CODES
+		rules: bool matrix (groups x expense types)
+
+	Returns:
+		dict of float arrays per group plus the per-row owner_pays mask
+	"""
+	revenue_group = np.asarray(revenue_group, dtype=np.int64)
+	expense_group = np.asarray(expense_group, dtype=np.int64)
+	expense_type = np.asarray(expense_type, dtype=np.int64)
+	revenue_amount = np.asarray(revenue_amount, dtype=np.float64)
+	expense_amount = np.asarray(expense_amount, dtype=np.float64)
+	commission_rate = np.broadcast_to(np.asarray(commission_rate, dtype=np.float64), (n_groups,))
+	on_gross = np.broadcast_to(np.asarray(on_gross, dtype=bool), (n_groups,))
+	allocation = np.broadcast_to(np.asarray(allocation, dtype=np.int64), (n_groups,))
+
+	owner_pays = owner_pays_mask(expense_group, expense_type, allocation, rules)
+
+	total_revenue = np.bincount(revenue_group, weights=revenue_amount, minlength=n_groups)
+	total_expenses = np.bincount(expense_group, weights=expense_amount, minlength=n_groups)
+	owner_share = np.bincount(expense_group, weights=expense_amount * owner_pays, minlength=n_groups)
+	management_share = total_expenses - owner_share
+
+	# Method A: commission on gross, Method B: commission on revenue after owner expenses
+	net_after_expenses = total_revenue - owner_share
+	commission_base = np.where(on_gross, total_revenue, net_after_expenses)
+	commission = commission_base * commission_rate / 100
+	net_payable = net_after_expenses - commission
+
+	return {
+		"total_revenue": total_revenue,
+		"total_expenses": total_expenses,
+		"owner_share_expenses": owner_share,
+		"management_share_expenses": management_share,
+		"commission_base_amount": commission_base,
+		"commission_amount": commission,
+		"net_payable": net_payable,
+		"owner_pays": owner_pays
+	}
+
+
+def settle_single(revenue_amounts, expense_types, expense_amounts, commission_rate,
+		commission_method, allocation_method, include_maintenance=0,
+		include_cleaning=0, include_utilities=0):
+	"""Settle one settlement document (a single group) with the vectorized core"""
+	rules = build_rules_matrix([include_maintenance], [include_cleaning], [include_utilities])
+
+	result = settle(
+		1,
+		np.zeros(len(revenue_amounts), dtype=np.int64),
+		[flt(a) for a in revenue_amounts],
+		np.zeros(len(expense_amounts), dtype=np.int64),
+		encode_expense_types(expense_types),
+		[flt(a) for a in expense_amounts],
+		flt(commission_rate),
+		commission_method == COMMISSION_ON_GROSS,
+		ALLOCATION_CODES.get(allocation_method, ALLOCATION_CODES[OWNER_PAYS_ALL]),
+		rules
+	)
+
+	totals = {key: flt(value[0]) for key, value in result.items() if key != "owner_pays"}
+	totals["owner_pays"] = result["owner_pays"].tolist()
+	return totals
+
+
+# ========================================
+# Bulk runs & what-if simulations
+# ========================================
+
+def load_period_rows(period_start, period_end, owners=None):
+	"""
+	Load revenue and expense rows for all owner-managed units in one query each.
+	Same selection rules as OwnerSettlement.calculate_revenue / calculate_expenses.
+	"""
+	conditions = "AND pu.property_owner IS NOT NULL AND pu.property_owner != ''"
+	values = {"period_start": period_start, "period_end": period_end}
+
+	if owners:
+		conditions += " AND pu.property_owner IN %(owners)s"
+		values["owners"] = tuple(owners)
+
+	revenue = frappe.db.sql("""
+		SELECT pu.property_owner, ru.unit, ru.total_amount
+		FROM `tabReservation Unit` ru
+		JOIN `tabReservation` r ON r.name = ru.parent
+		JOIN `tabProperty Unit` pu ON pu.name = ru.unit
+		WHERE r.docstatus = 1
+		AND r.status = 'Checked-Out'
+		AND ru.check_in >= %(period_start)s
+		AND ru.check_out <= %(period_end)s
+		{conditions}
+	""".format(conditions=conditions), values)
+
+	expenses = frappe.db.sql("""
+		SELECT pu.property_owner, mr.property_unit, mr.actual_cost
+		FROM `tabMaintenance Request` mr
+		JOIN `tabProperty Unit` pu ON pu.name = mr.property_unit
+		WHERE mr.status = 'Resolved'
+		AND mr.resolution_date BETWEEN %(period_start)s AND %(period_end)s
+		AND mr.actual_cost > 0
+		{conditions}
+	""".format(conditions=conditions), values)
+
+	return revenue, expenses
+
+
+def run_bulk_settlement(period_start, period_end, owners=None, group_by="owner",
+		commission_rate=None, commission_method=COMMISSION_ON_GROSS,
+		expense_allocation_method=OWNER_PAYS_ALL, include_maintenance=0,
+		include_cleaning=0, include_utilities=0):
+	"""
+	Settle all owners (or units) for a period at once
+
+	Args:
+		group_by: "owner" or "unit"
+		commission_rate: Override for every owner (what-if); defaults to Owner.commission_rate
+
+	Returns:
+		list of dicts, one per owner / unit
+	"""
+	if group_by not in ("owner", "unit"):
+		frappe.throw(_("Group By must be 'owner' or 'unit'"))
+	if commission_method not in (COMMISSION_ON_GROSS, COMMISSION_ON_NET):
+		frappe.throw(_("Invalid commission method: {0}").format(commission_method))
+	if expense_allocation_method not in ALLOCATION_CODES:
+		frappe.throw(_("Invalid expense allocation method: {0}").format(expense_allocation_method))
+
+	revenue, expenses = load_period_rows(period_start, period_end, owners)
+
+	# Factorize group keys: (owner, unit) per group, shared by revenue & expense rows
+	key_col = 0 if group_by == "owner" else 1
+	keys = {}
+	group_owner = []
+	for row in list(revenue) + list(expenses):
+		if row[key_col] not in keys:
+			keys[row[key_col]] = len(keys)
+			group_owner.append(row[0])
+
+	n_groups = len(keys)
+	if not n_groups:
+		return []
+
+	revenue_group = np.fromiter((keys[r[key_col]] for r in revenue), dtype=np.int64, count=len(revenue))
+	revenue_amount = np.fromiter((flt(r[2]) for r in revenue), dtype=np.float64, count=len(revenue))
+	expense_group = np.fromiter((keys[e[key_col]] for e in expenses), dtype=np.int64, count=len(expenses))
+	expense_amount = np.fromiter((flt(e[2]) for e in expenses), dtype=np.float64, count=len(expenses))
+	# Only maintenance costs are collected today
+	expense_type = np.full(len(expenses), EXPENSE_TYPE_CODES["Maintenance"], dtype=np.int64)
+
+	if commission_rate is not None:
+		rates = np.full(n_groups, flt(commission_rate))
+	else:
+		owner_rates = dict(frappe.get_all("Owner",
+			filters={"name": ["in", list(set(group_owner))]},
+			fields=["name", "commission_rate"],
+			as_list=True
+		))
+		rates = np.array([flt(owner_rates.get(o)) for o in group_owner], dtype=np.float64)
+
+	rules = build_rules_matrix(
+		np.full(n_groups, bool(int(include_maintenance or 0))),
+		np.full(n_groups, bool(int(include_cleaning or 0))),
+		np.full(n_groups, bool(int(include_utilities or 0)))
+	)
+
+	result = settle(
+		n_groups, revenue_group, revenue_amount, expense_group, expense_type, expense_amount,
+		rates, commission_method == COMMISSION_ON_GROSS,
+		ALLOCATION_CODES[expense_allocation_method], rules
+	)
+
+	names = list(keys)
+	rows = []
+	for i in range(n_groups):
+		row = frappe._dict({
+			"property_owner": group_owner[i],
+			"commission_rate": flt(rates[i])
+		})
+		if group_by == "unit":
+			row.property_unit = names[i]
+		for key, values in result.items():
+			if key != "owner_pays":
+				row[key] = flt(values[i], 2)
+		rows.append(row)
+
+	return rows
+
+
+@frappe.whitelist()
+def simulate_settlements(period_start, period_end, owners=None, group_by="owner",
+		commission_rate=None, commission_method=COMMISSION_ON_GROSS,
+		expense_allocation_method=OWNER_PAYS_ALL, include_maintenance=0,
+		include_cleaning=0, include_utilities=0):
+	"""
+	API: what-if settlement run across all owners
+	e.g. simulate_settlements("2025-01-01", "2025-12-31", commission_rate=18)
+	"""
+	frappe.has_permission("Owner Settlement", "read", throw=True)
+
+	if isinstance(owners, str):
+		owners = frappe.parse_json(owners)
+
+	rows = run_bulk_settlement(
+		period_start, period_end, owners=owners, group_by=group_by,
+		commission_rate=commission_rate if commission_rate not in (None, "") else None,
+		commission_method=commission_method,
+		expense_allocation_method=expense_allocation_method,
+		include_maintenance=include_maintenance,
+		include_cleaning=include_cleaning,
+		include_utilities=include_utilities
+	)
+
+	totals = {}
+	for key in ("total_revenue", "total_expenses", "owner_share_expenses",
+			"management_share_expenses", "commission_amount", "net_payable"):
+		totals[key] = flt(sum(r[key] for r in rows), 2)
+
+	return {
+		"rows": rows,
+		"totals": totals
+	}
@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import numpy as np
+
+from hotel_management.hotel_management.doctype.owner_settlement.settlement_engine import (
+    ALLOCATION_CODES,
+    EXPENSE_TYPE_CODES,
+    build_rules_matrix,
+    settle,
+    settle_single,
+)
+
+
+class TestSettlementEngine(unittest.TestCase):
+    def test_on_gross_revenue(self):
+        """Commission is taken from gross revenue"""
+        result = settle_single([1000, 500], ["Maintenance"], [200], 10,
+            "On Gross Revenue", "Owner Pays All")
+        self.assertEqual(result["total_revenue"], 1500)
+        self.assertEqual(result["owner_share_expenses"], 200)
+        self.assertEqual(result["commission_amount"], 150)
+        self.assertEqual(result["net_payable"], 1150)
+
+    def test_on_net_revenue(self):
+        """Commission is taken after owner expenses"""
+        result = settle_single([1000, 500], ["Maintenance"], [200], 10,
+            "On Net Revenue (After Expenses)", "Owner Pays All")
+        self.assertEqual(result["commission_base_amount"], 1300)
+        self.assertEqual(result["commission_amount"], 130)
+        self.assertEqual(result["net_payable"], 1170)
+
+    def test_shared_rules(self):
+        """Shared allocation follows the include_* flags per expense type"""
+        result = settle_single([1000], ["Maintenance", "Cleaning", "Supplies"], [100, 50, 25], 0,
+            "On Gross Revenue", "Shared Based on Rules", include_maintenance=0, include_cleaning=1)
+        self.assertEqual(result["owner_pays"], [False, True, True])
+        self.assertEqual(result["owner_share_expenses"], 75)
+        self.assertEqual(result["management_share_expenses"], 100)
+
+    def test_bulk_matches_single(self):
+        """Grouped settle gives each owner the same numbers as a single run"""
+        maintenance = EXPENSE_TYPE_CODES["Maintenance"]
+        rules = build_rules_matrix([True, False], [True, True], [True, True])
+        result = settle(
+            2,
+            [0, 0, 1], [1000, 500, 800],
+            [0, 1], [maintenance, maintenance], [200, 100],
+            np.array([10, 20]),
+            np.array([True, False]),
+            np.array([ALLOCATION_CODES["Owner Pays All"], ALLOCATION_CODES["Management Pays All"]]),
+            rules
+        )
+        self.assertEqual(result["net_payable"][0], 1150)
+        self.assertEqual(result["net_payable"][1], 640)
+        self.assertEqual(result["management_share_expenses"][1], 100)
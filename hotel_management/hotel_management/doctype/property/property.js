@@ -10,6 +10,14 @@ frappe.ui.form.on('Property', {
 			frm.add_custom_button(__('View Units'), function() {
 				frappe.set_route('List', 'Property Unit', {'property': frm.doc.name});
 			});
+			
+			frm.add_custom_button(__('Provision Units'), function() {
+				provision_units_dialog(frm);
+			});
+			
+			frm.add_custom_button(__('Optimize Room Assignments'), function() {
+				optimize_room_assignments(frm);
+			});
 		}
 	},
 	
@@ -17,4 +25,96 @@ frappe.ui.form.on('Property', {
 		// You can add logic based on property type
 		// For example, show/hide fields based on type
 	}
-});
\ No newline at end of file
+});
+
+function provision_units_dialog(frm) {
+	let dialog = new frappe.ui.Dialog({
+		title: __('Provision Units'),
+		fields: [
+			{fieldname: 'floors', fieldtype: 'Data', label: __('Floors'), reqd: 1, description: __('e.g. 1-6 or G,1,2')},
+			{fieldname: 'rooms', fieldtype: 'Data', label: __('Rooms per Floor'), reqd: 1, description: __('e.g. 1-20')},
+			{fieldname: 'pattern', fieldtype: 'Data', label: __('Unit ID Pattern'), default: '{floor}{room:02d}'},
+			{fieldname: 'unit_type', fieldtype: 'Link', label: __('Unit Type'), options: 'Unit Type', reqd: 1},
+			{fieldname: 'rate_per_night', fieldtype: 'Currency', label: __('Rate per Night'),
+				description: __('Leave empty to use the unit type default rate')},
+			{fieldname: 'column_break_1', fieldtype: 'Column Break'},
+			{fieldname: 'property_owner', fieldtype: 'Link', label: __('Owner'), options: 'Owner', default: frm.doc.property_owner},
+			{fieldname: 'is_owner_managed', fieldtype: 'Check', label: __('Owner Managed')},
+			{fieldname: 'revenue_account', fieldtype: 'Link', label: __('Revenue Account'), options: 'Account'},
+			{fieldname: 'expense_account', fieldtype: 'Link', label: __('Expense Account'), options: 'Account'},
+			{fieldname: 'cost_center', fieldtype: 'Link', label: __('Cost Center'), options: 'Cost Center', default: frm.doc.default_cost_center}
+		],
+		primary_action_label: __('Preview'),
+		primary_action: function(values) {
+			let args = Object.assign({property: frm.doc.name, unit_types: values.unit_type}, values);
+			delete args.unit_type;
+
+			frappe.call({
+				method: 'hotel_management.hotel_management.unit_provisioning.provision_units',
+				args: Object.assign({dry_run: 1}, args),
+				freeze: true,
+				callback: function(r) {
+					if (!r.message) return;
+					let units = r.message.units.map(u => u.unit_id);
+					frappe.confirm(
+						__('Create {0} units ({1} ... {2})?', [units.length, units[0], units[units.length - 1]]),
+						function() {
+							frappe.call({
+								method: 'hotel_management.hotel_management.unit_provisioning.provision_units',
+								args: args,
+								freeze: true,
+								callback: function(res) {
+									if (!res.message) return;
+									dialog.hide();
+									frappe.show_alert({message: __('{0} units created', [res.message.created]), indicator: 'green'});
+									frappe.set_route('List', 'Property Unit', {'property': frm.doc.name});
+								}
+							});
+						}
+					);
+				}
+			});
+		}
+	});
+	dialog.show();
+}
+
+function optimize_room_assignments(frm) {
+	let method = 'hotel_management.hotel_management.room_assignment.optimize_room_assignments';
+	frappe.prompt([
+		{fieldname: 'start_date', fieldtype: 'Date', label: __('From'), default: frappe.datetime.get_today(), reqd: 1},
+		{fieldname: 'days', fieldtype: 'Int', label: __('Days'), default: 90, reqd: 1},
+		{fieldname: 'unit_type', fieldtype: 'Link', label: __('Unit Type'), options: 'Unit Type'}
+	], function(values) {
+		let args = Object.assign({property: frm.doc.name}, values);
+		frappe.call({
+			method: method,
+			args: args,
+			freeze: true,
+			callback: function(r) {
+				let plan = r.message;
+				if (!plan) return;
+				if (!plan.moves.length) {
+					frappe.msgprint(__('No better assignment found ({0} orphan nights)', [plan.orphan_nights_before]));
+					return;
+				}
+				frappe.confirm(
+					__('Move {0} stays ({1} room moves) to cut orphan nights from {2} to {3}?',
+						[plan.moves.length, plan.room_moves, plan.orphan_nights_before, plan.orphan_nights_after]),
+					function() {
+						frappe.call({
+							method: method,
+							args: Object.assign({apply: 1}, args),
+							freeze: true,
+							callback: function(res) {
+								if (res.message && res.message.applied) {
+									frappe.show_alert({message: __('{0} stays reassigned', [res.message.moves.length]), indicator: 'green'});
+								}
+							}
+						});
+					}
+				);
+			}
+		});
+	}, __('Optimize Room Assignments'), __('Preview'));
+}
@@ -26,17 +26,103 @@ class PropertyUnit(Document):
 	
 	def validate_accounts(self):
 		"""Validate accounting fields if Method A is used"""
-		# If revenue_account is set, validate it's an Income account
-		if self.revenue_account:
-			account_type = frappe.db.get_value("Account", self.revenue_account, "account_type")
-			if account_type != "Income Account":
-				frappe.throw(_("Revenue Account must be an Income Account type"))
-		
-		# If expense_account is set, validate it's an Expense account
-		if self.expense_account:
-			account_type = frappe.db.get_value("Account", self.expense_account, "account_type")
-			if account_type != "Expense Account":
-				frappe.throw(_("Expense Account must be an Expense Account type"))
+		validate_unit_accounts(self.revenue_account, self.expense_account)
+
+def validate_unit_accounts(revenue_account=None, expense_account=None):
+	"""Revenue must be an Income account and expense an Expense account (shared with bulk provisioning)"""
+	# If revenue_account is set, validate it's an Income account
+	if revenue_account:
+		account_type = frappe.db.get_value("Account", revenue_account, "account_type")
+		if account_type != "Income Account":
+			frappe.throw(_("Revenue Account must be an Income Account type"))
+	
+	# If expense_account is set, validate it's an Expense account
+	if expense_account:
+		account_type = frappe.db.get_value("Account", expense_account, "account_type")
+		if account_type != "Expense Account":
+			frappe.throw(_("Expense Account must be an Expense Account type"))
+
+def on_doctype_update():
+	"""Indexes for the calendar's filtered, unit_id-ordered row windows and the arrivals grid"""
+	frappe.db.add_index("Property Unit", ["property", "unit_id"])
+	frappe.db.add_index("Property Unit", ["unit_type", "unit_id"])
+	frappe.db.add_index("Property Unit", ["property", "next_arrival_date"])
+
+def refresh_unit_reservation_pointers(units=None):
+	"""
+	Recompute current_reservation / next_reservation / next_arrival_date (all units when None)
+	current: Checked-In, or Confirmed and due in (check-in <= today < check-out)
+	next:    earliest Confirmed stay arriving after today
+	One UPDATE; only units whose pointers changed are written.
+	"""
+	from frappe.utils import today
+	
+	if units is not None and not units:
+		return
+	
+	unit_condition = "AND ru.unit IN %(units)s" if units else ""
+	frappe.db.sql("""
+		UPDATE `tabProperty Unit` pu
+		LEFT JOIN (
+			SELECT unit, reservation FROM (
+				SELECT
+					ru.unit,
+					r.name as reservation,
+					ROW_NUMBER() OVER (
+						PARTITION BY ru.unit
+						ORDER BY r.status = 'Checked-In' DESC, ru.check_in DESC, r.name
+					) as rn
+				FROM `tabReservation Unit` ru
+				JOIN `tabReservation` r ON r.name = ru.parent
+				WHERE r.docstatus = 1
+				AND (
+					r.status = 'Checked-In'
+					OR (r.status = 'Confirmed' AND ru.check_in <= %(today)s AND ru.check_out > %(today)s)
+				)
+				{unit_condition}
+			) ranked
+			WHERE rn = 1
+		) cur ON cur.unit = pu.name
+		LEFT JOIN (
+			SELECT unit, reservation, check_in FROM (
+				SELECT
+					ru.unit,
+					r.name as reservation,
+					ru.check_in,
+					ROW_NUMBER() OVER (PARTITION BY ru.unit ORDER BY ru.check_in, r.name) as rn
+				FROM `tabReservation Unit` ru
+				JOIN `tabReservation` r ON r.name = ru.parent
+				WHERE r.docstatus = 1
+				AND r.status = 'Confirmed'
+				AND ru.check_in > %(today)s
+				{unit_condition}
+			) ranked
+			WHERE rn = 1
+		) nxt ON nxt.unit = pu.name
+		SET
+			pu.current_reservation = cur.reservation,
+			pu.next_reservation = nxt.reservation,
+			pu.next_arrival_date = nxt.check_in
+		WHERE NOT (
+			pu.current_reservation <=> cur.reservation
+			AND pu.next_reservation <=> nxt.reservation
+			AND pu.next_arrival_date <=> nxt.check_in
+		)
+		{pu_condition}
+	""".format(
+		unit_condition=unit_condition,
+		pu_condition="AND pu.name IN %(units)s" if units else ""
+	), {"today": today(), "units": units})
+
+def update_reservation_unit_pointers(doc, method=None):
+	"""doc_event (Reservation): refresh the pointers of its units, including units removed by an amendment"""
+	units = {row.unit for row in doc.get("units_reserved") or [] if row.unit}
+	
+	before = doc.get_doc_before_save() if method == "on_update_after_submit" else None
+	if before:
+		units.update(row.unit for row in before.get("units_reserved") or [] if row.unit)
+	
+	refresh_unit_reservation_pointers(list(units))
 
 @frappe.whitelist()
 def get_unit_reservations(unit_name):
@@ -60,49 +146,139 @@ def get_unit_reservations(unit_name):
 	
 	return reservations
 
+# Per-month redis hash of unit -> JSON stats (month-relative numbers roll over with the key)
+UNIT_STATS_KEY = "hotel_unit_stats"
+UNIT_STATS_TTL = 35 * 24 * 60 * 60
+
+# Most units get_units_stats will return in one call
+UNIT_STATS_MAX_UNITS = 500
+
 @frappe.whitelist()
 def get_unit_stats(unit_name):
 	"""Get statistics for this unit"""
-	from frappe.utils import getdate, today, add_months
+	return get_cached_unit_stats([unit_name])[unit_name]
+
+@frappe.whitelist()
+def get_units_stats(units=None, property=None, property_owner=None):
+	"""
+	Bulk unit statistics for list views and owner screens: {unit: stats}
+	Pass unit names and/or a property / owner; only units the user can read are returned
+	"""
+	if isinstance(units, str):
+		units = frappe.parse_json(units)
 	
-	# Total reservations
-	total_reservations = frappe.db.sql("""
-		SELECT COUNT(DISTINCT r.name) as count
-		FROM `tabReservation` r
-		JOIN `tabReservation Unit` ru ON ru.parent = r.name
-		WHERE ru.unit = %s
-		AND r.docstatus = 1
-	""", (unit_name,), as_dict=1)[0].count or 0
+	filters = {}
+	if units:
+		filters["name"] = ["in", units]
+	if property:
+		filters["property"] = property
+	if property_owner:
+		filters["property_owner"] = property_owner
+	if not filters:
+		frappe.throw(_("Pass units, a property or an owner"))
 	
-	# Total revenue
-	total_revenue = frappe.db.sql("""
-		SELECT SUM(ru.total_amount) as revenue
-		FROM `tabReservation Unit` ru
-		JOIN `tabReservation` r ON r.name = ru.parent
-		WHERE ru.unit = %s
-		AND r.docstatus = 1
-	""", (unit_name,), as_dict=1)[0].revenue or 0
+	names = frappe.get_list("Property Unit", filters=filters, pluck="name",
+		order_by="unit_id asc", limit_page_length=UNIT_STATS_MAX_UNITS)
+	return get_cached_unit_stats(names)
+
+def get_cached_unit_stats(units):
+	"""Stats for many units: one HMGET, then one aggregate query for the misses"""
+	import json
+	
+	if not units:
+		return {}
+	
+	cache = frappe.cache()
+	key = get_unit_stats_key()
+	cached = cache.execute_command("HMGET", key, *units)
+	
+	stats = {}
+	for unit, value in zip(units, cached):
+		if value:
+			stats[unit] = json.loads(value)
+	
+	missing = [unit for unit in units if unit not in stats]
+	if missing:
+		computed = compute_unit_stats(missing)
+		pipe = cache.pipeline()
+		pipe.hset(key, mapping={unit: json.dumps(value) for unit, value in computed.items()})
+		pipe.expire(key, UNIT_STATS_TTL)
+		pipe.execute()
+		stats.update(computed)
+	
+	return stats
+
+def compute_unit_stats(units):
+	"""Reservations, revenue and this month's occupied nights per unit in one grouped query"""
+	from frappe.utils import getdate, today, add_months
 	
-	# Current month occupancy
 	current_month_start = getdate(today()).replace(day=1)
-	next_month_start = add_months(current_month_start, 1)
 	
-	occupied_nights = frappe.db.sql("""
-		SELECT SUM(ru.qty_nights) as nights
+	rows = frappe.db.sql("""
+		SELECT
+			ru.unit,
+			COUNT(DISTINCT r.name) as total_reservations,
+			SUM(ru.total_amount) as total_revenue,
+			SUM(CASE
+				WHEN r.status IN ('Confirmed', 'Checked-In', 'Checked-Out')
+				AND ru.check_in >= %(month_start)s
+				AND ru.check_in < %(next_month_start)s
+				THEN ru.qty_nights ELSE 0
+			END) as occupied_nights_this_month
 		FROM `tabReservation Unit` ru
 		JOIN `tabReservation` r ON r.name = ru.parent
-		WHERE ru.unit = %s
+		WHERE ru.unit IN %(units)s
 		AND r.docstatus = 1
-		AND r.status IN ('Confirmed', 'Checked-In', 'Checked-Out')
-		AND ru.check_in >= %s
-		AND ru.check_in < %s
-	""", (unit_name, current_month_start, next_month_start), as_dict=1)[0].nights or 0
+		GROUP BY ru.unit
+	""", {
+		"units": units,
+		"month_start": current_month_start,
+		"next_month_start": add_months(current_month_start, 1)
+	}, as_dict=1)
 	
-	return {
-		"total_reservations": total_reservations,
-		"total_revenue": total_revenue,
-		"occupied_nights_this_month": occupied_nights
-	}
+	stats = {unit: {
+		"total_reservations": 0,
+		"total_revenue": 0,
+		"occupied_nights_this_month": 0
+	} for unit in units}
+	for row in rows:
+		stats[row.unit] = {
+			"total_reservations": row.total_reservations or 0,
+			"total_revenue": float(row.total_revenue or 0),
+			"occupied_nights_this_month": int(row.occupied_nights_this_month or 0)
+		}
+	return stats
+
+def get_unit_stats_key():
+	from frappe.utils import today
+	return frappe.cache().make_key("{0}|{1}".format(UNIT_STATS_KEY, today()[:7]))
+
+def invalidate_unit_stats(units):
+	units = [unit for unit in units if unit]
+	if units:
+		frappe.cache().execute_command("HDEL", get_unit_stats_key(), *units)
+
+def clear_reservation_unit_stats(doc, method=None):
+	"""doc_event: drop the cached stats of the reservation's units once the change commits"""
+	units = [row.unit for row in doc.get("units_reserved") or [] if row.unit]
+	if not units:
+		return
+	
+	pending = frappe.flags.hotel_unit_stats_stale
+	if pending is None:
+		pending = frappe.flags.hotel_unit_stats_stale = set()
+		frappe.db.after_commit.add(flush_unit_stats_invalidation)
+		frappe.db.after_rollback.add(discard_unit_stats_invalidation)
+	pending.update(units)
+
+def discard_unit_stats_invalidation():
+	frappe.flags.hotel_unit_stats_stale = None
+
+def flush_unit_stats_invalidation():
+	units = frappe.flags.hotel_unit_stats_stale or set()
+	frappe.flags.hotel_unit_stats_stale = None
+	invalidate_unit_stats(list(units))
+
 # في نهاية property_unit.py أضف:
 
 @frappe.whitelist()
@@ -134,156 +310,32 @@ def get_filtered_unit_types(doctype, txt, searchfield, start, page_len, filters)
 # ADD THESE TO THE EXISTING FILE - DO NOT REPLACE THE ENTIRE FILE
 
 @frappe.whitelist()
-def get_unit_history(unit_name):
+def get_unit_history(unit_name, cursor=None, limit=None, union=0):
 	"""
-	Get comprehensive history timeline for a property unit
-	Returns list of events: reservations, check-ins, check-outs, maintenance, cleaning
+	Get comprehensive history timeline for a property unit, newest first
+	Events: reservations, check-ins, check-outs, maintenance, cleaning
+	Returns {events, has_more, next_cursor}; pass next_cursor back to page further into the past.
+	union=1 uses the single UNION ALL query instead of merging the per-source streams.
 	"""
-	history = []
-	
-	# Get all reservations for this unit
-	reservations = frappe.db.sql("""
-		SELECT 
-			r.name,
-			r.check_in,
-			r.check_out,
-			r.status,
-			r.customer,
-			r.primary_guest,
-			r.creation,
-			r.modified
-		FROM `tabReservation` r
-		JOIN `tabReservation Unit` ru ON ru.parent = r.name
-		WHERE ru.unit = %s
-		AND r.docstatus IN (0, 1)
-		ORDER BY r.check_in DESC
-		LIMIT 50
-	""", (unit_name,), as_dict=1)
+	from hotel_management.hotel_management.unit_timeline import get_timeline, get_timeline_union
 	
-	for res in reservations:
-		# Reservation created event
-		history.append({
-			'event_type': 'reservation',
-			'date': res.check_in,
-			'time': '',
-			'title': f'Reservation {res.name}',
-			'details': f'Customer: {res.customer} | Guest: {res.primary_guest}',
-			'reference_doctype': 'Reservation',
-			'reference': res.name
-		})
-		
-		# Check-in event (if status is Checked-In or Checked-Out)
-		if res.status in ['Checked-In', 'Checked-Out']:
-			history.append({
-				'event_type': 'check-in',
-				'date': res.check_in,
-				'time': '',
-				'title': f'Guest Checked In',
-				'details': f'{res.primary_guest} checked in',
-				'reference_doctype': 'Reservation',
-				'reference': res.name
-			})
-		
-		# Check-out event (if status is Checked-Out)
-		if res.status == 'Checked-Out':
-			history.append({
-				'event_type': 'check-out',
-				'date': res.check_out,
-				'time': '',
-				'title': f'Guest Checked Out',
-				'details': f'{res.primary_guest} checked out',
-				'reference_doctype': 'Reservation',
-				'reference': res.name
-			})
-	
-	# Get housekeeping tasks
-	cleaning_tasks = frappe.db.sql("""
-		SELECT 
-			name,
-			task_type,
-			scheduled_date,
-			status,
-			priority,
-			completed_by,
-			completion_date
-		FROM `tabHousekeeping Task`
-		WHERE property_unit = %s
-		ORDER BY scheduled_date DESC
-		LIMIT 30
-	""", (unit_name,), as_dict=1)
-	
-	for task in cleaning_tasks:
-		date_to_use = task.completion_date if task.status == 'Completed' else task.scheduled_date
-		history.append({
-			'event_type': 'cleaning',
-			'date': date_to_use,
-			'time': '',
-			'title': f'{task.task_type} Task - {task.status}',
-			'details': f'Priority: {task.priority}' + (f' | Completed by: {task.completed_by}' if task.completed_by else ''),
-			'reference_doctype': 'Housekeeping Task',
-			'reference': task.name
-		})
-	
-	# Get maintenance requests
-	maintenance = frappe.db.sql("""
-		SELECT 
-			name,
-			issue_type,
-			priority,
-			reported_date,
-			resolution_date,
-			status,
-			resolved_by
-		FROM `tabMaintenance Request`
-		WHERE property_unit = %s
-		ORDER BY reported_date DESC
-		LIMIT 30
-	""", (unit_name,), as_dict=1)
-	
-	for maint in maintenance:
-		date_to_use = maint.resolution_date if maint.status == 'Resolved' else maint.reported_date
-		history.append({
-			'event_type': 'maintenance',
-			'date': date_to_use,
-			'time': '',
-			'title': f'{maint.issue_type} Maintenance - {maint.status}',
-			'details': f'Priority: {maint.priority}' + (f' | Resolved by: {maint.resolved_by}' if maint.resolved_by else ''),
-			'reference_doctype': 'Maintenance Request',
-			'reference': maint.name
-		})
-	
-	# Sort all events by date (newest first)
-	history.sort(key=lambda x: x['date'], reverse=True)
-	
-	# Limit to most recent 50 events
-	return history[:50]
+	if frappe.parse_json(union):
+		return get_timeline_union(unit_name, cursor, limit)
+	return get_timeline(unit_name, cursor, limit)
 
 
 @frappe.whitelist()
 def get_unit_current_reservation(unit_name):
 	"""
 	Get the current active reservation for this unit (if any)
+	Reads the maintained current_reservation pointer - no join over the unit's bookings
 	"""
-	reservation = frappe.db.sql("""
-		SELECT 
-			r.name,
-			r.customer,
-			r.primary_guest,
-			r.check_in,
-			r.check_out,
-			r.status,
-			r.total_amount
-		FROM `tabReservation` r
-		JOIN `tabReservation Unit` ru ON ru.parent = r.name
-		WHERE ru.unit = %s
-		AND r.docstatus = 1
-		AND r.status IN ('Confirmed', 'Checked-In')
-		AND r.check_out >= CURDATE()
-		ORDER BY r.check_in DESC
-		LIMIT 1
-	""", (unit_name,), as_dict=1)
+	reservation = frappe.db.get_value("Property Unit", unit_name, "current_reservation")
+	if not reservation:
+		return None
 	
-	return reservation[0] if reservation else None
+	return frappe.db.get_value("Reservation", reservation,
+		["name", "customer", "primary_guest", "check_in", "check_out", "status", "total_amount"], as_dict=1)
 
 
 @frappe.whitelist()
@@ -292,23 +344,18 @@ def quick_status_change(unit_name, new_status):
 	Quick API to change unit status with validation
 	"""
 	try:
-		unit = frappe.get_doc("Property Unit", unit_name)
+		from hotel_management.hotel_management.unit_status import apply_status_changes, plan_status_changes
 		
-		# Validate status transition
-		valid_statuses = ['Available', 'Booked', 'Occupied', 'Cleaning', 'Maintenance']
-		if new_status not in valid_statuses:
-			frappe.throw(_("Invalid status: {0}").format(new_status))
+		if not frappe.db.exists("Property Unit", unit_name):
+			frappe.throw(_("Property Unit {0} not found").format(unit_name))
 		
-		# Business logic checks
-		if new_status == 'Occupied':
-			# Check if there's an active reservation
-			active_res = get_unit_current_reservation(unit_name)
-			if not active_res:
-				frappe.throw(_("Cannot mark as Occupied: No active reservation found"))
+		# Same transition rules as the bulk status API
+		changes, skipped = plan_status_changes([unit_name], new_status)
+		if skipped:
+			frappe.throw(_("Cannot mark as {0}: {1}").format(new_status, skipped[0]["reason"]))
 		
-		# Update status
-		unit.status = new_status
-		unit.save(ignore_permissions=True)
+		# Update status (logged with the other status changes)
+		apply_status_changes(changes, source="Quick Change")
 		frappe.db.commit()
 		
 		return {
@@ -325,10 +372,11 @@ def quick_status_change(unit_name, new_status):
 
 
 @frappe.whitelist()
-def get_unit_occupancy_calendar(unit_name, start_date, end_date):
+def get_unit_occupancy_calendar(unit_name, start_date, end_date, format=None):
 	"""
 	Get occupancy calendar data for a unit
 	Returns dates with reservation info
+	format="compact": reservations table + run-length encoded per-day reservation index
 	"""
 	from frappe.utils import getdate, add_days
 	
@@ -354,6 +402,10 @@ def get_unit_occupancy_calendar(unit_name, start_date, end_date):
 		ORDER BY ru.check_in
 	""", (unit_name, start_date, end_date, start_date, end_date, start_date, end_date), as_dict=1)
 	
+	from hotel_management.hotel_management.compact_format import is_compact
+	if is_compact(format):
+		return encode_occupancy(reservations, start_date, end_date)
+	
 	# Build daily occupancy map
 	occupancy_map = {}
 	current = getdate(start_date)
@@ -391,4 +443,133 @@ def get_unit_occupancy_calendar(unit_name, start_date, end_date):
 	calendar_data = list(occupancy_map.values())
 	calendar_data.sort(key=lambda x: x['date'])
 	
-	return calendar_data	
\ No newline at end of file
+	return calendar_data	
+
+def encode_occupancy(reservations, start_date, end_date):
+	"""Compact occupancy: each day holds the index of its reservation (-1 = free), run-length encoded"""
+	from frappe.utils import date_diff
+	from hotel_management.hotel_management.compact_format import encode_runs, encode_table
+	
+	days = date_diff(end_date, start_date) + 1
+	state = [-1] * days
+	for index, res in enumerate(reservations):
+		first = max(0, date_diff(res.check_in, start_date))
+		last = min(days, date_diff(res.check_out, start_date))  # checkout day stays free
+		if last > first:
+			state[first:last] = [index] * (last - first)
+	
+	return {
+		"format": "compact",
+		"start": str(start_date),
+		"days": days,
+		"runs": encode_runs(state),
+		"reservations": encode_table(reservations,
+			["name", "primary_guest", "status", "rate_per_night"], dict_columns=("status",))
+	}
+
+# Longest range get_occupancy_matrix will build in one call
+OCCUPANCY_MATRIX_MAX_DAYS = 366
+
+@frappe.whitelist()
+def get_occupancy_matrix(property, start_date, end_date, unit_type=None, floor=None):
+	"""
+	Occupancy of every unit of a property over a date range (units x days)
+	One query for units and their overlapping stays; spans are marked by slicing.
+	
+	Returns a compact payload (decode with hotel_management.compact.decode_matrix):
+		units         - table of name, unit_id, unit_type, floor, status (row order)
+		reservations  - table of name, primary_guest, status, rate_per_night
+		runs          - per unit, run-length encoded reservation index per day (-1 = free)
+		occupied      - occupied units per day
+	"""
+	from frappe.utils import date_diff, getdate
+	from hotel_management.hotel_management.compact_format import encode_row_runs, encode_table
+	from hotel_management.hotel_management.page.hotel_calendar.hotel_calendar import get_unit_conditions
+	
+	if not property:
+		frappe.throw(_("Property is required"))
+	
+	start_date, end_date = getdate(start_date), getdate(end_date)
+	days = date_diff(end_date, start_date) + 1
+	if days < 1:
+		frappe.throw(_("End date must be on or after start date"))
+	if days > OCCUPANCY_MATRIX_MAX_DAYS:
+		frappe.throw(_("Date range cannot exceed {0} days").format(OCCUPANCY_MATRIX_MAX_DAYS))
+	
+	conditions, values = get_unit_conditions(property, unit_type, floor)
+	values.update({"start": start_date, "end": end_date})
+	
+	# Units without stays in the window still come back (LEFT JOIN) so every row is present
+	rows = frappe.db.sql("""
+		SELECT
+			pu.name as unit,
+			pu.unit_id,
+			pu.unit_type,
+			pu.floor,
+			pu.status as unit_status,
+			r.name as reservation,
+			r.primary_guest,
+			r.status,
+			ru.rate_per_night,
+			DATEDIFF(ru.check_in, %(start)s) as start_idx,
+			DATEDIFF(ru.check_out, %(start)s) as end_idx
+		FROM `tabProperty Unit` pu
+		LEFT JOIN (`tabReservation Unit` ru
+			JOIN `tabReservation` r ON r.name = ru.parent
+				AND r.docstatus = 1
+				AND r.status != 'Cancelled')
+			ON ru.unit = pu.name
+			AND ru.check_in <= %(end)s
+			AND ru.check_out > %(start)s
+		WHERE 1=1 {conditions}
+		ORDER BY pu.unit_id, ru.check_in
+	""".format(conditions=conditions), values, as_dict=1)
+	
+	units, reservations, matrix = build_occupancy_matrix(rows, days)
+	
+	return {
+		"format": "compact",
+		"start": str(start_date),
+		"days": days,
+		"units": encode_table(units,
+			["name", "unit_id", "unit_type", "floor", "status"], dict_columns=("unit_type", "floor", "status")),
+		"reservations": encode_table(reservations,
+			["name", "primary_guest", "status", "rate_per_night"], dict_columns=("status",)),
+		"runs": encode_row_runs(matrix),
+		"occupied": (matrix >= 0).sum(axis=0).tolist()
+	}
+
+def build_occupancy_matrix(rows, days):
+	"""
+	Rows of (unit, stay) -> (units, reservations, matrix)
+	matrix[u, d] is the index into reservations of the stay on day d (-1 = free);
+	later check-ins win where stays overlap, the checkout day stays free.
+	"""
+	import numpy as np
+	
+	units, unit_index = [], {}
+	reservations, reservation_index = [], {}
+	spans = []
+	
+	for row in rows:
+		u = unit_index.get(row.unit)
+		if u is None:
+			u = unit_index[row.unit] = len(units)
+			units.append({"name": row.unit, "unit_id": row.unit_id, "unit_type": row.unit_type,
+				"floor": row.floor, "status": row.unit_status})
+		
+		if not row.reservation:
+			continue
+		
+		r = reservation_index.get(row.reservation)
+		if r is None:
+			r = reservation_index[row.reservation] = len(reservations)
+			reservations.append({"name": row.reservation, "primary_guest": row.primary_guest,
+				"status": row.status, "rate_per_night": row.rate_per_night})
+		spans.append((u, max(0, row.start_idx), min(days, row.end_idx), r))
+	
+	matrix = np.full((len(units), days), -1, dtype=np.int32)
+	for u, first, last, r in spans:
+		matrix[u, first:last] = r
+	
+	return units, reservations, matrix
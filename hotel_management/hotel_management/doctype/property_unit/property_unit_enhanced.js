@@ -442,42 +442,13 @@ function create_maintenance_request_quick(frm) {
 }
 
 function view_current_reservation(frm) {
-	frappe.call({
-		method: 'frappe.client.get_list',
-		args: {
-			doctype: 'Reservation Unit',
-			filters: {
-				unit: frm.doc.name,
-				parentfield: 'units_reserved'
-			},
-			fields: ['parent'],
-			limit: 1,
-			order_by: 'creation desc'
-		},
-		callback: function(r) {
-			if (r.message && r.message.length > 0) {
-				const reservation_name = r.message[0].parent;
-				
-				// Check if still active
-				frappe.call({
-					method: 'frappe.client.get',
-					args: {
-						doctype: 'Reservation',
-						name: reservation_name
-					},
-					callback: function(res) {
-						if (res.message && res.message.status !== 'Cancelled' && res.message.status !== 'Checked-Out') {
-							frappe.set_route('Form', 'Reservation', reservation_name);
-						} else {
-							frappe.msgprint(__('No active reservation found for this unit'));
-						}
-					}
-				});
-			} else {
-				frappe.msgprint(__('No reservation found for this unit'));
-			}
-		}
-	});
+	// Pointers are maintained on the unit by reservation events and the night audit
+	const reservation_name = frm.doc.current_reservation || frm.doc.next_reservation;
+	if (reservation_name) {
+		frappe.set_route('Form', 'Reservation', reservation_name);
+	} else {
+		frappe.msgprint(__('No active reservation found for this unit'));
+	}
 }
 
 // ============================================================================
@@ -517,7 +488,21 @@ window.refresh_unit_timeline = function(unit_name) {
 		args: { unit_name: unit_name },
 		callback: function(r) {
 			if (r.message) {
-				render_timeline(r.message);
+				render_timeline(r.message, unit_name);
+			}
+		}
+	});
+};
+
+// Next page of older events, appended below the ones already shown
+window.load_older_unit_history = function(unit_name, cursor) {
+	$('#timeline-load-older button').prop('disabled', true);
+	frappe.call({
+		method: 'hotel_management.hotel_management.doctype.property_unit.property_unit.get_unit_history',
+		args: { unit_name: unit_name, cursor: cursor },
+		callback: function(r) {
+			if (r.message) {
+				render_timeline(r.message, unit_name, true);
 			}
 		}
 	});
@@ -530,8 +515,8 @@ function load_unit_history(frm) {
 			unit_name: frm.doc.name
 		},
 		callback: function(r) {
-			if (r.message && r.message.length > 0) {
-				render_timeline(r.message);
+			if (r.message && r.message.events.length > 0) {
+				render_timeline(r.message, frm.doc.name);
 			} else {
 				$('#timeline-content').html(`
 					<div style="text-align: center; padding: 40px; color: #94a3b8;">
@@ -553,10 +538,10 @@ function load_unit_history(frm) {
 	});
 }
 
-function render_timeline(history) {
+function render_timeline(page, unit_name, append) {
 	let timeline_html = '';
 	
-	history.forEach(function(event, index) {
+	page.events.forEach(function(event, index) {
 		const icon_class = get_timeline_icon_class(event.event_type);
 		const icon = get_timeline_icon(event.event_type);
 		
@@ -580,7 +565,23 @@ function render_timeline(history) {
 		`;
 	});
 	
-	$('#timeline-content').html(timeline_html);
+	$('#timeline-load-older').remove();
+	if (page.has_more) {
+		timeline_html += `
+			<div id="timeline-load-older" style="text-align: center; margin-top: 10px;">
+				<button class="btn btn-xs btn-default"
+					onclick="load_older_unit_history('${unit_name}', '${page.next_cursor}')">
+					${__('Load older')}
+				</button>
+			</div>
+		`;
+	}
+	
+	if (append) {
+		$('#timeline-content').append(timeline_html);
+	} else {
+		$('#timeline-content').html(timeline_html);
+	}
 }
 
 function get_timeline_icon_class(event_type) {
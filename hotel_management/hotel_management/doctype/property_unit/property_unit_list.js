@@ -0,0 +1,86 @@
+// Copyright (c) 2025, VRPnext and contributors
+// For license information, please see license.txt
+
+frappe.listview_settings['Property Unit'] = {
+	add_fields: ["status", "property", "unit_type"],
+
+	onload: function(listview) {
+		listview.page.add_actions_menu_item(__('Change Status'), function() {
+			bulk_change_unit_status(listview.get_checked_items(true), listview);
+		}, false);
+
+		listview.page.add_inner_button(__('Unit Statistics'), function() {
+			// Selected units, or every unit on the current page
+			let units = listview.get_checked_items(true);
+			if (!units.length) units = listview.data.map(d => d.name);
+			if (!units.length) return;
+
+			frappe.call({
+				method: 'hotel_management.hotel_management.doctype.property_unit.property_unit.get_units_stats',
+				args: {units: units},
+				callback: function(r) {
+					if (r.message) show_units_stats(r.message);
+				}
+			});
+		});
+	}
+};
+
+function show_units_stats(stats) {
+	let rows = Object.keys(stats).map(unit => `
+		<tr>
+			<td>${unit}</td>
+			<td class="text-right">${stats[unit].total_reservations}</td>
+			<td class="text-right">${format_currency(stats[unit].total_revenue)}</td>
+			<td class="text-right">${stats[unit].occupied_nights_this_month}</td>
+		</tr>`).join('');
+
+	frappe.msgprint({
+		title: __('Unit Statistics'),
+		wide: true,
+		message: `
+			<table class="table table-bordered">
+				<thead><tr>
+					<th>${__('Unit')}</th>
+					<th class="text-right">${__('Total Reservations')}</th>
+					<th class="text-right">${__('Total Revenue')}</th>
+					<th class="text-right">${__('Nights This Month')}</th>
+				</tr></thead>
+				<tbody>${rows}</tbody>
+			</table>`
+	});
+}
+
+function bulk_change_unit_status(units, listview) {
+	let dialog = new frappe.ui.Dialog({
+		title: __('Change Status of {0} Units', [units.length]),
+		fields: [{
+			fieldname: 'status',
+			fieldtype: 'Select',
+			label: __('New Status'),
+			options: ['Available', 'Booked', 'Occupied', 'Cleaning', 'Maintenance'],
+			reqd: 1
+		}],
+		primary_action_label: __('Update'),
+		primary_action: function(values) {
+			dialog.hide();
+			frappe.call({
+				method: 'hotel_management.hotel_management.unit_status.bulk_set_unit_status',
+				args: {units: units, status: values.status},
+				freeze: true,
+				callback: function(r) {
+					if (!r.message) return;
+					let skipped = r.message.skipped.map(s => `<li>${s.unit}: ${s.reason}</li>`).join('');
+					frappe.msgprint({
+						title: __('Status Updated'),
+						indicator: skipped ? 'orange' : 'green',
+						message: __('{0} units changed to {1}', [r.message.changed.length, values.status])
+							+ (skipped ? `<p>${__('Skipped')}:</p><ul>${skipped}</ul>` : '')
+					});
+					listview.refresh();
+				}
+			});
+		}
+	});
+	dialog.show();
+}
@@ -129,6 +129,53 @@ def get_applicable_rate(property, unit_type, check_in_date):
 		"seasonal_markup": plan.seasonal_markup_percent
 	}
 
+def compile_rate_calendar(property, unit_types, start, days):
+	"""
+	Nightly plan rates for [start, start + days) as {unit_type: float array}
+	Same resolution as get_applicable_rate (highest priority plan, weekend rate
+	on Friday / Saturday, seasonal markup) for every night from one query;
+	nights no plan covers are NaN so callers can fall back to their own default.
+	"""
+	import numpy as np
+	from frappe.utils import add_days
+	
+	start = getdate(start)
+	end = add_days(start, days - 1)
+	calendar = {unit_type: np.full(days, np.nan) for unit_type in unit_types}
+	if not unit_types or days <= 0:
+		return calendar
+	
+	plans = frappe.get_all("Rate Plan",
+		filters={
+			"property": property,
+			"unit_type": ["in", list(unit_types)],
+			"is_active": 1,
+			"valid_from": ["<=", end],
+			"valid_to": [">=", start]
+		},
+		fields=["name", "unit_type", "valid_from", "valid_to", "base_rate", "weekend_rate",
+			"seasonal_markup_percent", "priority", "apply_on_weekends_only"],
+		order_by="priority asc, name desc"
+	)
+	
+	# Friday = 4, Saturday = 5
+	weekend = np.isin((np.arange(days) + start.weekday()) % 7, (4, 5))
+	
+	# Lowest priority first, so higher priority plans paint over it
+	for plan in plans:
+		lo = max((getdate(plan.valid_from) - start).days, 0)
+		hi = min((getdate(plan.valid_to) - start).days + 1, days)
+		nights = np.zeros(days, dtype=bool)
+		nights[lo:hi] = True
+		if plan.apply_on_weekends_only:
+			nights &= weekend
+		
+		markup = 1 + flt(plan.seasonal_markup_percent) / 100
+		rates = np.where(weekend & bool(plan.weekend_rate), flt(plan.weekend_rate), flt(plan.base_rate)) * markup
+		calendar[plan.unit_type][nights] = rates[nights]
+	
+	return calendar
+
 @frappe.whitelist()
 def get_rate_for_reservation(property, unit_type, check_in, check_out):
 	"""
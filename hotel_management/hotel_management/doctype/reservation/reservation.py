@@ -22,11 +22,13 @@ class Reservation(Document):
 	
 	def on_submit(self):
 		"""Called when reservation is confirmed"""
+		self.flags.previous_status = self.status
 		self.db_set('status', 'Confirmed')
 		self.update_unit_statuses("Booked")
 	
 	def on_cancel(self):
 		"""Called on cancellation"""
+		self.flags.previous_status = self.status
 		self.db_set('status', 'Cancelled')
 		self.update_unit_statuses("Available")
 		
@@ -128,7 +130,12 @@ class Reservation(Document):
 				frappe.throw(_("Unit {0} is not available for selected dates").format(unit.unit))
 	
 	def is_unit_available(self, unit, check_in, check_out):
-		"""Check if unit is available for given dates"""
+		"""Check if unit is available for given dates (booked, or held by a waitlist offer)"""
+		from hotel_management.hotel_management.waitlist_matcher import get_held_stays
+		
+		if get_held_stays([unit], check_in, check_out, exclude=self.flags.waitlist_entry):
+			return False
+		
 		overlapping = frappe.db.sql("""
 			SELECT r.name
 			FROM `tabReservation Unit` ru
@@ -223,8 +230,21 @@ class Reservation(Document):
 	
 	def update_unit_statuses(self, status):
 		"""Update status of all reserved units"""
+		from hotel_management.hotel_management.unit_status import set_unit_status
+		
 		for unit in self.units_reserved:
-			frappe.db.set_value("Property Unit", unit.unit, "status", status)
+			set_unit_status(unit.unit, status, reference=self)
+	
+	def change_status(self, status):
+		"""
+		Persist a lifecycle status change on a submitted reservation
+		and notify doc_events listeners via the custom 'on_status_change' event
+		"""
+		self.flags.previous_status = self.status
+		
+		# db_set bypasses the submission lock; bump modified so calendar delta sync sees it
+		self.db_set('status', status)
+		self.run_method("on_status_change")
 	
 	def perform_check_in(self):
 		"""Internal method for check-in"""
@@ -237,8 +257,7 @@ class Reservation(Document):
 		if getdate(today()) < getdate(self.check_in):
 			frappe.throw(_("Cannot check-in before check-in date"))
 		
-		# Use db_set with update_modified=False to bypass submission lock
-		self.db_set('status', 'Checked-In', update_modified=False)
+		self.change_status('Checked-In')
 		self.update_unit_statuses("Occupied")
 		
 		return True
@@ -255,8 +274,7 @@ class Reservation(Document):
 		if not self.sales_invoice:
 			self.create_sales_invoice()
 		
-		# Use db_set with update_modified=False to bypass submission lock
-		self.db_set('status', 'Checked-Out', update_modified=False)
+		self.change_status('Checked-Out')
 		self.update_unit_statuses("Cleaning")
 		
 		# Trigger housekeeping tasks if module exists
@@ -325,6 +343,11 @@ class Reservation(Document):
 			})
 			task.insert(ignore_permissions=True)
 
+def on_doctype_update():
+	"""Composite indexes for guest history and date-window queries"""
+	frappe.db.add_index("Reservation", ["primary_guest", "status", "check_in"])
+	frappe.db.add_index("Reservation", ["status", "check_in"])
+
 # ✅ SOLUTION: Whitelisted wrapper functions outside class
 @frappe.whitelist()
 def check_in_reservation(reservation_name):
@@ -368,8 +391,8 @@ def check_out_reservation(reservation_name):
 		frappe.throw(_("Check-out failed: {0}").format(str(e)))
 
 @frappe.whitelist()
-def get_available_units(property=None, unit_type=None, check_in=None, check_out=None):
-	"""Get available units for given dates"""
+def get_available_units(property=None, unit_type=None, check_in=None, check_out=None, format=None):
+	"""Get available units for given dates (format="compact" for a compact table)"""
 	filters = {"status": "Available"}
 	
 	if property:
@@ -382,9 +405,16 @@ def get_available_units(property=None, unit_type=None, check_in=None, check_out=
 		fields=["name", "unit_id", "unit_type", "rate_per_night", "property", "floor"]
 	)
 	
+	# Units held by an open waitlist offer are not offered to anyone else
+	from hotel_management.hotel_management.waitlist_matcher import get_held_stays
+	held = {row.unit for row in get_held_stays([unit.name for unit in units], check_in, check_out)}
+	
 	# Check availability for each unit
 	available = []
 	for unit in units:
+		if unit.name in held:
+			continue
+		
 		overlapping = frappe.db.sql("""
 			SELECT COUNT(*) as count
 			FROM `tabReservation Unit` ru
@@ -402,6 +432,12 @@ def get_available_units(property=None, unit_type=None, check_in=None, check_out=
 		if overlapping[0].count == 0:
 			available.append(unit)
 	
+	from hotel_management.hotel_management.compact_format import encode_table, is_compact
+	if is_compact(format):
+		return encode_table(available,
+			["name", "unit_id", "unit_type", "rate_per_night", "property", "floor"],
+			dict_columns=("unit_type", "property", "floor"))
+	
 	return available
 
 def update_guest_statistics(guest_id):
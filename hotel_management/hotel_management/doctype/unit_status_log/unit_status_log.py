@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, VRPnext and contributors
+# For license information, please see license.txt
+
+from __future__ import unicode_literals
+import frappe
+from frappe.model.document import Document
+from frappe.utils import now
+
+LOG_FIELDS = [
+	"name", "creation", "modified", "owner", "modified_by",
+	"unit", "property", "from_status", "status", "ts",
+	"source", "reference_doctype", "reference_name"
+]
+
+class UnitStatusLog(Document):
+	pass
+
+def on_doctype_update():
+	"""(unit, ts) answers status-at-time per unit; (property, ts) scans a property's window"""
+	frappe.db.add_index("Unit Status Log", ["unit", "ts"])
+	frappe.db.add_index("Unit Status Log", ["property", "ts"])
+
+def write_status_log(changes, source=None, reference_doctype=None, reference_name=None, ts=None):
+	"""
+	Append one row per status change - rows are never updated
+	changes: iterable of (unit, property, from_status, status)
+	"""
+	changes = list(changes)
+	if not changes:
+		return
+
+	timestamp = now()
+	user = frappe.session.user
+	frappe.db.bulk_insert("Unit Status Log", LOG_FIELDS, [
+		(
+			frappe.generate_hash(length=10), timestamp, timestamp, user, user,
+			unit, property, from_status, status, ts or timestamp,
+			source, reference_doctype, reference_name
+		)
+		for unit, property, from_status, status in changes
+	])
@@ -0,0 +1,41 @@
+// Copyright (c) 2025, VRPnext and contributors
+// For license information, please see license.txt
+
+frappe.ui.form.on('Waitlist', {
+	refresh: function(frm) {
+		if (frm.is_new()) return;
+		
+		// Turn an open offer into a draft reservation
+		if (frm.doc.status === "Offered" && frm.doc.offered_unit) {
+			frm.add_custom_button(__('Create Reservation'), function() {
+				frappe.call({
+					method: 'hotel_management.hotel_management.doctype.waitlist.waitlist.create_reservation_from_offer',
+					args: {
+						waitlist: frm.doc.name
+					},
+					callback: function(r) {
+						if (r.message) {
+							frappe.set_route('Form', 'Reservation', r.message);
+						}
+					}
+				});
+			}).addClass('btn-primary');
+		}
+		
+		if (frm.doc.reservation) {
+			frm.add_custom_button(__('View Reservation'), function() {
+				frappe.set_route('Form', 'Reservation', frm.doc.reservation);
+			});
+		}
+	},
+	
+	property: function(frm) {
+		frm.set_value('unit_type', null);
+	},
+	
+	check_in: function(frm) {
+		if (frm.doc.check_in && !frm.doc.check_out) {
+			frm.set_value('check_out', frappe.datetime.add_days(frm.doc.check_in, 1));
+		}
+	}
+});
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2025, VRPnext and contributors
+# For license information, please see license.txt
+
+from __future__ import unicode_literals
+import frappe
+from frappe.model.document import Document
+from frappe import _
+from frappe.utils import cint, date_diff, get_datetime, getdate, now_datetime, today
+
+class Waitlist(Document):
+	def validate(self):
+		"""Validation before save"""
+		self.validate_dates()
+		self.validate_party_size()
+		self.nights = date_diff(self.check_out, self.check_in)
+	
+	def validate_dates(self):
+		if getdate(self.check_out) <= getdate(self.check_in):
+			frappe.throw(_("Check-out date ({0}) must be after check-in date ({1})")
+				.format(self.check_out, self.check_in))
+		if self.is_new() and getdate(self.check_in) < getdate(today()):
+			frappe.throw(_("Check-in date cannot be in the past"))
+	
+	def validate_party_size(self):
+		if cint(self.party_size) < 1:
+			self.party_size = 1
+		
+		max_occupancy = cint(frappe.db.get_value("Unit Type", self.unit_type, "max_occupancy"))
+		if max_occupancy and cint(self.party_size) > max_occupancy:
+			frappe.throw(_("Unit Type {0} sleeps at most {1} guests")
+				.format(self.unit_type, max_occupancy))
+	
+	def on_update(self):
+		# A new or re-opened request may already fit a free gap
+		if self.status == "Waiting" and (self.is_new() or self.has_value_changed("status")
+				or self.has_value_changed("check_in") or self.has_value_changed("check_out")):
+			from hotel_management.hotel_management.waitlist_matcher import enqueue_waitlist_matching
+			enqueue_waitlist_matching(self.property, self.unit_type)
+
+def on_doctype_update():
+	frappe.db.add_index("Waitlist", ["property", "unit_type", "status", "check_in"])
+	frappe.db.add_index("Waitlist", ["offered_unit", "status"])
+
+@frappe.whitelist()
+def create_reservation_from_offer(waitlist):
+	"""Turn an offered waitlist entry into a draft Reservation on the offered unit"""
+	entry = frappe.get_doc("Waitlist", waitlist)
+	entry.check_permission("write")
+	
+	if entry.status != "Offered" or not entry.offered_unit:
+		frappe.throw(_("Waitlist entry {0} has no open offer").format(entry.name))
+	if entry.offer_expires and get_datetime(entry.offer_expires) <= now_datetime():
+		frappe.throw(_("The offer for waitlist entry {0} expired on {1}").format(entry.name, entry.offer_expires))
+	
+	customer = entry.customer or frappe.db.get_value("Guest", entry.guest, "customer")
+	if not customer:
+		frappe.throw(_("Guest {0} has no Customer").format(entry.guest))
+	
+	reservation = frappe.get_doc({
+		"doctype": "Reservation",
+		"customer": customer,
+		"primary_guest": entry.guest,
+		"check_in": entry.check_in,
+		"check_out": entry.check_out,
+		"units_reserved": [{
+			"unit": entry.offered_unit,
+			"check_in": entry.check_in,
+			"check_out": entry.check_out,
+			"linked_guest": entry.guest
+		}]
+	})
+	# The entry's own hold must not block its booking
+	reservation.flags.waitlist_entry = entry.name
+	reservation.insert()
+	
+	entry.db_set({"status": "Booked", "reservation": reservation.name})
+	return reservation.name
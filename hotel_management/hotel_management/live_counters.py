@@ -0,0 +1,341 @@
+# -*- coding: utf-8 -*-
+"""
+Live Counters
+Per-property operational counts kept in redis and adjusted by status transitions
+Path: hotel_management/hotel_management/live_counters.py
+
+Each property has one redis hash (plus an "__all__" hash for the whole site):
+    units:<status>        Property Units per status
+    in_house              Checked-In reservations
+    arrivals:<date>       Confirmed reservations arriving on <date>
+    departures:<date>     Checked-In reservations leaving on <date>
+    tasks_pending         open Housekeeping Tasks scheduled up to today
+    tasks_overdue         open Housekeeping Tasks scheduled before today
+    maintenance_open      Open / In Progress Maintenance Requests
+
+Doc events compute the old and new contribution of a document and queue the
+difference; deltas are applied with HINCRBY after the transaction commits.
+reconcile_counters() recomputes everything from SQL (hourly and in the night
+audit) to correct drift and roll date-relative counters over midnight;
+arrivals / departures are rebuilt for today and every later date.
+"""
+
+import frappe
+from frappe.utils import getdate, today
+
+COUNTER_KEY = "hotel_counters"
+ALL_PROPERTIES = "__all__"
+
+OPEN_TASK_STATUSES = ("Pending", "In Progress")
+OPEN_MAINTENANCE_STATUSES = ("Open", "In Progress")
+
+
+def get_counter_key(property=None):
+    return frappe.cache().make_key("{0}|{1}".format(COUNTER_KEY, property or ALL_PROPERTIES))
+
+
+# ========================================
+# Reads
+# ========================================
+
+def get_counters(property=None):
+    """All counters of a property (or the whole site) as ints - a single HGETALL"""
+    cache = frappe.cache()
+    raw = cache.execute_command("HGETALL", get_counter_key(property))
+
+    if not raw and not cache.execute_command("EXISTS", get_counter_key(ALL_PROPERTIES)):
+        # Cold cache (redis flushed / first run) - rebuild from SQL once
+        reconcile_counters()
+        raw = cache.execute_command("HGETALL", get_counter_key(property))
+
+    return {frappe.safe_decode(k): int(v) for k, v in (raw or {}).items()}
+
+
+def get_widget_counts(property=None):
+    """Dashboard numbers derived from the counters"""
+    counters = get_counters(property)
+    date = today()
+    return {
+        "available_units": counters.get("units:Available", 0),
+        "in_house": counters.get("in_house", 0),
+        "arrivals": counters.get("arrivals:" + date, 0),
+        "departures": counters.get("departures:" + date, 0),
+        "tasks_pending": counters.get("tasks_pending", 0),
+        "tasks_overdue": counters.get("tasks_overdue", 0),
+        "maintenance_open": counters.get("maintenance_open", 0),
+        "unit_status": {
+            field.split(":", 1)[1]: value
+            for field, value in counters.items() if field.startswith("units:") and value
+        }
+    }
+
+
+# ========================================
+# Writes (after commit)
+# ========================================
+
+def queue_adjustment(property, deltas):
+    """Accumulate deltas for this transaction; applied once it commits"""
+    if not property:
+        return
+
+    pending = frappe.flags.hotel_counter_deltas
+    if pending is None:
+        pending = frappe.flags.hotel_counter_deltas = {}
+        frappe.db.after_commit.add(apply_queued_adjustments)
+        frappe.db.after_rollback.add(discard_queued_adjustments)
+
+    totals = pending.setdefault(property, {})
+    for field, delta in deltas.items():
+        totals[field] = totals.get(field, 0) + delta
+
+
+def discard_queued_adjustments():
+    """After rollback: the deltas never happened, and the next transaction needs a fresh batch"""
+    frappe.flags.hotel_counter_deltas = None
+
+
+def apply_queued_adjustments():
+    pending = frappe.flags.hotel_counter_deltas or {}
+    frappe.flags.hotel_counter_deltas = None
+
+    pipe = frappe.cache().pipeline()
+    for property, deltas in pending.items():
+        for field, delta in deltas.items():
+            if delta:
+                pipe.hincrby(get_counter_key(property), field, delta)
+                pipe.hincrby(get_counter_key(ALL_PROPERTIES), field, delta)
+    pipe.execute()
+
+
+def diff(old, new):
+    """new - old, per field"""
+    deltas = dict(new)
+    for field, value in old.items():
+        deltas[field] = deltas.get(field, 0) - value
+    return {field: value for field, value in deltas.items() if value}
+
+
+def get_unit_property(unit):
+    return frappe.db.get_value("Property Unit", unit, "property") if unit else None
+
+
+# ========================================
+# Transitions (doc_events)
+# ========================================
+
+def reservation_contribution(status, check_in, check_out):
+    if status == "Confirmed":
+        return {"arrivals:" + str(getdate(check_in)): 1}
+    if status == "Checked-In":
+        return {"in_house": 1, "departures:" + str(getdate(check_out)): 1}
+    return {}
+
+
+def on_reservation_transition(doc, method=None):
+    """doc_event: on_submit / on_cancel / on_status_change"""
+    old_status = None if method == "on_submit" else doc.flags.get("previous_status")
+    deltas = diff(
+        reservation_contribution(old_status, doc.check_in, doc.check_out),
+        reservation_contribution(doc.status, doc.check_in, doc.check_out)
+    )
+    if not deltas:
+        return
+
+    units = [row.unit for row in doc.get("units_reserved") or [] if row.unit]
+    properties = frappe.get_all("Property Unit",
+        filters={"name": ["in", units]}, pluck="property", distinct=True) if units else []
+    for property in properties:
+        queue_adjustment(property, deltas)
+
+
+def task_contribution(doc):
+    if not doc or doc.status not in OPEN_TASK_STATUSES or not doc.scheduled_date:
+        return {}
+    scheduled = getdate(doc.scheduled_date)
+    current = getdate(today())
+    contribution = {}
+    if scheduled <= current:
+        contribution["tasks_pending"] = 1
+    if scheduled < current:
+        contribution["tasks_overdue"] = 1
+    return contribution
+
+
+def maintenance_contribution(doc):
+    if not doc or doc.status not in OPEN_MAINTENANCE_STATUSES:
+        return {}
+    return {"maintenance_open": 1}
+
+
+def unit_contribution(doc):
+    if not doc or not doc.status:
+        return {}
+    return {"units:" + doc.status: 1}
+
+
+CONTRIBUTIONS = {
+    "Housekeeping Task": (task_contribution, "property_unit"),
+    "Maintenance Request": (maintenance_contribution, "property_unit"),
+    "Property Unit": (unit_contribution, None),
+}
+
+
+def on_doc_transition(doc, method=None):
+    """doc_event: on_update (inserts included) / on_trash for tasks, requests and units"""
+    contribution, unit_field = CONTRIBUTIONS[doc.doctype]
+    deleted = method in ("on_trash", "after_delete")
+    before = doc if deleted else doc.get_doc_before_save()
+    after = None if deleted else doc
+
+    def property_of(d):
+        if not d:
+            return None
+        return get_unit_property(d.get(unit_field)) if unit_field else d.property
+
+    old_property, new_property = property_of(before), property_of(after)
+    old, new = contribution(before), contribution(after)
+
+    if old_property == new_property:
+        if old_property:
+            queue_adjustment(old_property, diff(old, new))
+        return
+
+    queue_adjustment(old_property, diff(old, {}))
+    queue_adjustment(new_property, diff({}, new))
+
+
+# ========================================
+# Reconciliation
+# ========================================
+
+def compute_counter_truth():
+    """Exact counters for every property from four grouped queries"""
+    values = {"today": today()}
+    truth = {}
+
+    def add(property, field, value):
+        if property and value:
+            truth.setdefault(property, {})[field] = int(value)
+
+    for property, status, count in frappe.db.sql("""
+        SELECT property, status, COUNT(*)
+        FROM `tabProperty Unit`
+        GROUP BY property, status
+    """):
+        add(property, "units:" + (status or ""), count)
+
+    for property, count in frappe.db.sql("""
+        SELECT pu.property, COUNT(DISTINCT r.name)
+        FROM `tabReservation` r
+        JOIN `tabReservation Unit` ru ON ru.parent = r.name
+        JOIN `tabProperty Unit` pu ON pu.name = ru.unit
+        WHERE r.docstatus = 1 AND r.status = 'Checked-In'
+        GROUP BY pu.property
+    """):
+        add(property, "in_house", count)
+
+    # Transitions adjust the counter of the reservation's own date, however far ahead
+    for property, counter, date, count in frappe.db.sql("""
+        SELECT pu.property, 'arrivals', r.check_in, COUNT(DISTINCT r.name)
+        FROM `tabReservation` r
+        JOIN `tabReservation Unit` ru ON ru.parent = r.name
+        JOIN `tabProperty Unit` pu ON pu.name = ru.unit
+        WHERE r.docstatus = 1 AND r.status = 'Confirmed' AND r.check_in >= %(today)s
+        GROUP BY pu.property, r.check_in
+
+        UNION ALL
+
+        SELECT pu.property, 'departures', r.check_out, COUNT(DISTINCT r.name)
+        FROM `tabReservation` r
+        JOIN `tabReservation Unit` ru ON ru.parent = r.name
+        JOIN `tabProperty Unit` pu ON pu.name = ru.unit
+        WHERE r.docstatus = 1 AND r.status = 'Checked-In' AND r.check_out >= %(today)s
+        GROUP BY pu.property, r.check_out
+    """, values):
+        add(property, "{0}:{1}".format(counter, getdate(date)), count)
+
+    for property, field, count in frappe.db.sql("""
+        SELECT pu.property, 'tasks_pending', COUNT(*)
+        FROM `tabHousekeeping Task` x
+        JOIN `tabProperty Unit` pu ON pu.name = x.property_unit
+        WHERE x.status IN %(tasks)s AND x.scheduled_date <= %(today)s
+        GROUP BY pu.property
+
+        UNION ALL
+
+        SELECT pu.property, 'tasks_overdue', COUNT(*)
+        FROM `tabHousekeeping Task` x
+        JOIN `tabProperty Unit` pu ON pu.name = x.property_unit
+        WHERE x.status IN %(tasks)s AND x.scheduled_date < %(today)s
+        GROUP BY pu.property
+
+        UNION ALL
+
+        SELECT pu.property, 'maintenance_open', COUNT(*)
+        FROM `tabMaintenance Request` x
+        JOIN `tabProperty Unit` pu ON pu.name = x.property_unit
+        WHERE x.status IN %(maintenance)s
+        GROUP BY pu.property
+    """, dict(values, tasks=OPEN_TASK_STATUSES, maintenance=OPEN_MAINTENANCE_STATUSES)):
+        add(property, field, count)
+
+    totals = {}
+    for counters in truth.values():
+        for field, value in counters.items():
+            totals[field] = totals.get(field, 0) + value
+    truth[ALL_PROPERTIES] = totals
+
+    return truth
+
+
+def reconcile_counters():
+    """
+    Replace the cached counters with SQL truth and report drift
+    Arrival / departure counters for past dates are dropped; today's and
+    later ones are rebuilt, so forward-dated counts survive the rewrite.
+    """
+    truth = compute_counter_truth()
+    cache = frappe.cache()
+    date = today()
+
+    def compared(field):
+        # Past days' arrival / departure counters are not reconciled
+        return not field.startswith(("arrivals:", "departures:")) or field.split(":", 1)[1] >= date
+
+    existing = [frappe.safe_decode(k) for k in cache.scan_iter(match=get_counter_key("*"))]
+
+    drift = {}
+    pipe = cache.pipeline()
+    for key in existing:
+        property = key.rsplit("|", 1)[-1]
+        if property not in truth:
+            current = cache.execute_command("HGETALL", key) or {}
+            stale = {frappe.safe_decode(k): (int(v), 0) for k, v in current.items()
+                if int(v) and compared(frappe.safe_decode(k))}
+            if stale:
+                drift[property] = stale
+            pipe.delete(key)
+
+    for property, counters in truth.items():
+        key = get_counter_key(property)
+        current = {frappe.safe_decode(k): int(v)
+            for k, v in (cache.execute_command("HGETALL", key) or {}).items()}
+
+        changed = {
+            field: (current.get(field, 0), counters.get(field, 0))
+            for field in set(current) | set(counters)
+            if compared(field) and current.get(field, 0) != counters.get(field, 0)
+        }
+        if changed:
+            drift[property] = changed
+
+        pipe.delete(key)
+        if counters:
+            pipe.hset(key, mapping=counters)
+    pipe.execute()
+
+    if drift:
+        frappe.logger().info(f"Hotel counters reconciled, drift corrected: {drift}")
+
+    return drift
@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""
+Night Audit
+Daily end-of-day job that re-settles derived hotel data
+Path: hotel_management/hotel_management/night_audit.py
+"""
+
+import frappe
+
+
+def run_night_audit():
+    """
+    Scheduled daily (see hooks.scheduler_events)
+    Each step is isolated so one failure does not block the others
+    """
+    steps = [
+        "hotel_management.hotel_management.doctype.hotel_daily_kpi.hotel_daily_kpi.refresh_recent_kpis",
+        "hotel_management.hotel_management.doctype.property_unit.property_unit.refresh_unit_reservation_pointers",
+        "hotel_management.hotel_management.unit_status.reconcile_unit_statuses",
+        "hotel_management.hotel_management.waitlist_matcher.run_waitlist_matching",
+        "hotel_management.hotel_management.live_counters.reconcile_counters",
+        "hotel_management.hotel_management.doctype.calendar_tombstone.calendar_tombstone.purge_tombstones",
+    ]
+
+    for step in steps:
+        try:
+            frappe.get_attr(step)()
+            frappe.db.commit()
+        except Exception:
+            frappe.db.rollback()
+            frappe.log_error(frappe.get_traceback(), f"Night Audit Step Failed - {step}")
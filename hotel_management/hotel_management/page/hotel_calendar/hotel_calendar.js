@@ -42,6 +42,10 @@ class HotelCalendar {
 		this.page = page;
 		this.wrapper = $(wrapper);
 		this.view_mode = 'Day';
+		this.filters = {};
+		this.row_height = 42;
+		this.page_size = 50;
+		this.reset_rows();
 		this.init();
 	}
 
@@ -71,7 +75,7 @@ class HotelCalendar {
 							</div>
 						</div>
 					</div>
-					<div id="calendar-grid-container" style="background: white; border: 1px solid #d1d8dd; border-radius: 4px; overflow: auto; min-height: 500px;">
+					<div id="calendar-grid-container" style="background: white; border: 1px solid #d1d8dd; border-radius: 4px; overflow: auto; min-height: 500px; height: calc(100vh - 260px);">
 						<div style="padding: 40px; text-align: center; color: #888;">Initializing Grid...</div>
 					</div>
 				</div>
@@ -81,6 +85,7 @@ class HotelCalendar {
 			this.setup_page_actions();
 			this.load_data();
 			this.bind_events();
+			this.subscribe_to_changes();
 		} catch (e) {
 			console.error("HotelCalendar UI Init Error:", e);
 		}
@@ -88,7 +93,25 @@ class HotelCalendar {
 
 	setup_page_actions() {
 		this.page.set_primary_action(__('New Reservation'), () => frappe.new_doc('Reservation'));
-		this.page.add_inner_button(__('Refresh'), () => this.load_data());
+		this.page.add_inner_button(__('Refresh'), () => this.sync_changes());
+		this.page.add_inner_button(__('Reload'), () => this.load_data());
+
+		// Row filters - each change reloads the row window from the top
+		[
+			{fieldname: 'property', label: __('Property'), fieldtype: 'Link', options: 'Property'},
+			{fieldname: 'unit_type', label: __('Unit Type'), fieldtype: 'Link', options: 'Unit Type'},
+			{fieldname: 'floor', label: __('Floor'), fieldtype: 'Data'}
+		].forEach(df => {
+			this.page.add_field(Object.assign({}, df, {
+				change: () => {
+					let value = this.page.fields_dict[df.fieldname].get_value() || null;
+					if (this.filters[df.fieldname] === value) return;
+					this.filters[df.fieldname] = value;
+					if (df.fieldname === 'property') this.update_subscription();
+					this.load_data();
+				}
+			}));
+		});
 	}
 
 	bind_events() {
@@ -103,109 +126,310 @@ class HotelCalendar {
 			let date = $(this).attr('data-date');
 			if (unit && date) me.open_booking_form(unit, date);
 		});
+
+		// Virtual scrolling: redraw the visible slice, fetch more rows near the end
+		// Catch up cheaply when the tab comes back
+		document.addEventListener('visibilitychange', () => {
+			if (!document.hidden) this.sync_changes();
+		});
+
+		this.wrapper.find('#calendar-grid-container').on('scroll', () => {
+			if (this.scroll_frame) return;
+			this.scroll_frame = requestAnimationFrame(() => {
+				this.scroll_frame = null;
+				this.render_rows();
+			});
+		});
+	}
+
+	subscribe_to_changes() {
+		// Reservation deltas pushed by hotel_management.realtime (already debounced server-side)
+		frappe.realtime.on('hotel_property_changes', (data) => {
+			if (!data || !this.events || data.property !== this.filters.property) return;
+			(data.changes || []).forEach(change => this.apply_change(change));
+		});
+		frappe.realtime.on('hotel_changes', (data) => {
+			if (!data || !this.events || this.filters.property) return;
+			(data.changes || []).forEach(change => this.apply_change(change));
+		});
+		this.update_subscription();
+	}
+
+	update_subscription() {
+		// One property -> its own room; no property filter -> the all-properties feed
+		let property = this.filters.property || null;
+		if (this.subscribed_property === property) return;
+
+		if (this.subscribed_property) {
+			frappe.realtime.doc_unsubscribe('Property', this.subscribed_property);
+		} else if (this.subscribed_property === null) {
+			frappe.realtime.doctype_unsubscribe('Property');
+		}
+
+		if (property) {
+			frappe.realtime.doc_subscribe('Property', property);
+		} else {
+			frappe.realtime.doctype_subscribe('Property');
+		}
+		this.subscribed_property = property;
+	}
+
+	apply_change(change) {
+		if (change.type === 'reservation') {
+			this.events = this.events.filter(e => e.id !== change.name);
+			if (!change.removed) {
+				// Only rows already loaded; others arrive with their page
+				this.events = this.events.concat((change.events || []).filter(e => this.loaded_units[e.unit]));
+			}
+			this.index_events();
+		} else if (change.type === 'unit' && this.units) {
+			let unit = this.units.find(u => u.name === change.name);
+			if (unit) unit.status = change.status;
+		} else {
+			return;
+		}
+		this.schedule_render();
+	}
+
+	schedule_render() {
+		// Several deltas in a row -> one redraw
+		clearTimeout(this.render_timer);
+		this.render_timer = setTimeout(() => this.render_rows(), 250);
+	}
+
+	reset_rows() {
+		this.units = [];
+		this.events = [];
+		this.events_by_unit = {};
+		this.loaded_units = {};
+		this.total = 0;
+		this.has_more = true;
+		this.next_after = null;
+		this.cursor = null;
+		this.etag = null;
+		this.loading = false;
+		this.request_id = (this.request_id || 0) + 1;
 	}
 
 	load_data() {
+		this.reset_rows();
+		this.wrapper.find('#calendar-grid-container').scrollTop(0);
+		this.fetch_rows();
+	}
+
+	get_range() {
+		let today = frappe.datetime.get_today();
+		return {
+			start: frappe.datetime.add_months(today, -1),
+			end: frappe.datetime.add_months(today, 3)
+		};
+	}
+
+	fetch_rows() {
+		// One page of units plus the bookings for just those units
+		if (this.loading || !this.has_more) return;
+		this.loading = true;
+		let request_id = this.request_id;
+
 		frappe.call({
-			method: 'hotel_management.hotel_management.page.hotel_calendar.hotel_calendar.get_units',
+			method: 'hotel_management.hotel_management.page.hotel_calendar.hotel_calendar.get_calendar_window',
+			args: Object.assign({}, this.get_range(), this.filters, {
+				after: this.next_after,
+				limit: this.page_size,
+				format: 'compact'
+			}),
 			callback: (r) => {
-				this.units = r.message || [];
-				this.fetch_events();
-			}
+				// Filters changed while this page was in flight
+				if (request_id !== this.request_id) return;
+				this.loading = false;
+
+				let window = r.message || {};
+				if (window.total !== undefined) this.total = window.total;
+				// Earliest page cursor - later syncs must not skip anything
+				if (!this.cursor) this.cursor = window.cursor;
+				(window.units || []).forEach(u => { this.loaded_units[u.name] = true; });
+				this.units = this.units.concat(window.units || []);
+				this.events = this.events.concat(hotel_management.compact.decode_table(window.events) || []);
+				this.has_more = !!window.has_more;
+				this.next_after = window.next_after;
+				this.index_events();
+
+				if (!this.grid_rendered) {
+					this.render_grid();
+				} else {
+					this.render_rows();
+				}
+			},
+			error: () => { this.loading = false; }
 		});
 	}
 
-	fetch_events() {
-		let today = frappe.datetime.get_today();
+	sync_changes() {
+		// Delta refresh: only bookings changed since the last cursor, plus removals
+		if (!this.cursor) return this.load_data();
+		let request_id = this.request_id;
+
 		frappe.call({
 			method: 'hotel_management.hotel_management.page.hotel_calendar.hotel_calendar.get_calendar_events',
-			args: {
-				start: frappe.datetime.add_months(today, -1),
-				end: frappe.datetime.add_months(today, 3)
-			},
+			args: Object.assign({}, this.get_range(), this.filters, {
+				since: this.cursor,
+				etag: this.etag,
+				format: 'compact'
+			}),
 			callback: (r) => {
-				this.events = r.message || [];
-				this.render_grid();
+				if (request_id !== this.request_id) return;
+				let delta = r.message || {};
+				if (delta.not_modified) return;
+				if (delta.reset) return this.load_data();
+
+				let changed = {};
+				(delta.changed || []).forEach(name => { changed[name] = true; });
+				(delta.removed || []).forEach(row => {
+					if (!row.unit) changed[row.reservation] = true;
+				});
+				let removed_rows = {};
+				(delta.removed || []).forEach(row => {
+					if (row.unit) removed_rows[row.reservation + '::' + row.unit] = true;
+				});
+
+				this.events = this.events
+					.filter(e => !changed[e.id] && !removed_rows[e.id + '::' + e.unit])
+					.concat((hotel_management.compact.decode_table(delta.events) || []).filter(e => this.loaded_units[e.unit]));
+
+				this.cursor = delta.cursor;
+				this.etag = delta.etag;
+				this.index_events();
+				this.schedule_render();
 			}
 		});
 	}
 
-	render_grid() {
-		let container = this.wrapper.find('#calendar-grid-container');
-		if (!container.length) return;
-		container.empty();
+	index_events() {
+		this.events_by_unit = {};
+		this.events.forEach(e => {
+			(this.events_by_unit[e.unit] = this.events_by_unit[e.unit] || []).push(e);
+		});
+	}
 
+	get_dates() {
 		let today = frappe.datetime.get_today();
 		let days = (this.view_mode === 'Week') ? 60 : (this.view_mode === 'Month' ? 90 : 30);
-		let cell_w = (this.view_mode === 'Week') ? "45px" : (this.view_mode === 'Month' ? "35px" : "55px");
-
 		let dates = [];
 		let start = frappe.datetime.add_days(today, -2);
 		for (let i = 0; i < days; i++) {
 			dates.push(frappe.datetime.add_days(start, i));
 		}
+		return dates;
+	}
+
+	render_grid() {
+		let container = this.wrapper.find('#calendar-grid-container');
+		if (!container.length) return;
+		container.empty();
+
+		let today = frappe.datetime.get_today();
+		let cell_w = (this.view_mode === 'Week') ? "45px" : (this.view_mode === 'Month' ? "35px" : "55px");
+		this.dates = this.get_dates();
 
 		let html = `<table class="table table-bordered" style="table-layout: fixed; width: auto; min-width: 100%; margin-bottom: 0;">
 			<thead>
 				<tr>
-					<th style="width: 160px; position: sticky; left: 0; background: #f8f9fa; z-index: 30; border-right: 2px solid #ddd;">Unit</th>`;
+					<th style="width: 160px; position: sticky; left: 0; top: 0; background: #f8f9fa; z-index: 40; border-right: 2px solid #ddd;">Unit</th>`;
 
-		dates.forEach(d => {
+		this.dates.forEach(d => {
 			let is_today = (d === today);
 			let day_name = moment(d).format('ddd');
 			let day_num = d.split('-')[2];
-			let bg = is_today ? 'background-color: #fff9c4;' : '';
+			let bg = is_today ? 'background-color: #fff9c4;' : 'background-color: #f8f9fa;';
 			let content = (this.view_mode === 'Month') ? day_num : `${day_name}<br>${day_num}`;
-			html += `<th style="${bg} width: ${cell_w}; min-width: ${cell_w}; text-align: center; font-size: 11px; padding: 5px;">${content}</th>`;
-		});
-
-		html += `</tr></thead><tbody>`;
-
-		this.units.forEach(unit => {
-			html += `<tr>`;
-			html += `<td style="position: sticky; left: 0; background: #fff; z-index: 20; font-weight: bold; border-right: 2px solid #ddd; cursor: pointer; color: var(--primary); white-space: nowrap; overflow: hidden; text-overflow: ellipsis;" 
-				onclick="frappe.set_route('Form', 'Property Unit', '${unit.name}')">
-				${unit.unit_id} 
-				<div class="text-muted" style="font-size: 10px;">${unit.unit_type}</div>
-			</td>`;
-
-			let skip = 0;
-			for (let i = 0; i < dates.length; i++) {
-				if (skip > 0) { skip--; continue; }
-				let d = dates[i];
-				let booking = this.events.find(e => e.unit === unit.name && d >= e.start && d < e.end);
-
-				if (booking) {
-					let span = 0;
-					while (i + span < dates.length && dates[i + span] < booking.end) span++;
-					skip = span - 1;
-
-					let color = "#3498db";
-					if (booking.status === 'Checked-In') color = "#e74c3c";
-					if (booking.status === 'Confirmed') color = "#2ecc71";
-					if (booking.status === 'Checked-Out') color = "#95a5a6";
-
-					// Format: Name (ID) or just ID
-					let display = (booking.display_label) ? `${booking.display_label} (${booking.id})` : booking.id;
-
-					html += `<td colspan="${span}" style="background-color: ${color}; color: white; border: 1px solid white; cursor: pointer; padding: 2px 5px; font-size: 10px; vertical-align: middle;" 
-							onclick="frappe.set_route('Form', 'Reservation', '${booking.id}')" title="${display}">
-							<div style="overflow: hidden; white-space: nowrap; text-overflow: ellipsis;">${display}</div>
-						</td>`;
-				} else {
-					html += `<td class="clickable-cell" data-unit="${unit.name}" data-date="${d}" style="cursor: pointer;"></td>`;
-				}
-			}
-			html += `</tr>`;
+			html += `<th style="${bg} position: sticky; top: 0; z-index: 30; width: ${cell_w}; min-width: ${cell_w}; text-align: center; font-size: 11px; padding: 5px;">${content}</th>`;
 		});
 
-		html += `</tbody></table>`;
+		html += `</tr></thead><tbody></tbody></table>`;
 		container.html(html);
+		this.grid_rendered = true;
+		this.render_rows();
 
 		// Highlight active view button
 		this.wrapper.find(`.view-modes button[data-view="${this.view_mode}"]`).addClass('active').siblings().removeClass('active');
 	}
 
+	render_rows() {
+		// Render only the rows in (and just around) the viewport; spacers keep the scrollbar honest
+		let container = this.wrapper.find('#calendar-grid-container');
+		let tbody = container.find('tbody');
+		if (!tbody.length) return;
+
+		let buffer = 10;
+		let total_rows = Math.max(this.total, this.units.length);
+		let first = Math.max(0, Math.floor(container.scrollTop() / this.row_height) - buffer);
+		let visible = Math.ceil(container.height() / this.row_height) + 2 * buffer;
+		let last = Math.min(this.units.length, first + visible);
+		let colspan = this.dates.length + 1;
+
+		let html = '';
+		if (first > 0) {
+			html += `<tr style="height: ${first * this.row_height}px;"><td colspan="${colspan}" style="padding: 0; border: none;"></td></tr>`;
+		}
+		for (let i = first; i < last; i++) {
+			html += this.render_row(this.units[i]);
+		}
+		if (total_rows > last) {
+			html += `<tr style="height: ${(total_rows - last) * this.row_height}px;"><td colspan="${colspan}" style="padding: 0; border: none;"></td></tr>`;
+		}
+		if (!this.units.length && !this.has_more) {
+			html = `<tr><td colspan="${colspan}" style="padding: 40px; text-align: center; color: #888;">${__('No units match these filters')}</td></tr>`;
+		}
+		tbody.html(html);
+
+		// Close to the end of what is loaded - fetch the next page of rows
+		if (first + visible >= this.units.length - buffer) {
+			this.fetch_rows();
+		}
+	}
+
+	render_row(unit) {
+		let dates = this.dates;
+		let bookings = this.events_by_unit[unit.name] || [];
+
+		let html = `<tr style="height: ${this.row_height}px;">`;
+		html += `<td style="position: sticky; left: 0; background: #fff; z-index: 20; font-weight: bold; border-right: 2px solid #ddd; cursor: pointer; color: var(--primary); white-space: nowrap; overflow: hidden; text-overflow: ellipsis;" 
+			onclick="frappe.set_route('Form', 'Property Unit', '${unit.name}')">
+			${unit.unit_id} 
+			<div class="text-muted" style="font-size: 10px;">${unit.unit_type}</div>
+		</td>`;
+
+		let skip = 0;
+		for (let i = 0; i < dates.length; i++) {
+			if (skip > 0) { skip--; continue; }
+			let d = dates[i];
+			let booking = bookings.find(e => d >= e.start && d < e.end);
+
+			if (booking) {
+				let span = 0;
+				while (i + span < dates.length && dates[i + span] < booking.end) span++;
+				skip = span - 1;
+
+				let color = "#3498db";
+				if (booking.status === 'Checked-In') color = "#e74c3c";
+				if (booking.status === 'Confirmed') color = "#2ecc71";
+				if (booking.status === 'Checked-Out') color = "#95a5a6";
+
+				// Format: Name (ID) or just ID
+				let display = (booking.display_label) ? `${booking.display_label} (${booking.id})` : booking.id;
+
+				html += `<td colspan="${span}" style="background-color: ${color}; color: white; border: 1px solid white; cursor: pointer; padding: 2px 5px; font-size: 10px; vertical-align: middle;" 
+						onclick="frappe.set_route('Form', 'Reservation', '${booking.id}')" title="${display}">
+						<div style="overflow: hidden; white-space: nowrap; text-overflow: ellipsis;">${display}</div>
+					</td>`;
+			} else {
+				html += `<td class="clickable-cell" data-unit="${unit.name}" data-date="${d}" style="cursor: pointer;"></td>`;
+			}
+		}
+		html += `</tr>`;
+		return html;
+	}
+
 	open_booking_form(unit, date) {
 		frappe.new_doc('Reservation', {
 			check_in: date,
@@ -3,16 +3,85 @@
 # For license information, please see license.txt
 
 from __future__ import unicode_literals
+import hashlib
+import json
+
 import frappe
-from frappe.utils import add_days, getdate, today
+from frappe.utils import add_days, cint, get_datetime, getdate, now_datetime, today
 from frappe import _
 
+# Unit rows per calendar page request
+CALENDAR_PAGE_SIZE = 50
+
 @frappe.whitelist()
-def get_calendar_events(start, end):
+def get_calendar_events(start, end, units=None, property=None, unit_type=None, floor=None, since=None, etag=None, format=None):
     """
     Fetch bookings for the calendar.
     Standardized according to Frappe guidelines.
+    Pass `units` (the visible rows) or unit filters to avoid loading every booking.
+    
+    Plain calls return the list of events. With `etag` and/or `since` the
+    response is a dict carrying a new `cursor` and `etag`:
+        - window unchanged (etag / If-None-Match matches) -> not_modified (HTTP 304)
+        - since given -> only bookings changed after the cursor plus removals
+          from the tombstone log; reset=True when the cursor is too old
+    format="compact" returns events as a compact table (see compact_format)
     """
+    if isinstance(units, str):
+        units = frappe.parse_json(units)
+    
+    scope = get_event_scope(units, property, unit_type, floor)
+    if scope is None:
+        empty = encode_events([], format)
+        return empty if not (since or etag) else {"events": empty, "changed": [], "removed": [], "cursor": None, "etag": None}
+    
+    conditions, values = scope
+    values.update({"start": start, "end": end})
+    
+    if not (since or etag):
+        return encode_events(query_events(conditions, values), format)
+    
+    cursor = get_sync_cursor()
+    window_etag = get_window_etag(conditions, values)
+    
+    if window_etag in (etag, frappe.get_request_header("If-None-Match")):
+        return not_modified(window_etag)
+    set_etag_header(window_etag)
+    
+    if not since:
+        return {"cursor": cursor, "etag": window_etag, "events": encode_events(query_events(conditions, values), format)}
+    
+    delta = get_calendar_delta(conditions, values, since, cursor, window_etag)
+    if "events" in delta:
+        delta["events"] = encode_events(delta["events"], format)
+    return delta
+
+# Compact event columns; resourceId / custom_class are derived client-side from unit / status
+EVENT_COLUMNS = ["id", "unit", "start", "end", "status", "display_label"]
+
+def encode_events(events, format=None):
+    from hotel_management.hotel_management.compact_format import encode_table, is_compact
+    
+    if not is_compact(format):
+        return events
+    return encode_table(events, EVENT_COLUMNS, dict_columns=("unit", "status"))
+
+def get_event_scope(units=None, property=None, unit_type=None, floor=None):
+    """SQL condition restricting bookings to the requested rows (None = nothing to fetch)"""
+    if units is not None:
+        # An empty window has no bookings
+        if not units:
+            return None
+        return "AND ru.unit IN %(units)s", {"units": units}
+    
+    if property or unit_type or floor:
+        unit_conditions, unit_values = get_unit_conditions(property, unit_type, floor)
+        return ("AND ru.unit IN (SELECT pu.name FROM `tabProperty Unit` pu WHERE 1=1 {0})".format(unit_conditions),
+            unit_values)
+    
+    return "", {}
+
+def query_events(conditions, values):
     # Use frappe.db.sql with proper escaping and join structure
     bookings = frappe.db.sql("""
         SELECT 
@@ -30,44 +99,212 @@ def get_calendar_events(start, end):
         WHERE 
             r.docstatus < 2
             AND r.status NOT IN ('Cancelled')
-            AND (
-                (ru.check_in BETWEEN %(start)s AND %(end)s) OR
-                (ru.check_out BETWEEN %(start)s AND %(end)s) OR
-                (ru.check_in <= %(start)s AND ru.check_out >= %(end)s)
-            )
-    """, {"start": start, "end": end}, as_dict=True)
+            AND ru.check_in <= %(end)s
+            AND ru.check_out >= %(start)s
+            {conditions}
+    """.format(conditions=conditions), values, as_dict=True)
     
-    events = []
+    return [format_event(b) for b in bookings]
+
+# ========================================
+# Delta sync
+# ========================================
+
+# Each cursor is moved back by this much so rows committed just before it are re-read
+SYNC_OVERLAP_SECONDS = 5
+
+def get_sync_cursor():
+    """
+    Same clock that writes `modified` / tombstone `creation` (frappe.utils.now,
+    System Settings time zone) minus the overlap - the database clock may be
+    in another time zone
+    """
+    from frappe.utils import add_to_date
+    return str(add_to_date(now_datetime(), seconds=-SYNC_OVERLAP_SECONDS))
+
+def get_window_etag(conditions, values):
+    """Fingerprint of a window: row count, newest change and newest tombstone"""
+    state = frappe.db.sql("""
+        SELECT
+            COUNT(*),
+            MAX(GREATEST(r.modified, ru.modified)),
+            (SELECT MAX(creation) FROM `tabCalendar Tombstone`)
+        FROM `tabReservation` r
+        JOIN `tabReservation Unit` ru ON ru.parent = r.name
+        WHERE 
+            r.docstatus < 2
+            AND r.status NOT IN ('Cancelled')
+            AND ru.check_in <= %(end)s
+            AND ru.check_out >= %(start)s
+            {conditions}
+    """.format(conditions=conditions), values)[0]
     
-    for b in bookings:
-        # Status mappings for colors
-        status_map = {
-            "Confirmed": "confirmed",
-            "Checked-In": "checked-in",
-            "Checked-Out": "checked-out"
-        }
-        
-        # Determine label: Use Customer Name first, then Guest Name
-        # If neither exists, just an empty string (JS will use ID)
-        label_name = b.customer_name or b.guest_name or ""
+    scope = dict(values)
+    if scope.get("units"):
+        scope["units"] = sorted(scope["units"])
+    
+    return '"{0}"'.format(hashlib.md5(
+        json.dumps([scope, state], sort_keys=True, default=str).encode()).hexdigest())
+
+def not_modified(etag):
+    if frappe.get_request_header("If-None-Match") == etag:
+        frappe.local.response["http_status_code"] = 304
+    set_etag_header(etag)
+    return {"not_modified": True, "etag": etag}
+
+def set_etag_header(etag):
+    headers = getattr(frappe.local, "response_headers", None)
+    if headers is not None:
+        headers.set("ETag", etag)
+
+def get_calendar_delta(conditions, values, since, cursor, etag):
+    """Bookings changed after `since` (replace by reservation) and tombstoned rows (remove)"""
+    from hotel_management.hotel_management.doctype.calendar_tombstone.calendar_tombstone import (
+        TOMBSTONE_RETENTION_DAYS,
+    )
+    
+    if get_datetime(since) < add_days(now_datetime(), -TOMBSTONE_RETENTION_DAYS):
+        return {"reset": True, "cursor": cursor, "etag": etag}
+    
+    values = dict(values, since=since)
+    
+    # Reservations touched since the cursor - parent or child row - anywhere in the scope
+    changed = frappe.db.sql_list("""
+        SELECT r.name
+        FROM `tabReservation` r
+        JOIN `tabReservation Unit` ru ON ru.parent = r.name
+        WHERE r.modified > %(since)s {conditions}
         
-        events.append({
-            "id": b.reservation_id,
-            "resourceId": b.unit,
-            "display_label": label_name,
-            "start": str(b.check_in),
-            "end": str(b.check_out),
-            "custom_class": status_map.get(b.status, "booked"),
-            "unit": b.unit,
-            "status": b.status
-        })
+        UNION
         
-    return events
+        SELECT ru.parent
+        FROM `tabReservation Unit` ru
+        WHERE ru.parenttype = 'Reservation' AND ru.modified > %(since)s {conditions}
+    """.format(conditions=conditions), values)
+    
+    events = []
+    if changed:
+        events = query_events(conditions + " AND r.name IN %(changed)s", dict(values, changed=changed))
+    
+    removed = frappe.db.sql("""
+        SELECT DISTINCT reservation, unit
+        FROM `tabCalendar Tombstone`
+        WHERE creation > %(since)s
+        AND (check_in IS NULL OR check_in <= %(end)s)
+        AND (check_out IS NULL OR check_out >= %(start)s)
+    """, values, as_dict=True)
+    
+    return {
+        "cursor": cursor,
+        "etag": etag,
+        "changed": changed,
+        "events": events,
+        "removed": removed
+    }
+
+def format_event(b):
+    """One calendar bar for a reservation unit row"""
+    # Status mappings for colors
+    status_map = {
+        "Confirmed": "confirmed",
+        "Checked-In": "checked-in",
+        "Checked-Out": "checked-out"
+    }
+    
+    # Determine label: Use Customer Name first, then Guest Name
+    # If neither exists, just an empty string (JS will use ID)
+    label_name = b.customer_name or b.guest_name or ""
+    
+    return {
+        "id": b.reservation_id,
+        "resourceId": b.unit,
+        "display_label": label_name,
+        "start": str(b.check_in),
+        "end": str(b.check_out),
+        "custom_class": status_map.get(b.status, "booked"),
+        "unit": b.unit,
+        "status": b.status
+    }
+
+def get_reservation_events(reservation):
+    """Calendar bars for a single reservation (used for realtime deltas)"""
+    bookings = frappe.db.sql("""
+        SELECT 
+            r.name as reservation_id, 
+            g.guest_name,
+            c.customer_name,
+            ru.unit, 
+            ru.check_in, 
+            ru.check_out, 
+            r.status
+        FROM `tabReservation` r
+        JOIN `tabReservation Unit` ru ON ru.parent = r.name
+        LEFT JOIN `tabGuest` g ON g.name = r.primary_guest
+        LEFT JOIN `tabCustomer` c ON c.name = r.customer
+        WHERE r.name = %s
+            AND r.docstatus < 2
+            AND r.status NOT IN ('Cancelled')
+    """, (reservation,), as_dict=True)
+    
+    return [format_event(b) for b in bookings]
+
+def get_unit_conditions(property=None, unit_type=None, floor=None):
+    conditions = ""
+    if property:
+        conditions += " AND pu.property = %(property)s"
+    if unit_type:
+        conditions += " AND pu.unit_type = %(unit_type)s"
+    if floor:
+        conditions += " AND pu.floor = %(floor)s"
+    return conditions, {"property": property, "unit_type": unit_type, "floor": floor}
 
 @frappe.whitelist()
-def get_units():
-    """Fetch all units for row headers"""
-    return frappe.get_all("Property Unit", 
-        fields=["name", "unit_id", "unit_type"],
-        order_by="unit_id asc"
-    )
+def get_units(property=None, unit_type=None, floor=None, after=None, offset=0, limit=None):
+    """
+    Fetch units for row headers, ordered by unit_id
+    Window with keyset (`after` = last unit_id seen) or offset/limit
+    """
+    conditions, values = get_unit_conditions(property, unit_type, floor)
+    limit_clause = ""
+    
+    if after:
+        conditions += " AND pu.unit_id > %(after)s"
+        values["after"] = after
+    if cint(limit):
+        limit_clause = "LIMIT %(limit)s OFFSET %(offset)s"
+        values.update({"limit": cint(limit), "offset": 0 if after else cint(offset)})
+    
+    return frappe.db.sql("""
+        SELECT pu.name, pu.unit_id, pu.unit_type, pu.floor, pu.status
+        FROM `tabProperty Unit` pu
+        WHERE 1=1 {conditions}
+        ORDER BY pu.unit_id ASC
+        {limit_clause}
+    """.format(conditions=conditions, limit_clause=limit_clause), values, as_dict=True)
+
+@frappe.whitelist()
+def get_calendar_window(start, end, property=None, unit_type=None, floor=None, after=None, offset=0, limit=CALENDAR_PAGE_SIZE, format=None):
+    """
+    One page of calendar rows plus the bookings for exactly those rows
+    The first page (no cursor) also returns the total row count for the scrollbar;
+    `cursor` is the `since` to pass to get_calendar_events for later delta syncs
+    """
+    limit = min(cint(limit) or CALENDAR_PAGE_SIZE, 500)
+    cursor = get_sync_cursor()
+    units = get_units(property, unit_type, floor, after=after, offset=offset, limit=limit)
+    
+    window = {
+        "units": units,
+        "events": get_calendar_events(start, end, units=[u.name for u in units], format=format),
+        "has_more": len(units) == limit,
+        "next_after": units[-1].unit_id if units else None,
+        "cursor": cursor
+    }
+    
+    if not after and not cint(offset):
+        conditions, values = get_unit_conditions(property, unit_type, floor)
+        window["total"] = frappe.db.sql("""
+            SELECT COUNT(*) FROM `tabProperty Unit` pu WHERE 1=1 {0}
+        """.format(conditions), values)[0][0]
+    
+    return window
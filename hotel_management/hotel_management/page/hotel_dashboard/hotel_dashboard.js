@@ -168,12 +168,14 @@ frappe.pages['hotel-dashboard'].on_page_load = function (wrapper) {
         </style>
     `);
 
-    // Load dashboard data
-    function loadDashboardData() {
+    // Load dashboard data (force = rebuild the server-side snapshot)
+    function loadDashboardData(force) {
         console.log('🚀 Loading dashboard data...');
 
         frappe.call({
-            method: 'hotel_management.hotel_management.dashboard_api.get_dashboard_data',
+            method: force
+                ? 'hotel_management.hotel_management.dashboard_api.refresh_dashboard'
+                : 'hotel_management.hotel_management.dashboard_api.get_dashboard_data',
             callback: function (r) {
                 if (r.message) {
                     console.log('✅ Data received:', r.message);
@@ -222,6 +224,23 @@ frappe.pages['hotel-dashboard'].on_page_load = function (wrapper) {
         console.log('✅ Widgets updated');
     }
 
+    // Live updates: the server pushes a fresh snapshot after each (debounced) batch of changes
+    function subscribeToChanges() {
+        frappe.realtime.doctype_subscribe('Property');
+        frappe.realtime.on('hotel_changes', function (data) {
+            if (data && data.dashboard) {
+                updateWidgets(data.dashboard);
+            }
+        });
+
+        // Catch up on anything missed while the tab was hidden or the socket was down
+        document.addEventListener('visibilitychange', function () {
+            if (!document.hidden) {
+                loadDashboardData();
+            }
+        });
+    }
+
     function setupClickHandlers() {
         $('[data-widget="available_units"]').click(function () {
             frappe.set_route('List', 'Property Unit', { 'status': 'Available' });
@@ -256,7 +275,7 @@ frappe.pages['hotel-dashboard'].on_page_load = function (wrapper) {
                 message: 'جارٍ تحديث البيانات...',
                 indicator: 'blue'
             }, 2);
-            loadDashboardData();
+            loadDashboardData(true);
         });
     }
 
@@ -264,8 +283,6 @@ frappe.pages['hotel-dashboard'].on_page_load = function (wrapper) {
     setTimeout(function () {
         loadDashboardData();
         setupClickHandlers();
-
-        // Auto-refresh every 5 minutes
-        setInterval(loadDashboardData, 300000);
+        subscribeToChanges();
     }, 500);
 };
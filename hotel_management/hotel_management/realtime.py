@@ -0,0 +1,198 @@
+# -*- coding: utf-8 -*-
+"""
+Realtime Change Feed
+Pushes reservation / unit / housekeeping / maintenance changes to open pages
+Path: hotel_management/hotel_management/realtime.py
+
+Rooms:
+    doc:Property/<name>  - per-property feed ("hotel_property_changes")
+    doctype:Property     - all-properties feed ("hotel_changes")
+Both are Frappe doc / doctype rooms, so joining them is permission-checked
+(frappe.realtime.doc_subscribe / doctype_subscribe on the client).
+
+Changes are coalesced per transaction (last state of each document wins),
+published only after commit, and debounced per property: the first change
+opens a window and queues one flush job, later changes just join the
+pending batch. The job closes the window and takes the batch when it
+starts, so everything committed while it waited in the queue goes out
+together and the next change opens a new window. The window's expiry
+(REALTIME_DEBOUNCE_SECONDS) only matters if a flush job is lost.
+"""
+
+import frappe
+
+# Longest a debounce window stays open without its flush job running
+REALTIME_DEBOUNCE_SECONDS = 2
+
+PENDING_KEY = "hotel_realtime_pending"
+WINDOW_KEY = "hotel_realtime_window"
+
+# Used when a change cannot be tied to a property - all-properties feed only
+NO_PROPERTY = "__none__"
+
+
+# ========================================
+# Capture (doc_events)
+# ========================================
+
+def publish_doc_change(doc, method=None):
+    """doc_event: queue a delta for the document's properties"""
+    change = build_change(doc, method)
+    if not change:
+        return
+
+    from hotel_management.hotel_management.dashboard_api import get_doc_properties
+
+    properties = get_doc_properties(doc) or [NO_PROPERTY]
+
+    pending = frappe.flags.hotel_realtime_changes
+    if pending is None:
+        pending = frappe.flags.hotel_realtime_changes = {}
+        frappe.db.after_commit.add(flush_transaction_changes)
+        frappe.db.after_rollback.add(discard_transaction_changes)
+
+    for property in properties:
+        pending.setdefault(property or NO_PROPERTY, {})[change["key"]] = change
+
+
+def build_change(doc, method=None):
+    """Small, self-contained delta for one document"""
+    removed = method in ("on_trash", "after_delete", "on_cancel") or doc.get("docstatus") == 2
+
+    if doc.doctype == "Reservation":
+        return {
+            "key": "Reservation:" + doc.name,
+            "type": "reservation",
+            "name": doc.name,
+            "status": doc.status,
+            "previous_status": doc.flags.get("previous_status"),
+            "removed": removed or doc.status == "Cancelled",
+            "units": [row.unit for row in doc.get("units_reserved") or [] if row.unit]
+        }
+
+    if doc.doctype == "Property Unit":
+        if method == "on_update":
+            before = doc.get_doc_before_save()
+            if before and before.status == doc.status:
+                return None
+        return {
+            "key": "Property Unit:" + doc.name,
+            "type": "unit",
+            "name": doc.name,
+            "status": doc.status,
+            "removed": removed
+        }
+
+    if doc.doctype in ("Housekeeping Task", "Maintenance Request"):
+        return {
+            "key": doc.doctype + ":" + doc.name,
+            "type": "housekeeping" if doc.doctype == "Housekeeping Task" else "maintenance",
+            "name": doc.name,
+            "status": doc.status,
+            "property_unit": doc.property_unit,
+            "removed": removed
+        }
+
+    return None
+
+
+def discard_transaction_changes():
+    """After rollback: drop the batch so the next transaction starts (and flushes) a fresh one"""
+    frappe.flags.hotel_realtime_changes = None
+
+
+def flush_transaction_changes():
+    """After commit: hand this transaction's changes to the per-property debounce"""
+    pending = frappe.flags.hotel_realtime_changes or {}
+    frappe.flags.hotel_realtime_changes = None
+
+    cache = frappe.cache()
+    for property, changes in pending.items():
+        for key, change in changes.items():
+            cache.hset(get_pending_key(property), key, change)
+
+        # First change in the window schedules the flush; the rest just join the batch
+        if cache.set(get_window_key(property), 1, nx=True, ex=REALTIME_DEBOUNCE_SECONDS):
+            frappe.enqueue(
+                "hotel_management.hotel_management.realtime.flush_property_changes",
+                queue="short",
+                property=property
+            )
+
+
+def get_pending_key(property):
+    return "{0}|{1}".format(PENDING_KEY, property)
+
+
+def get_window_key(property):
+    """Full redis key - used with the raw set / delete commands"""
+    return frappe.cache().make_key(WINDOW_KEY + "|" + property)
+
+
+# ========================================
+# Publish (background job)
+# ========================================
+
+def flush_property_changes(property):
+    """Publish the property's pending batch"""
+    cache = frappe.cache()
+
+    # Close the window first: a change landing after this opens a new window
+    # (and job), one landing before it is part of the batch taken below
+    cache.delete(get_window_key(property))
+
+    # Take the batch atomically so changes arriving now go to the next one
+    batch_key = get_pending_key(property) + "|" + frappe.generate_hash(length=8)
+    try:
+        cache.rename(cache.make_key(get_pending_key(property)), cache.make_key(batch_key))
+    except Exception:
+        # Nothing pending (already flushed by an earlier job)
+        return
+
+    changes = list((cache.hgetall(batch_key) or {}).values())
+    cache.delete_value(batch_key)
+    if not changes:
+        return
+
+    enrich_changes(changes)
+
+    from hotel_management.hotel_management.dashboard_api import (
+        get_dashboard_snapshot,
+        invalidate_dashboard_snapshot,
+    )
+
+    # A page may have re-cached a snapshot between the doc event and the commit
+    invalidate_dashboard_snapshot(None if property == NO_PROPERTY else [property])
+
+    if property != NO_PROPERTY:
+        frappe.publish_realtime("hotel_property_changes", {
+            "property": property,
+            "changes": changes,
+            "dashboard": get_dashboard_snapshot(property)
+        }, doctype="Property", docname=property)
+
+    frappe.publish_realtime("hotel_changes", {
+        "property": None if property == NO_PROPERTY else property,
+        "changes": changes,
+        "dashboard": get_dashboard_snapshot()
+    }, doctype="Property")
+
+
+def enrich_changes(changes):
+    """Attach current calendar bars and unit statuses to reservation deltas"""
+    from hotel_management.hotel_management.page.hotel_calendar.hotel_calendar import get_reservation_events
+
+    units = set()
+    for change in changes:
+        if change["type"] == "reservation":
+            change["events"] = [] if change["removed"] else get_reservation_events(change["name"])
+            units.update(change["units"])
+
+    if not units:
+        return
+
+    statuses = dict(frappe.get_all("Property Unit",
+        filters={"name": ["in", list(units)]}, fields=["name", "status"], as_list=True))
+    for change in changes:
+        if change["type"] == "reservation":
+            change["unit_statuses"] = {unit: statuses.get(unit) for unit in change["units"]}
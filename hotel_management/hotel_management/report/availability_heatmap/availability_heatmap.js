@@ -0,0 +1,52 @@
+// Copyright (c) 2025, VRPnext and Contributors
+// License: MIT
+
+frappe.query_reports["Availability Heatmap"] = {
+	"filters": [
+		{
+			"fieldname": "property",
+			"label": __("Property"),
+			"fieldtype": "Link",
+			"options": "Property"
+		},
+		{
+			"fieldname": "unit_type",
+			"label": __("Unit Type"),
+			"fieldtype": "Link",
+			"options": "Unit Type"
+		},
+		{
+			"fieldname": "from_date",
+			"label": __("From Date"),
+			"fieldtype": "Date",
+			"default": frappe.datetime.get_today(),
+			"reqd": 1
+		},
+		{
+			"fieldname": "days",
+			"label": __("Days"),
+			"fieldtype": "Int",
+			"default": 90
+		},
+		{
+			"fieldname": "metric",
+			"label": __("Show"),
+			"fieldtype": "Select",
+			"options": "Remaining\nPrice",
+			"default": "Remaining"
+		}
+	],
+	
+	// Shade remaining-unit cells from red (sold out) to green (all free)
+	"formatter": function(value, row, column, data, default_formatter) {
+		value = default_formatter(value, row, column, data);
+		if (!data || !/^d\d+$/.test(column.fieldname) || frappe.query_report.get_filter_value("metric") === "Price") {
+			return value;
+		}
+		
+		let remaining = data[column.fieldname];
+		let ratio = data.capacity ? Math.max(0, Math.min(1, remaining / data.capacity)) : 0;
+		let color = remaining <= 0 ? "#f8d7da" : ratio < 0.25 ? "#fff3cd" : ratio < 0.5 ? "#fef9e7" : "#d4edda";
+		return `<div style="background:${color}; text-align:center">${value}</div>`;
+	}
+};
@@ -0,0 +1,72 @@
+# Copyright (c) 2025, VRPnext and contributors
+# For license information, please see license.txt
+
+from __future__ import unicode_literals
+import frappe
+from frappe import _
+from frappe.utils import add_days, cint, getdate, today
+from hotel_management.hotel_management.availability_heatmap import HEATMAP_DAYS, get_availability_heatmap
+
+def execute(filters=None):
+	filters = frappe._dict(filters or {})
+	start = getdate(filters.get("from_date") or today())
+	days = min(cint(filters.get("days")) or 90, HEATMAP_DAYS)
+	metric = filters.get("metric") or "Remaining"
+	
+	heatmap = get_availability_heatmap(filters.get("property"), start, days)
+	columns = get_columns(start, days, metric)
+	data = get_data(heatmap, metric, filters.get("unit_type"))
+	return columns, data
+
+def get_columns(start, days, metric):
+	columns = [
+		{
+			"fieldname": "property",
+			"label": _("Property"),
+			"fieldtype": "Link",
+			"options": "Property",
+			"width": 150
+		},
+		{
+			"fieldname": "unit_type",
+			"label": _("Unit Type"),
+			"fieldtype": "Link",
+			"options": "Unit Type",
+			"width": 120
+		},
+		{
+			"fieldname": "capacity",
+			"label": _("Units"),
+			"fieldtype": "Int",
+			"width": 70
+		}
+	]
+	
+	fieldtype = "Currency" if metric == "Price" else "Int"
+	for day in range(days):
+		date = add_days(start, day)
+		columns.append({
+			"fieldname": "d{0}".format(day),
+			"label": date.strftime("%d %b"),
+			"fieldtype": fieldtype,
+			"width": 80 if metric == "Price" else 60
+		})
+	return columns
+
+def get_data(heatmap, metric, unit_type=None):
+	key = "price" if metric == "Price" else "remaining"
+	data = []
+	for property_map in heatmap["properties"]:
+		for i, type_name in enumerate(property_map["unit_types"]):
+			if unit_type and type_name != unit_type:
+				continue
+			
+			row = {
+				"property": property_map["property"],
+				"unit_type": type_name,
+				"capacity": property_map["capacity"][i]
+			}
+			for day, value in enumerate(property_map[key][i]):
+				row["d{0}".format(day)] = value
+			data.append(row)
+	return data
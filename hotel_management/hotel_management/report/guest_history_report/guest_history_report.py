@@ -4,7 +4,10 @@
 from __future__ import unicode_literals
 import frappe
 from frappe import _
+from frappe.utils import add_days, cint, today
+from hotel_management.hotel_management.report_cache import cached_report
 
+@cached_report("Guest History Report")
 def execute(filters=None):
 	columns = get_columns()
 	data = get_data(filters)
@@ -69,47 +72,132 @@ def get_columns():
 		}
 	]
 
-def get_data(filters):
-	conditions = get_conditions(filters)
+def get_data(filters, after=None, limit=None):
+	"""
+	Without a date window the report reads the denormalized stats on Guest
+	(kept current by update_guest_statistics); with one it aggregates only
+	the reservations inside the window through the (primary_guest, status,
+	check_in) index. Segmentation filters are pushed into WHERE / HAVING.
+	"""
+	filters = frappe._dict(filters or {})
+	order_by = "lifetime_revenue DESC, guest"
+	limit_clause = ""
+	keyset = ""
 	
-	data = frappe.db.sql("""
+	# Keyset pagination for streaming export
+	if limit:
+		if after:
+			keyset = " AND g.name > %(after)s"
+		order_by = "g.name"
+		limit_clause = "LIMIT %(limit)s"
+	
+	values = dict(filters, after=after, limit=limit)
+	if filters.get("last_visit_within_days"):
+		values["last_visit_since"] = add_days(today(), -cint(filters.last_visit_within_days))
+	
+	if filters.get("from_date") or filters.get("to_date"):
+		query = get_window_query(filters)
+	else:
+		query = get_summary_query(filters)
+	
+	return frappe.db.sql(query.format(keyset=keyset, order_by=order_by, limit_clause=limit_clause),
+		values, as_dict=1)
+
+def get_summary_query(filters):
+	"""Lifetime stats straight from tabGuest - no reservation scan"""
+	conditions = ["g.total_visits > 0"]
+	
+	if filters.get("guest"):
+		conditions.append("g.name = %(guest)s")
+	
+	if filters.get("min_visits"):
+		conditions.append("g.total_visits >= %(min_visits)s")
+	
+	if filters.get("min_spend"):
+		conditions.append("g.lifetime_revenue >= %(min_spend)s")
+	
+	if filters.get("last_visit_within_days"):
+		conditions.append("g.last_visit_date >= %(last_visit_since)s")
+	
+	return """
 		SELECT 
 			g.name as guest,
 			g.guest_name,
 			g.phone,
 			g.email,
-			COUNT(DISTINCT r.name) as total_visits,
-			COALESCE(SUM(r.nights), 0) as total_nights,
-			COALESCE(SUM(r.total_amount), 0) as lifetime_revenue,
-			MAX(r.check_out) as last_visit_date,
-			CASE 
-				WHEN COUNT(DISTINCT r.name) > 0 
-				THEN COALESCE(SUM(r.total_amount), 0) / COUNT(DISTINCT r.name)
-				ELSE 0 
-			END as average_spend
+			g.total_visits,
+			g.total_nights,
+			g.lifetime_revenue,
+			g.last_visit_date,
+			g.lifetime_revenue / g.total_visits as average_spend
 		FROM `tabGuest` g
-		LEFT JOIN `tabReservation` r ON r.primary_guest = g.name AND r.docstatus = 1
-		WHERE 1=1 {conditions}
-		GROUP BY g.name
-		HAVING total_visits > 0
-		ORDER BY lifetime_revenue DESC
-	""".format(conditions=conditions), filters, as_dict=1)
-	
-	return data
+		WHERE {conditions} {{keyset}}
+		ORDER BY {{order_by}}
+		{{limit_clause}}
+	""".format(conditions=" AND ".join(conditions))
 
-def get_conditions(filters):
-	conditions = []
+def get_window_query(filters):
+	"""Stats for stays inside [from_date, to_date], grouped before joining Guest"""
+	conditions = ["r.docstatus = 1", "r.status = 'Checked-Out'"]
+	having = []
 	
 	if filters.get("guest"):
-		conditions.append("AND g.name = %(guest)s")
+		conditions.append("r.primary_guest = %(guest)s")
 	
 	if filters.get("from_date"):
-		conditions.append("AND r.check_in >= %(from_date)s")
+		conditions.append("r.check_in >= %(from_date)s")
 	
 	if filters.get("to_date"):
-		conditions.append("AND r.check_out <= %(to_date)s")
+		conditions.append("r.check_out <= %(to_date)s")
 	
 	if filters.get("min_visits"):
-		conditions.append("AND COUNT(DISTINCT r.name) >= %(min_visits)s")
+		having.append("COUNT(*) >= %(min_visits)s")
+	
+	if filters.get("min_spend"):
+		having.append("SUM(r.total_amount) >= %(min_spend)s")
+	
+	if filters.get("last_visit_within_days"):
+		having.append("MAX(r.check_out) >= %(last_visit_since)s")
+	
+	return """
+		SELECT 
+			g.name as guest,
+			g.guest_name,
+			g.phone,
+			g.email,
+			s.total_visits,
+			s.total_nights,
+			s.lifetime_revenue,
+			s.last_visit_date,
+			s.lifetime_revenue / s.total_visits as average_spend
+		FROM (
+			SELECT 
+				r.primary_guest,
+				COUNT(*) as total_visits,
+				COALESCE(SUM(r.nights), 0) as total_nights,
+				COALESCE(SUM(r.total_amount), 0) as lifetime_revenue,
+				MAX(r.check_out) as last_visit_date
+			FROM `tabReservation` r
+			WHERE {conditions}
+			GROUP BY r.primary_guest
+			{having}
+		) s
+		JOIN `tabGuest` g ON g.name = s.primary_guest
+		WHERE 1=1 {{keyset}}
+		ORDER BY {{order_by}}
+		{{limit_clause}}
+	""".format(
+		conditions=" AND ".join(conditions),
+		having=("HAVING " + " AND ".join(having)) if having else ""
+	)
+
+def get_export_columns(filters):
+	return get_columns()
+
+def get_export_pages(filters, page_size):
+	"""Result pages for streaming export (keyset on guest)"""
+	from hotel_management.hotel_management.report_export import iter_keyset_pages
 	
-	return " ".join(conditions) if conditions else ""
\ No newline at end of file
+	return iter_keyset_pages(
+		lambda after, limit: get_data(filters, after=after, limit=limit),
+		"guest", page_size)
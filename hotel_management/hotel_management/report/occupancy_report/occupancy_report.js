@@ -22,6 +22,13 @@ frappe.query_reports["Occupancy Report"] = {
 			"fieldtype": "Date",
 			"default": frappe.datetime.month_end(),
 			"reqd": 1
+		},
+		{
+			"fieldname": "granularity",
+			"label": __("Granularity"),
+			"fieldtype": "Select",
+			"options": "Summary\nDaily",
+			"default": "Summary"
 		}
 	]
 };
\ No newline at end of file
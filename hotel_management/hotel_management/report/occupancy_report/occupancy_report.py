@@ -4,14 +4,31 @@
 from __future__ import unicode_literals
 import frappe
 from frappe import _
-from frappe.utils import flt, date_diff, getdate
+from frappe.utils import flt, getdate
+from hotel_management.hotel_management.report_cache import cached_report
 
+@cached_report("Occupancy Report")
 def execute(filters=None):
+	filters = frappe._dict(filters or {})
+	validate_filters(filters)
+	
+	if filters.get("granularity") == "Daily":
+		columns, data = get_daily_matrix(filters)
+		chart = get_daily_chart_data(columns, data)
+		return columns, data, None, chart
+	
 	columns = get_columns()
 	data = get_data(filters)
 	chart = get_chart_data(data)
 	return columns, data, None, chart
 
+def validate_filters(filters):
+	if not filters.get("from_date") or not filters.get("to_date"):
+		frappe.throw(_("Please select From Date and To Date"))
+	
+	if getdate(filters.to_date) < getdate(filters.from_date):
+		frappe.throw(_("To Date must be after From Date"))
+
 def get_columns():
 	return [
 		{
@@ -57,65 +74,117 @@ def get_columns():
 			"label": _("Revenue"),
 			"fieldtype": "Currency",
 			"width": 150
+		},
+		{
+			"fieldname": "adr",
+			"label": _("ADR"),
+			"fieldtype": "Currency",
+			"width": 120
+		},
+		{
+			"fieldname": "revpar",
+			"label": _("RevPAR"),
+			"fieldtype": "Currency",
+			"width": 120
 		}
 	]
 
 def get_data(filters):
-	from_date = filters.get("from_date")
-	to_date = filters.get("to_date")
-	
-	if not from_date or not to_date:
-		frappe.throw(_("Please select From Date and To Date"))
-	
-	days_in_period = date_diff(to_date, from_date) + 1
+	"""
+	Occupancy per property / unit type from the Hotel Daily KPI table.
+	KPI rows already count each night a stay spends inside the window.
+	"""
+	data = frappe.db.sql("""
+		SELECT
+			k.property,
+			k.unit_type,
+			MAX(k.rooms_available) as total_units,
+			SUM(k.rooms_available) as available_nights,
+			SUM(k.rooms_sold) as booked_nights,
+			SUM(k.room_revenue) as revenue
+		FROM `tabHotel Daily KPI` k
+		WHERE k.date BETWEEN %(from_date)s AND %(to_date)s
+		{conditions}
+		GROUP BY k.property, k.unit_type
+		ORDER BY k.property, k.unit_type
+	""".format(conditions=get_conditions(filters)), filters, as_dict=1)
 	
-	conditions = ""
-	if filters.get("property"):
-		conditions += " AND pu.property = %(property)s"
-	
-	# Get all units grouped by property and type
-	units_data = frappe.db.sql("""
-		SELECT 
-			pu.property,
-			pu.unit_type,
-			COUNT(DISTINCT pu.name) as total_units
-		FROM `tabProperty Unit` pu
-		WHERE 1=1 {conditions}
-		GROUP BY pu.property, pu.unit_type
-	""".format(conditions=conditions), filters, as_dict=1)
-	
-	# Get booked nights for each property/type combination
-	for row in units_data:
-		booked = frappe.db.sql("""
-			SELECT 
-				COALESCE(SUM(ru.qty_nights), 0) as booked_nights,
-				COALESCE(SUM(ru.total_amount), 0) as revenue
-			FROM `tabReservation Unit` ru
-			JOIN `tabReservation` r ON r.name = ru.parent
-			JOIN `tabProperty Unit` pu ON pu.name = ru.unit
-			WHERE r.docstatus = 1
-			AND r.status IN ('Confirmed', 'Checked-In', 'Checked-Out')
-			AND pu.property = %(property)s
-			AND pu.unit_type = %(unit_type)s
-			AND ru.check_in >= %(from_date)s
-			AND ru.check_out <= %(to_date)s
-		""", {
-			"property": row.property,
-			"unit_type": row.unit_type,
-			"from_date": from_date,
-			"to_date": to_date
-		}, as_dict=1)
-		
-		row.available_nights = row.total_units * days_in_period
-		row.booked_nights = booked[0].booked_nights if booked else 0
-		row.revenue = booked[0].revenue if booked else 0
+	for row in data:
+		row.booked_nights = flt(row.booked_nights)
+		row.revenue = flt(row.revenue, 2)
 		
 		if row.available_nights > 0:
 			row.occupancy_percentage = (row.booked_nights / row.available_nights) * 100
+			row.revpar = flt(row.revenue / row.available_nights, 2)
 		else:
 			row.occupancy_percentage = 0
+			row.revpar = 0
+		
+		row.adr = flt(row.revenue / row.booked_nights, 2) if row.booked_nights else 0
 	
-	return units_data
+	return data
+
+def get_conditions(filters):
+	conditions = ""
+	if filters.get("property"):
+		conditions += " AND k.property = %(property)s"
+	return conditions
+
+def get_daily_matrix(filters):
+	"""Date x unit type occupancy matrix from the Hotel Daily KPI table"""
+	cells = frappe.db.sql("""
+		SELECT
+			k.date,
+			k.unit_type,
+			SUM(k.rooms_sold) as rooms_sold,
+			SUM(k.rooms_available) as rooms_available
+		FROM `tabHotel Daily KPI` k
+		WHERE k.date BETWEEN %(from_date)s AND %(to_date)s
+		{conditions}
+		GROUP BY k.date, k.unit_type
+		ORDER BY k.date, k.unit_type
+	""".format(conditions=get_conditions(filters)), filters, as_dict=1)
+	
+	unit_types = sorted({cell.unit_type for cell in cells})
+	
+	columns = [{
+		"fieldname": "date",
+		"label": _("Date"),
+		"fieldtype": "Date",
+		"width": 110
+	}]
+	for unit_type in unit_types:
+		columns.append({
+			"fieldname": frappe.scrub(unit_type),
+			"label": unit_type,
+			"fieldtype": "Percent",
+			"width": 110
+		})
+	columns.append({
+		"fieldname": "total_occupancy",
+		"label": _("Total Occupancy %"),
+		"fieldtype": "Percent",
+		"width": 130
+	})
+	
+	rows = {}
+	for cell in cells:
+		row = rows.setdefault(cell.date, frappe._dict({
+			"date": cell.date,
+			"rooms_sold": 0,
+			"rooms_available": 0
+		}))
+		row[frappe.scrub(cell.unit_type)] = flt(cell.rooms_sold * 100.0 / cell.rooms_available, 2) \
+			if cell.rooms_available else 0
+		row.rooms_sold += cell.rooms_sold
+		row.rooms_available += cell.rooms_available
+	
+	data = []
+	for row in rows.values():
+		row.total_occupancy = flt(row.rooms_sold * 100.0 / row.rooms_available, 2) if row.rooms_available else 0
+		data.append(row)
+	
+	return columns, data
 
 def get_chart_data(data):
 	"""Generate chart for occupancy visualization"""
@@ -142,4 +211,20 @@ def get_chart_data(data):
 		"barOptions": {
 			"stacked": 0
 		}
-	}
\ No newline at end of file
+	}
+
+def get_daily_chart_data(columns, data):
+	"""Line chart of total occupancy per day"""
+	return {
+		"data": {
+			"labels": [str(row.date) for row in data],
+			"datasets": [
+				{
+					"name": "Occupancy %",
+					"values": [row.total_occupancy for row in data]
+				}
+			]
+		},
+		"type": "line",
+		"colors": ["#7cd6fd"]
+	}
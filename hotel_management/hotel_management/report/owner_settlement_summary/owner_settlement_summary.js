@@ -2,6 +2,31 @@
 // License: MIT
 
 frappe.query_reports["Owner Settlement Summary"] = {
+	"onload": function(report) {
+		report.page.add_inner_button(__("Background Export"), function() {
+			frappe.prompt({
+				"fieldname": "file_format",
+				"label": __("Format"),
+				"fieldtype": "Select",
+				"options": "CSV\nExcel",
+				"default": "CSV"
+			}, function(values) {
+				frappe.call({
+					method: "hotel_management.hotel_management.report_export.export_report",
+					args: {
+						report_name: "Owner Settlement Summary",
+						filters: report.get_values(),
+						file_format: values.file_format
+					},
+					callback: function(r) {
+						if (r.message) {
+							frappe.show_alert({message: r.message.message, indicator: "blue"});
+						}
+					}
+				});
+			}, __("Export Large Report"), __("Export"));
+		});
+	},
 	"filters": [
 		{
 			"fieldname": "property_owner",
@@ -5,7 +5,9 @@ from __future__ import unicode_literals
 import frappe
 from frappe import _
 from frappe.utils import flt
+from hotel_management.hotel_management.report_cache import cached_report
 
+@cached_report("Owner Settlement Summary")
 def execute(filters=None):
 	columns = get_columns()
 	data = get_data(filters)
@@ -72,8 +74,17 @@ def get_columns():
 		}
 	]
 
-def get_data(filters):
+def get_data(filters, after=None, limit=None):
 	conditions = get_conditions(filters)
+	order_by = "os.period_end DESC, os.property_owner"
+	limit_clause = ""
+	
+	# Keyset pagination for streaming export
+	if limit:
+		if after:
+			conditions += " AND os.name > %(after)s"
+		order_by = "os.name"
+		limit_clause = "LIMIT %(limit)s"
 	
 	data = frappe.db.sql("""
 		SELECT 
@@ -89,8 +100,10 @@ def get_data(filters):
 		FROM `tabOwner Settlement` os
 		WHERE os.docstatus < 2
 		{conditions}
-		ORDER BY os.period_end DESC, os.property_owner
-	""".format(conditions=conditions), filters, as_dict=1)
+		ORDER BY {order_by}
+		{limit_clause}
+	""".format(conditions=conditions, order_by=order_by, limit_clause=limit_clause),
+		dict(filters, after=after, limit=limit), as_dict=1)
 	
 	return data
 
@@ -111,6 +124,17 @@ def get_conditions(filters):
 	
 	return " ".join(conditions) if conditions else ""
 
+def get_export_columns(filters):
+	return get_columns()
+
+def get_export_pages(filters, page_size):
+	"""Result pages for streaming export (keyset on settlement name)"""
+	from hotel_management.hotel_management.report_export import iter_keyset_pages
+	
+	return iter_keyset_pages(
+		lambda after, limit: get_data(filters, after=after, limit=limit),
+		"settlement", page_size)
+
 def get_chart_data(data):
 	"""Generate chart for settlements visualization"""
 	owners = []
@@ -2,6 +2,31 @@
 // License: MIT
 
 frappe.query_reports["Revenue by Unit"] = {
+	"onload": function(report) {
+		report.page.add_inner_button(__("Background Export"), function() {
+			frappe.prompt({
+				"fieldname": "file_format",
+				"label": __("Format"),
+				"fieldtype": "Select",
+				"options": "CSV\nExcel",
+				"default": "CSV"
+			}, function(values) {
+				frappe.call({
+					method: "hotel_management.hotel_management.report_export.export_report",
+					args: {
+						report_name: "Revenue by Unit",
+						filters: report.get_values(),
+						file_format: values.file_format
+					},
+					callback: function(r) {
+						if (r.message) {
+							frappe.show_alert({message: r.message.message, indicator: "blue"});
+						}
+					}
+				});
+			}, __("Export Large Report"), __("Export"));
+		});
+	},
 	"filters": [
 		{
 			"fieldname": "property",
@@ -32,7 +57,16 @@ frappe.query_reports["Revenue by Unit"] = {
 			"label": __("Status"),
 			"fieldtype": "Select",
 			"options": "\nConfirmed\nChecked-In\nChecked-Out",
-			"default": "Checked-Out"
+			"default": "Checked-Out",
+			// Unit Type totals come from nightly KPIs, which have no reservation status
+			"depends_on": "eval:doc.group_by != 'Unit Type'"
+		},
+		{
+			"fieldname": "group_by",
+			"label": __("Group By"),
+			"fieldtype": "Select",
+			"options": "Unit\nUnit Type",
+			"default": "Unit"
 		}
 	]
 };
\ No newline at end of file
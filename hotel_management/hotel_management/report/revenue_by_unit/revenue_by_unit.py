@@ -5,8 +5,17 @@ from __future__ import unicode_literals
 import frappe
 from frappe import _
 from frappe.utils import flt
+from hotel_management.hotel_management.report_cache import cached_report
 
+@cached_report("Revenue by Unit")
 def execute(filters=None):
+	filters = frappe._dict(filters or {})
+	
+	if filters.get("group_by") == "Unit Type":
+		message = _("Unit Type totals count room nights sold between From Date and To Date "
+			"(Confirmed, Checked-In and Checked-Out stays); the Status filter does not apply.")
+		return get_unit_type_columns(), get_unit_type_data(filters), message
+	
 	columns = get_columns()
 	data = get_data(filters)
 	return columns, data
@@ -60,8 +69,17 @@ def get_columns():
 		}
 	]
 
-def get_data(filters):
+def get_data(filters, after=None, limit=None):
 	conditions = get_conditions(filters)
+	order_by = "total_revenue DESC"
+	limit_clause = ""
+	
+	# Keyset pagination for streaming export
+	if limit:
+		if after:
+			conditions += " AND ru.unit > %(after)s"
+		order_by = "ru.unit"
+		limit_clause = "LIMIT %(limit)s"
 	
 	data = frappe.db.sql("""
 		SELECT 
@@ -82,8 +100,10 @@ def get_data(filters):
 		WHERE r.docstatus = 1
 		{conditions}
 		GROUP BY ru.unit
-		ORDER BY total_revenue DESC
-	""".format(conditions=conditions), filters, as_dict=1)
+		ORDER BY {order_by}
+		{limit_clause}
+	""".format(conditions=conditions, order_by=order_by, limit_clause=limit_clause),
+		dict(filters, after=after, limit=limit), as_dict=1)
 	
 	return data
 
@@ -105,4 +125,112 @@ def get_conditions(filters):
 	if filters.get("status"):
 		conditions.append("AND r.status = %(status)s")
 	
-	return " ".join(conditions) if conditions else ""
\ No newline at end of file
+	return " ".join(conditions) if conditions else ""
+
+def get_unit_type_columns():
+	return [
+		{
+			"fieldname": "property",
+			"label": _("Property"),
+			"fieldtype": "Link",
+			"options": "Property",
+			"width": 150
+		},
+		{
+			"fieldname": "unit_type",
+			"label": _("Unit Type"),
+			"fieldtype": "Link",
+			"options": "Unit Type",
+			"width": 120
+		},
+		{
+			"fieldname": "total_arrivals",
+			"label": _("Arrivals"),
+			"fieldtype": "Int",
+			"width": 100
+		},
+		{
+			"fieldname": "total_nights",
+			"label": _("Total Nights"),
+			"fieldtype": "Int",
+			"width": 100
+		},
+		{
+			"fieldname": "total_revenue",
+			"label": _("Total Revenue"),
+			"fieldtype": "Currency",
+			"width": 150
+		},
+		{
+			"fieldname": "average_rate",
+			"label": _("ADR"),
+			"fieldtype": "Currency",
+			"width": 120
+		},
+		{
+			"fieldname": "revpar",
+			"label": _("RevPAR"),
+			"fieldtype": "Currency",
+			"width": 120
+		}
+	]
+
+def get_unit_type_data(filters):
+	"""Room revenue per property / unit type from the Hotel Daily KPI table"""
+	conditions = []
+	
+	if filters.get("property"):
+		conditions.append("AND k.property = %(property)s")
+	
+	if filters.get("unit_type"):
+		conditions.append("AND k.unit_type = %(unit_type)s")
+	
+	if filters.get("from_date"):
+		conditions.append("AND k.date >= %(from_date)s")
+	
+	if filters.get("to_date"):
+		conditions.append("AND k.date < %(to_date)s")
+	
+	data = frappe.db.sql("""
+		SELECT 
+			k.property,
+			k.unit_type,
+			SUM(k.arrivals) as total_arrivals,
+			SUM(k.rooms_sold) as total_nights,
+			SUM(k.room_revenue) as total_revenue,
+			CASE 
+				WHEN SUM(k.rooms_sold) > 0 
+				THEN SUM(k.room_revenue) / SUM(k.rooms_sold)
+				ELSE 0 
+			END as average_rate,
+			CASE 
+				WHEN SUM(k.rooms_available) > 0 
+				THEN SUM(k.room_revenue) / SUM(k.rooms_available)
+				ELSE 0 
+			END as revpar
+		FROM `tabHotel Daily KPI` k
+		WHERE 1=1
+		{conditions}
+		GROUP BY k.property, k.unit_type
+		ORDER BY total_revenue DESC
+	""".format(conditions=" ".join(conditions)), filters, as_dict=1)
+	
+	return data
+
+def get_export_columns(filters):
+	if filters.get("group_by") == "Unit Type":
+		return get_unit_type_columns()
+	return get_columns()
+
+def get_export_pages(filters, page_size):
+	"""Result pages for streaming export (keyset on property_unit)"""
+	from hotel_management.hotel_management.report_export import iter_keyset_pages
+	
+	if filters.get("group_by") == "Unit Type":
+		# One row per property / unit type: small enough for a single page
+		yield get_unit_type_data(filters)
+		return
+	
+	yield from iter_keyset_pages(
+		lambda after, limit: get_data(filters, after=after, limit=limit),
+		"property_unit", page_size)
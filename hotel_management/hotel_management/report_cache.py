@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+Report Result Cache
+Caches script report results keyed by report + normalized filters + permission scope
+Path: hotel_management/hotel_management/report_cache.py
+
+Usage in a report module:
+    @cached_report("Occupancy Report")
+    def execute(filters=None):
+        ...
+
+Entries expire after REPORT_CACHE_TTL seconds and are dropped early by
+Reservation, Owner Settlement and Maintenance Request events that touch
+the entry's property and date range.
+"""
+
+import hashlib
+import json
+import time
+from functools import wraps
+
+import frappe
+from frappe import _
+from frappe.utils import flt, getdate
+
+REPORT_CACHE_TTL = 15 * 60
+
+CACHE_PREFIX = "hotel_report_cache"
+INDEX_KEY = "hotel_report_cache_index"
+STATS_KEY = "hotel_report_cache_stats"
+
+
+# ========================================
+# Keys
+# ========================================
+
+def normalize_filters(filters):
+    """Drop empty values and sort keys so equivalent filter sets share a key"""
+    normalized = {}
+    for key, value in (filters or {}).items():
+        if value in (None, "", [], {}):
+            continue
+        if isinstance(value, (list, tuple)):
+            value = sorted(str(v) for v in value)
+        else:
+            value = str(value)
+        normalized[key] = value
+    return normalized
+
+
+def get_permission_scope(user=None):
+    """Roles plus Property / Owner user permissions - users with the same scope see the same rows"""
+    user = user or frappe.session.user
+    user_permissions = frappe.permissions.get_user_permissions(user) or {}
+
+    scope = {
+        "roles": sorted(frappe.get_roles(user)),
+        "permissions": {
+            doctype: sorted(p.get("doc") for p in user_permissions.get(doctype, []))
+            for doctype in ("Property", "Owner", "Property Unit")
+            if user_permissions.get(doctype)
+        }
+    }
+    return hashlib.sha1(json.dumps(scope, sort_keys=True).encode()).hexdigest()[:12]
+
+
+def get_cache_key(report_name, filters, user=None):
+    payload = json.dumps({
+        "report": report_name,
+        "filters": normalize_filters(filters),
+        "scope": get_permission_scope(user)
+    }, sort_keys=True)
+    return "{0}|{1}|{2}".format(
+        CACHE_PREFIX, frappe.scrub(report_name), hashlib.sha1(payload.encode()).hexdigest())
+
+
+# ========================================
+# Read / write
+# ========================================
+
+def cached_report(report_name, ttl=REPORT_CACHE_TTL):
+    """Decorator for a script report's execute(filters)"""
+    def decorator(execute):
+        @wraps(execute)
+        def wrapper(filters=None):
+            key = get_cache_key(report_name, filters)
+            cache = frappe.cache()
+
+            entry = cache.get_value(key)
+            if entry is not None:
+                record_stat(report_name, "hits", 1)
+                record_stat(report_name, "time_saved", entry["duration"])
+                return entry["result"]
+
+            start = time.monotonic()
+            result = execute(filters)
+            duration = time.monotonic() - start
+
+            cache.set_value(key, {"result": result, "duration": duration}, expires_in_sec=ttl)
+            cache.hset(INDEX_KEY, key, get_entry_scope(report_name, filters))
+
+            record_stat(report_name, "misses", 1)
+            record_stat(report_name, "compute_time", duration)
+            return result
+
+        return wrapper
+    return decorator
+
+
+def get_entry_scope(report_name, filters):
+    """What an entry depends on, for targeted invalidation (None = any)"""
+    filters = filters or {}
+    return {
+        "report": report_name,
+        "property": filters.get("property"),
+        "from_date": str(filters.get("from_date")) if filters.get("from_date") else None,
+        "to_date": str(filters.get("to_date")) if filters.get("to_date") else None
+    }
+
+
+def record_stat(report_name, field, amount):
+    """Atomic counter so concurrent workers don't lose increments"""
+    cache = frappe.cache()
+    key = cache.make_key(STATS_KEY)
+    cache.hincrbyfloat(key, "{0}:{1}".format(report_name, field), amount)
+
+
+# ========================================
+# Invalidation
+# ========================================
+
+def invalidate_report_cache(properties=None, from_date=None, to_date=None):
+    """
+    Drop cached results whose property and date range overlap the change
+    properties=None means the change may affect any property
+    """
+    cache = frappe.cache()
+    index = cache.hgetall(INDEX_KEY) or {}
+    properties = set(properties) if properties else None
+    from_date = getdate(from_date) if from_date else None
+    to_date = getdate(to_date) if to_date else None
+
+    stale = []
+    for key, scope in index.items():
+        key = frappe.safe_decode(key)
+
+        # Expired by TTL - just forget it
+        if cache.get_value(key) is None:
+            stale.append(key)
+            continue
+
+        if properties and scope.get("property") and scope["property"] not in properties:
+            continue
+        if to_date and scope.get("from_date") and getdate(scope["from_date"]) > to_date:
+            continue
+        if from_date and scope.get("to_date") and getdate(scope["to_date"]) < from_date:
+            continue
+
+        cache.delete_value(key)
+        stale.append(key)
+
+    for key in stale:
+        cache.hdel(INDEX_KEY, key)
+
+    return len(stale)
+
+
+def get_unit_properties(units):
+    units = [u for u in units if u]
+    if not units:
+        return []
+    return frappe.get_all("Property Unit",
+        filters={"name": ["in", units]}, pluck="property", distinct=True)
+
+
+def on_reservation_change(doc, method=None):
+    """doc_event: Reservation submit / cancel / update / status change"""
+    rows = doc.get("units_reserved") or []
+    check_ins = [getdate(r.check_in or doc.check_in) for r in rows if (r.check_in or doc.check_in)]
+    check_outs = [getdate(r.check_out or doc.check_out) for r in rows if (r.check_out or doc.check_out)]
+
+    invalidate_report_cache(
+        get_unit_properties([r.unit for r in rows]) or None,
+        min(check_ins) if check_ins else doc.check_in,
+        max(check_outs) if check_outs else doc.check_out
+    )
+
+
+def on_settlement_change(doc, method=None):
+    """doc_event: Owner Settlement submit / cancel / update"""
+    properties = get_unit_properties([doc.property_unit]) if doc.get("property_unit") else None
+    invalidate_report_cache(properties or None, doc.period_start, doc.period_end)
+
+
+def on_maintenance_change(doc, method=None):
+    """doc_event: Maintenance Request update / delete"""
+    dates = [getdate(d) for d in (doc.get("reported_date"), doc.get("resolution_date")) if d]
+    invalidate_report_cache(
+        get_unit_properties([doc.get("property_unit")]) or None,
+        min(dates) if dates else None,
+        max(dates) if dates else None
+    )
+
+
+# ========================================
+# Stats / admin
+# ========================================
+
+@frappe.whitelist()
+def get_report_cache_stats():
+    """API: hit ratio and time saved per report"""
+    cache = frappe.cache()
+    # Counters are plain redis numbers (HINCRBYFLOAT), not pickled values
+    raw = cache.execute_command("HGETALL", cache.make_key(STATS_KEY)) or {}
+
+    reports = {}
+    for field, value in raw.items():
+        report_name, stat = frappe.safe_decode(field).rsplit(":", 1)
+        reports.setdefault(report_name, {})[stat] = flt(frappe.safe_decode(value))
+
+    stats = []
+    for report_name, values in sorted(reports.items()):
+        hits = values.get("hits", 0)
+        misses = values.get("misses", 0)
+        lookups = hits + misses
+        stats.append({
+            "report": report_name,
+            "hits": int(hits),
+            "misses": int(misses),
+            "hit_ratio": flt(hits * 100.0 / lookups, 2) if lookups else 0,
+            "avg_compute_seconds": flt(values.get("compute_time", 0) / misses, 3) if misses else 0,
+            "time_saved_seconds": flt(values.get("time_saved", 0), 2)
+        })
+
+    return stats
+
+
+@frappe.whitelist()
+def clear_report_cache(reset_stats=False):
+    """API: drop every cached report result"""
+    frappe.only_for("System Manager")
+
+    cache = frappe.cache()
+    keys = [frappe.safe_decode(k) for k in (cache.hgetall(INDEX_KEY) or {})]
+    for key in keys:
+        cache.delete_value(key)
+    cache.delete_value(INDEX_KEY)
+
+    if frappe.parse_json(reset_stats):
+        cache.delete(cache.make_key(STATS_KEY))
+
+    return {
+        "success": True,
+        "message": _("{0} cached report results cleared").format(len(keys))
+    }
@@ -0,0 +1,180 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming Report Export
+Writes large script report results to CSV / XLSX page by page in a background job
+Path: hotel_management/hotel_management/report_export.py
+
+Each exportable report module provides:
+    get_export_columns(filters) -> list of column dicts
+    get_export_pages(filters, page_size) -> generator of row pages (keyset paginated)
+"""
+
+import csv
+import os
+
+import frappe
+from frappe import _
+from frappe.utils import cint, now_datetime
+
+PAGE_SIZE = 5000
+
+EXPORTABLE_REPORTS = {
+    "Revenue by Unit": "hotel_management.hotel_management.report.revenue_by_unit.revenue_by_unit",
+    "Guest History Report": "hotel_management.hotel_management.report.guest_history_report.guest_history_report",
+    "Owner Settlement Summary": "hotel_management.hotel_management.report.owner_settlement_summary.owner_settlement_summary",
+}
+
+FILE_FORMATS = ("CSV", "Excel")
+
+
+def iter_keyset_pages(fetch_page, key, page_size):
+    """
+    Generic keyset pagination loop
+    fetch_page(after, limit) must return rows ordered by `key` ascending
+    """
+    after = None
+    while True:
+        rows = fetch_page(after, page_size)
+        if not rows:
+            return
+
+        yield rows
+
+        if len(rows) < page_size:
+            return
+        after = rows[-1][key]
+
+
+class CSVSink:
+    """Append rows to a CSV file"""
+
+    def __init__(self, path, columns):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow([c.get("label") for c in columns])
+
+    def write(self, values):
+        self.writer.writerows(values)
+
+    def close(self):
+        self.file.close()
+
+
+class XLSXSink:
+    """Append rows to an XLSX file using openpyxl's write-only (streaming) mode"""
+
+    def __init__(self, path, columns):
+        from openpyxl import Workbook
+
+        self.path = path
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet("Report")
+        self.sheet.append([c.get("label") for c in columns])
+
+    def write(self, values):
+        for row in values:
+            self.sheet.append(row)
+
+    def close(self):
+        self.workbook.save(self.path)
+
+
+def stream_report(report_name, filters, file_format="CSV", page_size=PAGE_SIZE):
+    """
+    Stream a report to a private file, one keyset page at a time
+
+    Returns:
+        dict: file_url and row count
+    """
+    if report_name not in EXPORTABLE_REPORTS:
+        frappe.throw(_("Report {0} does not support streaming export").format(report_name))
+    if file_format not in FILE_FORMATS:
+        frappe.throw(_("File format must be CSV or Excel"))
+
+    module = frappe.get_module(EXPORTABLE_REPORTS[report_name])
+    filters = frappe._dict(filters or {})
+    columns = module.get_export_columns(filters)
+    fieldnames = [c["fieldname"] for c in columns]
+
+    extension = "csv" if file_format == "CSV" else "xlsx"
+    file_name = "{0}-{1}.{2}".format(
+        frappe.scrub(report_name), now_datetime().strftime("%Y%m%d-%H%M%S"), extension)
+    path = frappe.get_site_path("private", "files", file_name)
+
+    sink = CSVSink(path, columns) if file_format == "CSV" else XLSXSink(path, columns)
+    row_count = 0
+
+    try:
+        for rows in module.get_export_pages(filters, cint(page_size) or PAGE_SIZE):
+            sink.write([[row.get(f) for f in fieldnames] for row in rows])
+            row_count += len(rows)
+    finally:
+        sink.close()
+
+    file_doc = frappe.get_doc({
+        "doctype": "File",
+        "file_name": file_name,
+        "file_url": "/private/files/" + file_name,
+        "is_private": 1,
+        "file_size": os.path.getsize(path)
+    })
+    file_doc.insert(ignore_permissions=True)
+
+    return {
+        "report": report_name,
+        "file_url": file_doc.file_url,
+        "rows": row_count
+    }
+
+
+def run_export(report_name, filters, file_format, user):
+    """Background job: export and notify the requesting user"""
+    try:
+        result = stream_report(report_name, filters, file_format)
+        frappe.db.commit()
+
+        frappe.publish_realtime("report_export_ready", result, user=user)
+        frappe.publish_realtime("msgprint", {
+            "title": _("Export Ready"),
+            "message": _("{0}: {1} rows exported. <a href='{2}' target='_blank'>Download</a>").format(
+                report_name, result["rows"], result["file_url"]),
+            "indicator": "green"
+        }, user=user)
+    except Exception:
+        frappe.log_error(frappe.get_traceback(), f"Report Export Failed - {report_name}")
+        frappe.publish_realtime("msgprint", {
+            "title": _("Export Failed"),
+            "message": _("Export of {0} failed. Please check the Error Log.").format(report_name),
+            "indicator": "red"
+        }, user=user)
+
+
+@frappe.whitelist()
+def export_report(report_name, filters=None, file_format="CSV"):
+    """
+    API: queue a streaming export of a script report
+    The user gets a realtime message with the download link when done
+    """
+    if report_name not in EXPORTABLE_REPORTS:
+        frappe.throw(_("Report {0} does not support streaming export").format(report_name))
+
+    if not frappe.get_doc("Report", report_name).is_permitted():
+        frappe.throw(_("Not permitted to export {0}").format(report_name), frappe.PermissionError)
+
+    if isinstance(filters, str):
+        filters = frappe.parse_json(filters)
+
+    frappe.enqueue(
+        run_export,
+        queue="long",
+        timeout=7200,
+        report_name=report_name,
+        filters=filters,
+        file_format=file_format,
+        user=frappe.session.user
+    )
+
+    return {
+        "success": True,
+        "message": _("Export started. You will be notified when the file is ready.")
+    }
@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+Room Assignment Optimizer
+Reassigns movable bookings between units of the same type to close unsellable gaps
+Path: hotel_management/hotel_management/room_assignment.py
+
+Reservation Unit.assignment:
+    Fixed      - never moved (default; Checked-In and already started stays are always fixed)
+    Movable    - may be moved; every move is counted against the plan
+    Type Only  - the guest booked a unit type, the unit is a placeholder; moving is free
+
+Per unit type the horizon is a NumPy occupancy grid (units x nights):
+    1. Fixed stays are painted on the grid, movable stays are lifted off
+    2. Movable stays are placed again in check-in order (greedy interval graph
+       coloring); each goes to the free unit with the lowest cost:
+           orphan nights it leaves on either side, minus a bonus for sitting
+           flush against a neighbour, plus a penalty for moving a Movable stay
+    3. The plan is kept only if it leaves fewer orphan nights than today's layout
+
+Units in Maintenance stay on the grid (their stays count as fixed) but never
+receive a moved stay.
+
+An orphan night is a free gap of at most ORPHAN_MAX_NIGHTS between two stays.
+Every candidate check is one vectorized slice of the grid, so 2,000 units x
+90 nights (about 50,000 stays) plan in a few seconds. Applying writes all
+moves with a single UPDATE.
+"""
+
+import frappe
+import numpy as np
+from frappe import _
+from frappe.utils import add_days, cint, getdate, now, today
+
+ASSIGNMENT_HORIZON_DAYS = 90
+ASSIGNMENT_MAX_DAYS = 365
+
+# Free gaps this short between two stays are considered unsellable
+ORPHAN_MAX_NIGHTS = 1
+
+ORPHAN_NIGHT_COST = 4
+ROOM_MOVE_COST = 3
+ADJACENT_BONUS = 1
+
+
+# ========================================
+# Grid
+# ========================================
+
+def count_orphan_nights(occupied, max_nights=ORPHAN_MAX_NIGHTS):
+    """Free nights in gaps of <= max_nights with a stay on both sides (units x nights bool grid)"""
+    units, days = occupied.shape
+    if not units or not days:
+        return 0
+
+    # 0 free, 1 busy, 2 row boundary - rows laid end to end so one pass finds every gap
+    state = np.full((units, days + 1), 2, dtype=np.int8)
+    state[:, :days] = occupied
+    flat = state.ravel()
+
+    edges = np.diff(np.concatenate(([0], (flat == 0).astype(np.int8), [0])))
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+
+    before = np.where(starts > 0, flat[np.maximum(starts - 1, 0)], 2)
+    after = flat[ends]
+    lengths = ends - starts
+    orphan = (before == 1) & (after == 1) & (lengths <= max_nights)
+    return int(lengths[orphan].sum())
+
+
+def gap_lengths(window, side):
+    """
+    Free nights between a stay and the nearest busy night in `window` (nights x units)
+    side="left": window ends at the stay; side="right": window starts after it
+    -1 when the window holds no busy night (gap longer than the window)
+    """
+    rows = window[::-1] if side == "left" else window
+    gaps = np.full(window.shape[1], -1)
+    # The window is only ORPHAN_MAX_NIGHTS + 1 nights deep - walk it outwards
+    for distance, row in enumerate(rows):
+        gaps[(gaps < 0) & row] = distance
+    return gaps
+
+
+def plan_unit_type(units, stays, days, closed=()):
+    """
+    units: unit names of one type; stays: dicts with row, unit, start, end (night
+    offsets from the horizon start) and assignment; closed: units that take no
+    new stays (out of order). Returns (moves, before, after) where
+    moves = [(stay, new_unit)] - empty when no better layout was found.
+    """
+    position = {unit: i for i, unit in enumerate(units)}
+    open_units = np.array([unit not in closed for unit in units], dtype=bool)
+    days = max([days] + [stay["end"] for stay in stays])
+
+    fixed = np.zeros((len(units), days), dtype=bool)
+    original = np.zeros((len(units), days), dtype=bool)
+    movable = []
+    for stay in stays:
+        row = position.get(stay["unit"])
+        if row is None:
+            continue
+        start, end = max(stay["start"], 0), stay["end"]
+        original[row, start:end] = True
+        if stay["assignment"] in ("Movable", "Type Only") and stay["start"] >= 0 and open_units[row]:
+            movable.append(stay)
+        else:
+            fixed[row, start:end] = True
+
+    orphans_before = count_orphan_nights(original)
+    if not movable:
+        return [], orphans_before, orphans_before
+
+    # Nights x units, so each night range is a contiguous block of rows
+    grid = np.ascontiguousarray(fixed.T)
+    reach = ORPHAN_MAX_NIGHTS + 1
+    moves = []
+    for stay in sorted(movable, key=lambda s: (s["start"], -(s["end"] - s["start"]), s["row"])):
+        start, end = stay["start"], stay["end"]
+        candidates = np.flatnonzero(~grid[start:end].any(axis=0) & open_units)
+        if not candidates.size:
+            # Greedy order painted itself into a corner - keep the current layout
+            return [], orphans_before, orphans_before
+
+        left = gap_lengths(grid[max(start - reach, 0):start], "left")[candidates]
+        right = gap_lengths(grid[end:end + reach], "right")[candidates]
+
+        cost = ORPHAN_NIGHT_COST * (np.where(left > 0, left, 0) + np.where(right > 0, right, 0))
+        cost -= ADJACENT_BONUS * ((left == 0).astype(int) + (right == 0).astype(int))
+        current = position.get(stay["unit"])
+        if stay["assignment"] == "Movable":
+            cost += ROOM_MOVE_COST * (candidates != current)
+
+        # Ties keep the current unit, then the lowest unit
+        best = candidates[np.lexsort((candidates, candidates != current, cost))[0]]
+        grid[start:end, best] = True
+        if best != current:
+            moves.append((stay, units[best]))
+
+    orphans_after = count_orphan_nights(grid.T)
+    if orphans_after >= orphans_before:
+        return [], orphans_before, orphans_before
+    return moves, orphans_before, orphans_after
+
+
+# ========================================
+# Data
+# ========================================
+
+def get_assignment_data(property, start, end, unit_type=None, for_update=False):
+    """Units grouped by type and the stays on them overlapping [start, end) - two queries"""
+    conditions = "AND unit_type = %(unit_type)s" if unit_type else ""
+    units = frappe.db.sql("""
+        SELECT name, unit_type, status
+        FROM `tabProperty Unit`
+        WHERE property = %(property)s {conditions}
+        ORDER BY name
+    """.format(conditions=conditions), {"property": property, "unit_type": unit_type}, as_dict=1)
+
+    stays = frappe.db.sql("""
+        SELECT
+            ru.name as row, ru.parent as reservation, ru.unit, pu.unit_type,
+            COALESCE(ru.check_in, r.check_in) as check_in,
+            COALESCE(ru.check_out, r.check_out) as check_out,
+            IF(r.status = 'Checked-In', 'Fixed', COALESCE(ru.assignment, 'Fixed')) as assignment
+        FROM `tabReservation Unit` ru
+        JOIN `tabReservation` r ON r.name = ru.parent
+        JOIN `tabProperty Unit` pu ON pu.name = ru.unit
+        WHERE pu.property = %(property)s {conditions}
+        AND ru.parenttype = 'Reservation'
+        AND r.docstatus = 1
+        AND r.status IN ('Confirmed', 'Checked-In')
+        AND COALESCE(ru.check_in, r.check_in) < %(end)s
+        AND COALESCE(ru.check_out, r.check_out) > %(start)s
+        {lock}
+    """.format(conditions="AND pu.unit_type = %(unit_type)s" if unit_type else "",
+        lock="FOR UPDATE" if for_update else ""),
+        {"property": property, "unit_type": unit_type, "start": start, "end": end}, as_dict=1)
+
+    return units, stays
+
+
+def build_assignment_plan(property, start_date=None, days=None, unit_type=None, for_update=False):
+    start = getdate(start_date or today())
+    days = min(cint(days) or ASSIGNMENT_HORIZON_DAYS, ASSIGNMENT_MAX_DAYS)
+    units, stays = get_assignment_data(property, start, add_days(start, days), unit_type, for_update)
+
+    by_type = {}
+    closed = {unit.name for unit in units if unit.status == "Maintenance"}
+    for unit in units:
+        by_type.setdefault(unit.unit_type, ([], []))[0].append(unit.name)
+    for stay in stays:
+        stay["start"] = (getdate(stay.check_in) - start).days
+        stay["end"] = (getdate(stay.check_out) - start).days
+        if stay.unit_type in by_type:
+            by_type[stay.unit_type][1].append(stay)
+
+    plan = {"property": property, "start": str(start), "days": days, "unit_types": [], "moves": []}
+    for type_name, (type_units, type_stays) in sorted(by_type.items()):
+        moves, before, after = plan_unit_type(type_units, type_stays, days, closed)
+        plan["unit_types"].append({
+            "unit_type": type_name,
+            "units": len(type_units),
+            "stays": len(type_stays),
+            "orphan_nights_before": before,
+            "orphan_nights_after": after,
+            "room_moves": sum(1 for stay, _unit in moves if stay.assignment == "Movable")
+        })
+        plan["moves"].extend({
+            "row": stay.row,
+            "reservation": stay.reservation,
+            "from_unit": stay.unit,
+            "to_unit": unit,
+            "check_in": str(stay.check_in),
+            "check_out": str(stay.check_out),
+            "assignment": stay.assignment
+        } for stay, unit in moves)
+
+    plan["orphan_nights_before"] = sum(t["orphan_nights_before"] for t in plan["unit_types"])
+    plan["orphan_nights_after"] = sum(t["orphan_nights_after"] for t in plan["unit_types"])
+    plan["room_moves"] = sum(t["room_moves"] for t in plan["unit_types"])
+    return plan
+
+
+# ========================================
+# API
+# ========================================
+
+@frappe.whitelist()
+def optimize_room_assignments(property, start_date=None, days=None, unit_type=None, apply=0):
+    """
+    API: proposed reassignment of Movable / Type Only stays for a property
+    apply=1 re-plans under row locks and writes the moves in the same transaction
+    """
+    frappe.has_permission("Reservation", "write", throw=True)
+    if not frappe.db.exists("Property", property):
+        frappe.throw(_("Property {0} not found").format(property))
+
+    apply = cint(apply)
+    plan = build_assignment_plan(property, start_date, days, unit_type, for_update=apply)
+    plan["applied"] = False
+    if apply and plan["moves"]:
+        apply_assignment_plan(property, plan)
+        plan["applied"] = True
+    return plan
+
+
+def apply_assignment_plan(property, plan):
+    """One UPDATE for every moved row, then the side effects a unit change has"""
+    from hotel_management.hotel_management.doctype.calendar_tombstone.calendar_tombstone import write_tombstones
+    from hotel_management.hotel_management.doctype.property_unit.property_unit import (
+        invalidate_unit_stats, refresh_unit_reservation_pointers)
+    from hotel_management.hotel_management.report_cache import invalidate_report_cache
+    from hotel_management.hotel_management.unit_status import reconcile_unit_statuses
+
+    moves = plan["moves"]
+    values = {"modified": now(), "rows": [move["row"] for move in moves]}
+    cases = []
+    for i, move in enumerate(moves):
+        values["row_{0}".format(i)] = move["row"]
+        values["unit_{0}".format(i)] = move["to_unit"]
+        cases.append("WHEN %(row_{0})s THEN %(unit_{0})s".format(i))
+
+    frappe.db.sql("""
+        UPDATE `tabReservation Unit`
+        SET unit = CASE name {cases} END, modified = %(modified)s
+        WHERE name IN %(rows)s
+    """.format(cases=" ".join(cases)), values)
+
+    # The calendar drops the old bars and picks up the moved rows by `modified`
+    by_reservation = {}
+    for move in moves:
+        by_reservation.setdefault(move["reservation"], []).append(frappe._dict(
+            unit=move["from_unit"], check_in=move["check_in"], check_out=move["check_out"]))
+    for reservation, rows in by_reservation.items():
+        write_tombstones(reservation, rows, "Unit Removed")
+
+    units = sorted({move["from_unit"] for move in moves} | {move["to_unit"] for move in moves})
+    refresh_unit_reservation_pointers(units)
+    reconcile_unit_statuses(property)
+    frappe.db.after_commit.add(lambda: invalidate_unit_stats(units))
+    invalidate_report_cache([property], plan["start"], add_days(plan["start"], plan["days"]))
+
+    frappe.publish_realtime("room_assignments_changed", {
+        "property": property,
+        "moves": len(moves)
+    }, after_commit=True)
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+"""
+Unit Provisioning
+Creates a property's Property Units in bulk from a floors x rooms pattern
+Path: hotel_management/hotel_management/unit_provisioning.py
+
+Example (floors 1-6, rooms 01-20; rooms 16-20 are suites):
+    provision_units(
+        property="Nile Tower",
+        floors="1-6",
+        rooms="1-20",
+        pattern="{floor}{room:02d}",
+        unit_types=[{"unit_type": "Suite", "rooms": "16-20"}, {"unit_type": "Double Room"}],
+        revenue_account="Room Revenue - NT"
+    )
+
+Shared settings (property, unit types, owner, accounts) are validated once;
+generated IDs are checked for collisions within the batch and against
+existing units in one query, then everything is written with bulk_insert.
+"""
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, now
+
+# Most units one provisioning call may create
+PROVISION_MAX_UNITS = 5000
+
+# New units carry no reservation, so Booked / Occupied cannot be true yet
+PROVISION_STATUSES = ("Available", "Cleaning", "Maintenance")
+
+UNIT_FIELDS = [
+    "name", "creation", "modified", "owner", "modified_by", "docstatus", "idx",
+    "unit_id", "property", "unit_type", "floor", "status", "rate_per_night",
+    "property_owner", "is_owner_managed",
+    "item_code", "revenue_account", "expense_account", "cost_center"
+]
+
+
+# ========================================
+# Pattern
+# ========================================
+
+def parse_range(value):
+    """'1-6' / '1,3,5-8' / ['G', 1, 2] -> list (numbers as int, other labels as str)"""
+    if value in (None, ""):
+        return []
+    if isinstance(value, str) and value.strip().startswith("["):
+        value = frappe.parse_json(value)
+    if isinstance(value, (list, tuple)):
+        parts = value
+    else:
+        parts = [part.strip() for part in str(value).split(",") if part.strip()]
+
+    values = []
+    for part in parts:
+        if isinstance(part, int):
+            values.append(part)
+            continue
+        part = str(part).strip()
+        start, sep, end = part.partition("-")
+        if sep and start.isdigit() and end.isdigit():
+            if cint(end) < cint(start):
+                frappe.throw(_("Invalid range {0}").format(part))
+            values.extend(range(cint(start), cint(end) + 1))
+        else:
+            values.append(cint(part) if part.isdigit() else part)
+    return values
+
+
+def format_unit_id(pattern, floor, room):
+    try:
+        return pattern.format(floor=floor, room=room)
+    except (KeyError, IndexError, ValueError):
+        frappe.throw(_("Invalid unit ID pattern {0} - use {{floor}} and {{room}}, e.g. {{floor}}{{room:02d}}")
+            .format(pattern))
+
+
+def build_unit_plan(floors, rooms, pattern, unit_types, rate_per_night=None):
+    """
+    Every (floor, room) -> {unit_id, floor, unit_type, rate_per_night}
+    unit_types: [{"unit_type", "rooms"?, "floors"?, "rate_per_night"?}, ...] - first
+    entry whose rooms / floors match wins; an entry without either is the default
+    """
+    mix = []
+    for entry in unit_types:
+        mix.append({
+            "unit_type": entry.get("unit_type"),
+            "rooms": set(parse_range(entry.get("rooms"))),
+            "floors": set(parse_range(entry.get("floors"))),
+            "rate_per_night": entry.get("rate_per_night")
+        })
+
+    plan = []
+    for floor in parse_range(floors):
+        for room in parse_range(rooms):
+            entry = next((
+                e for e in mix
+                if (not e["rooms"] or room in e["rooms"]) and (not e["floors"] or floor in e["floors"])
+            ), None)
+            if not entry:
+                frappe.throw(_("No unit type matches floor {0} room {1}").format(floor, room))
+
+            plan.append({
+                "unit_id": format_unit_id(pattern, floor, room),
+                "floor": str(floor),
+                "unit_type": entry["unit_type"],
+                "rate_per_night": entry["rate_per_night"] if entry["rate_per_night"] is not None else rate_per_night
+            })
+    return plan
+
+
+# ========================================
+# Validation
+# ========================================
+
+def validate_shared_settings(property, unit_types, property_owner=None, revenue_account=None,
+        expense_account=None, item_code=None, cost_center=None):
+    """Checks PropertyUnit.validate would repeat per unit, done once per batch"""
+    from hotel_management.hotel_management.doctype.property_unit.property_unit import validate_unit_accounts
+
+    if not frappe.db.exists("Property", property):
+        frappe.throw(_("Property {0} not found").format(property))
+
+    for link_doctype, value in (("Owner", property_owner), ("Item", item_code), ("Cost Center", cost_center)):
+        if value and not frappe.db.exists(link_doctype, value):
+            frappe.throw(_("{0} {1} not found").format(_(link_doctype), value))
+
+    validate_unit_accounts(revenue_account, expense_account)
+
+    names = {entry.get("unit_type") for entry in unit_types}
+    if None in names or "" in names:
+        frappe.throw(_("Every unit type entry needs a unit_type"))
+
+    found = {
+        row.name: row for row in frappe.get_all("Unit Type",
+            filters={"name": ["in", list(names)]}, fields=["name", "is_active", "default_rate"])
+    }
+    missing = names - set(found)
+    if missing:
+        frappe.throw(_("Unit Type not found: {0}").format(", ".join(sorted(missing))))
+    inactive = [name for name, row in found.items() if not row.is_active]
+    if inactive:
+        frappe.throw(_("Unit Type is inactive: {0}").format(", ".join(sorted(inactive))))
+
+    return {name: row.default_rate for name, row in found.items()}
+
+
+def find_collisions(unit_ids):
+    """IDs repeated in the batch plus IDs already used by a unit (one query)"""
+    seen, duplicates = set(), set()
+    for unit_id in unit_ids:
+        key = unit_id.lower()
+        if key in seen:
+            duplicates.add(unit_id)
+        seen.add(key)
+
+    existing = set()
+    batch_size = 1000
+    for i in range(0, len(unit_ids), batch_size):
+        existing.update(frappe.get_all("Property Unit",
+            filters={"name": ["in", unit_ids[i:i + batch_size]]}, pluck="name"))
+
+    return sorted(duplicates), sorted(existing)
+
+
+# ========================================
+# API
+# ========================================
+
+@frappe.whitelist()
+def provision_units(property, floors, rooms, unit_types, pattern="{floor}{room:02d}",
+        rate_per_night=None, property_owner=None, is_owner_managed=0,
+        revenue_account=None, expense_account=None, item_code=None, cost_center=None,
+        status="Available", skip_existing=0, dry_run=0):
+    """
+    API: create a property's units from a floors x rooms pattern
+    unit_types: a unit type name, or a JSON list of {"unit_type", "rooms", "floors", "rate_per_night"}
+    Rates fall back to rate_per_night, then the unit type's default rate.
+    Existing IDs abort the batch unless skip_existing=1; dry_run=1 only returns the plan.
+    """
+    from hotel_management.hotel_management.unit_status import UNIT_STATUSES
+
+    frappe.has_permission("Property Unit", "create", throw=True)
+
+    if status not in UNIT_STATUSES:
+        frappe.throw(_("Invalid status: {0}").format(status))
+    if status not in PROVISION_STATUSES:
+        frappe.throw(_("New units can only be {0}").format(", ".join(PROVISION_STATUSES)))
+
+    if isinstance(unit_types, str):
+        unit_types = frappe.parse_json(unit_types) if unit_types.strip().startswith("[") else [{"unit_type": unit_types}]
+
+    default_rates = validate_shared_settings(property, unit_types, property_owner,
+        revenue_account, expense_account, item_code, cost_center)
+
+    plan = build_unit_plan(floors, rooms, pattern, unit_types, rate_per_night)
+    if not plan:
+        frappe.throw(_("The pattern produced no units"))
+    if len(plan) > PROVISION_MAX_UNITS:
+        frappe.throw(_("Cannot create more than {0} units at once").format(PROVISION_MAX_UNITS))
+
+    duplicates, existing = find_collisions([unit["unit_id"] for unit in plan])
+    if duplicates:
+        frappe.throw(_("The pattern generates duplicate unit IDs: {0}").format(", ".join(duplicates[:20])))
+    if existing and not frappe.parse_json(skip_existing):
+        frappe.throw(_("{0} unit IDs already exist: {1}").format(len(existing), ", ".join(existing[:20])))
+
+    existing_keys = {name.lower() for name in existing}
+    plan = [unit for unit in plan if unit["unit_id"].lower() not in existing_keys]
+    for unit in plan:
+        if unit["rate_per_night"] in (None, ""):
+            unit["rate_per_night"] = default_rates.get(unit["unit_type"])
+        if flt(unit["rate_per_night"]) < 0:
+            frappe.throw(_("Rate per night must be positive"))
+
+    result = {
+        "dry_run": bool(frappe.parse_json(dry_run)),
+        "created": 0 if frappe.parse_json(dry_run) else len(plan),
+        "skipped_existing": existing,
+        "units": plan
+    }
+    if result["dry_run"] or not plan:
+        return result
+
+    timestamp = now()
+    user = frappe.session.user
+    frappe.db.bulk_insert("Property Unit", UNIT_FIELDS, [
+        (
+            unit["unit_id"], timestamp, timestamp, user, user, 0, 0,
+            unit["unit_id"], property, unit["unit_type"], unit["floor"], status, flt(unit["rate_per_night"]),
+            property_owner, cint(is_owner_managed),
+            item_code, revenue_account, expense_account, cost_center
+        )
+        for unit in plan
+    ])
+
+    after_units_provisioned(property, plan, status)
+    return result
+
+
+def after_units_provisioned(property, plan, status):
+    """What the per-unit on_update hooks would have done, once per batch"""
+    from frappe.utils import add_days, today
+
+    from hotel_management.hotel_management.availability_heatmap import queue_heatmap_invalidation
+    from hotel_management.hotel_management.dashboard_api import invalidate_dashboard_snapshot
+    from hotel_management.hotel_management.doctype.hotel_daily_kpi.hotel_daily_kpi import KPI_HORIZON_DAYS, write_kpis
+    from hotel_management.hotel_management.doctype.unit_status_log.unit_status_log import write_status_log
+    from hotel_management.hotel_management.live_counters import queue_adjustment
+    from hotel_management.hotel_management.report_cache import invalidate_report_cache
+
+    write_status_log([(unit["unit_id"], property, None, status) for unit in plan], source="Provisioning")
+    queue_adjustment(property, {"units:" + status: len(plan)})
+
+    horizon_end = add_days(today(), KPI_HORIZON_DAYS)
+    for unit_type in {unit["unit_type"] for unit in plan}:
+        write_kpis(today(), horizon_end, property, unit_type)
+
+    invalidate_dashboard_snapshot([property])
+    invalidate_report_cache([property])
+    queue_heatmap_invalidation([property])
@@ -0,0 +1,483 @@
+# -*- coding: utf-8 -*-
+"""
+Unit Status Service
+Single entry point for changing a Property Unit's status, plus history queries
+Path: hotel_management/hotel_management/unit_status.py
+
+Every change goes through set_unit_status() / apply_status_changes(), which
+update the unit, append rows to the Unit Status Log, adjust the live counters
+and notify the dashboard / realtime feed. Form saves of a Property Unit are
+logged by the log_form_status_change doc_event. reconcile_unit_statuses()
+re-derives every unit's status from reservations, maintenance and
+housekeeping and applies only the differences.
+
+The log is append-only and indexed on (unit, ts); each row opens an interval
+that lasts until the unit's next row, which is what the point-in-time,
+duration and turnaround queries below are built on.
+"""
+
+import frappe
+import numpy as np
+from frappe import _
+from frappe.utils import flt, get_datetime, now, now_datetime, today
+
+
+def set_unit_status(unit, status, reference=None, source=None):
+    """
+    Change a unit's status without loading the document
+    reference: the document causing the change (logged with it); source defaults to its doctype
+    Returns the previous status
+    """
+    current = frappe.db.get_value("Property Unit", unit, ["property", "status"], as_dict=1)
+    if not current or current.status == status:
+        return current.status if current else None
+
+    apply_status_changes([(unit, current.property, current.status, status)],
+        source=source or (reference.doctype if reference else None), reference=reference)
+
+    return current.status
+
+
+def apply_status_changes(changes, source=None, reference=None):
+    """
+    Write many status changes at once: one UPDATE, one log insert, one counter batch
+    changes: list of (unit, property, from_status, status)
+    """
+    from hotel_management.hotel_management.doctype.unit_status_log.unit_status_log import write_status_log
+    from hotel_management.hotel_management.live_counters import queue_adjustment
+
+    changes = [change for change in changes if change[2] != change[3]]
+    if not changes:
+        return []
+
+    values = {"units": [change[0] for change in changes], "modified": now(), "user": frappe.session.user}
+    cases = []
+    for i, (unit, property, from_status, status) in enumerate(changes):
+        values["unit_{0}".format(i)] = unit
+        values["status_{0}".format(i)] = status
+        cases.append("WHEN %(unit_{0})s THEN %(status_{0})s".format(i))
+
+    frappe.db.sql("""
+        UPDATE `tabProperty Unit`
+        SET status = CASE name {cases} END,
+            modified = %(modified)s,
+            modified_by = %(user)s
+        WHERE name IN %(units)s
+    """.format(cases=" ".join(cases)), values)
+
+    write_status_log(changes, source=source,
+        reference_doctype=reference.doctype if reference else None,
+        reference_name=reference.name if reference else None)
+
+    for unit, property, from_status, status in changes:
+        deltas = {"units:" + status: 1}
+        if from_status:
+            deltas["units:" + from_status] = -1
+        queue_adjustment(property, deltas)
+
+    notify_status_changes(changes)
+
+    return changes
+
+
+def notify_status_changes(changes):
+    """Dashboard snapshots, heatmaps + realtime deltas (the UPDATE skips the Property Unit doc_events)"""
+    from hotel_management.hotel_management.availability_heatmap import queue_heatmap_invalidation
+    from hotel_management.hotel_management.dashboard_api import invalidate_dashboard_snapshot
+    from hotel_management.hotel_management.realtime import publish_doc_change
+
+    invalidate_dashboard_snapshot(list({change[1] for change in changes if change[1]}))
+
+    # Units in Maintenance are not sellable inventory
+    queue_heatmap_invalidation({
+        property for unit, property, from_status, status in changes
+        if (from_status == "Maintenance") != (status == "Maintenance")
+    })
+    for unit, property, from_status, status in changes:
+        publish_doc_change(frappe._dict(doctype="Property Unit", name=unit,
+            property=property, status=status), "set_unit_status")
+
+
+def log_form_status_change(doc, method=None):
+    """doc_event (Property Unit on_update): log statuses set on the form or on insert"""
+    from hotel_management.hotel_management.doctype.unit_status_log.unit_status_log import write_status_log
+
+    before = doc.get_doc_before_save()
+    from_status = before.status if before else None
+    if not doc.status or from_status == doc.status:
+        return
+
+    write_status_log([(doc.name, doc.property, from_status, doc.status)], source="Form")
+
+
+# ========================================
+# Bulk changes
+# ========================================
+
+UNIT_STATUSES = ("Available", "Booked", "Occupied", "Cleaning", "Maintenance")
+
+# Most units one bulk status call may touch
+BULK_STATUS_MAX_UNITS = 2000
+
+
+def plan_status_changes(units, status):
+    """
+    Validate a status change for many units with one query
+    Returns (changes, skipped): changes as (unit, property, from_status, status),
+    skipped as {unit, reason}; units already in the status are neither
+    Rules:
+        Occupied   needs a checked-in guest (as in reconciliation)
+        Booked     needs a current or upcoming reservation
+        otherwise  not allowed while a guest is checked in
+    """
+    if status not in UNIT_STATUSES:
+        frappe.throw(_("Invalid status: {0}").format(status))
+    if not units:
+        return [], []
+
+    rows = frappe.db.sql("""
+        SELECT
+            pu.name, pu.property, pu.status,
+            pu.current_reservation, pu.next_reservation,
+            cur.status = 'Checked-In' as in_house
+        FROM `tabProperty Unit` pu
+        LEFT JOIN `tabReservation` cur ON cur.name = pu.current_reservation
+        WHERE pu.name IN %(units)s
+    """, {"units": units}, as_dict=1)
+
+    changes, skipped = [], []
+    for row in rows:
+        if row.status == status:
+            continue
+
+        reason = None
+        if status == "Occupied" and not row.in_house:
+            reason = _("No checked-in guest")
+        elif status == "Booked" and not (row.current_reservation or row.next_reservation):
+            reason = _("No current or upcoming reservation")
+        elif status != "Occupied" and row.in_house:
+            reason = _("Guest is checked in ({0})").format(row.current_reservation)
+
+        if reason:
+            skipped.append({"unit": row.name, "status": row.status, "reason": reason})
+        else:
+            changes.append((row.name, row.property, row.status, status))
+
+    return changes, skipped
+
+
+@frappe.whitelist()
+def bulk_set_unit_status(status, units=None, property=None, floor=None, unit_type=None, dry_run=0):
+    """
+    API: move many units to `status` at once - e.g. a whole floor out of order
+    Pass unit names and/or property / floor / unit_type filters. Invalid units are
+    skipped (with the reason); the rest are written with one UPDATE plus log rows.
+    """
+    frappe.has_permission("Property Unit", "write", throw=True)
+
+    if isinstance(units, str):
+        units = frappe.parse_json(units)
+
+    filters = {}
+    if units:
+        filters["name"] = ["in", units]
+    if property:
+        filters["property"] = property
+    if floor:
+        filters["floor"] = floor
+    if unit_type:
+        filters["unit_type"] = unit_type
+    if not filters:
+        frappe.throw(_("Pass units or a property / floor / unit type filter"))
+
+    names = frappe.get_list("Property Unit", filters=filters, pluck="name",
+        limit_page_length=BULK_STATUS_MAX_UNITS + 1)
+    if len(names) > BULK_STATUS_MAX_UNITS:
+        frappe.throw(_("More than {0} units match; narrow the filters").format(BULK_STATUS_MAX_UNITS))
+
+    changes, skipped = plan_status_changes(names, status)
+
+    dry_run = frappe.parse_json(dry_run)
+    if changes and not dry_run:
+        apply_status_changes(changes, source="Bulk Change")
+
+    return {
+        "dry_run": bool(dry_run),
+        "matched": len(names),
+        "changed": [{"unit": unit, "from_status": from_status, "to_status": to_status}
+            for unit, property, from_status, to_status in changes],
+        "skipped": skipped
+    }
+
+
+# ========================================
+# Reconciliation
+# ========================================
+
+# Open housekeeping task types that keep a unit in Cleaning
+CLEANING_TASK_TYPES = ("Cleaning", "Deep Cleaning")
+
+# Log sources of a status set by hand - e.g. a floor taken out of order for renovation
+MANUAL_STATUS_SOURCES = ("Quick Change", "Bulk Change", "Form", "Provisioning")
+
+
+def get_expected_statuses(property=None):
+    """
+    Each unit's current and derived status, from one grouped query per source
+    Precedence: Occupied > manual hold > Maintenance > Cleaning > Booked > Available
+        Occupied     a Checked-In reservation
+        manual hold  Maintenance / Cleaning set by hand (last non-reconciliation log row)
+                     stays until someone changes it, with or without a request or task behind it
+        Maintenance  an open Critical request (any open request keeps a unit already in Maintenance)
+        Cleaning     an open cleaning task scheduled up to today
+        Booked       a Confirmed reservation that has not ended
+    """
+    return frappe.db.sql("""
+        SELECT
+            pu.name as unit,
+            pu.property,
+            pu.status,
+            CASE
+                WHEN res.occupied THEN 'Occupied'
+                WHEN pu.status IN ('Maintenance', 'Cleaning') AND manual.status = pu.status THEN pu.status
+                WHEN mr.critical THEN 'Maintenance'
+                WHEN mr.is_open AND pu.status = 'Maintenance' THEN 'Maintenance'
+                WHEN hk.unit IS NOT NULL THEN 'Cleaning'
+                WHEN res.booked THEN 'Booked'
+                ELSE 'Available'
+            END as expected_status
+        FROM `tabProperty Unit` pu
+        LEFT JOIN (
+            SELECT
+                ru.unit,
+                MAX(r.status = 'Checked-In') as occupied,
+                MAX(r.status = 'Confirmed' AND ru.check_out > %(today)s) as booked
+            FROM `tabReservation Unit` ru
+            JOIN `tabReservation` r ON r.name = ru.parent
+            WHERE r.docstatus = 1
+            AND r.status IN ('Confirmed', 'Checked-In')
+            GROUP BY ru.unit
+        ) res ON res.unit = pu.name
+        LEFT JOIN (
+            SELECT
+                property_unit as unit,
+                MAX(priority = 'Critical') as critical,
+                1 as is_open
+            FROM `tabMaintenance Request`
+            WHERE status IN ('Open', 'In Progress')
+            GROUP BY property_unit
+        ) mr ON mr.unit = pu.name
+        LEFT JOIN (
+            SELECT DISTINCT property_unit as unit
+            FROM `tabHousekeeping Task`
+            WHERE status IN ('Pending', 'In Progress')
+            AND task_type IN %(cleaning_types)s
+            AND scheduled_date <= %(today)s
+        ) hk ON hk.unit = pu.name
+        LEFT JOIN (
+            SELECT l.unit, MAX(l.status) as status
+            FROM `tabUnit Status Log` l
+            JOIN (
+                SELECT unit, MAX(ts) as ts
+                FROM `tabUnit Status Log`
+                WHERE source NOT IN ('Reconciliation', 'Baseline')
+                GROUP BY unit
+            ) last ON last.unit = l.unit AND last.ts = l.ts
+            WHERE l.source IN %(manual_sources)s
+            GROUP BY l.unit
+        ) manual ON manual.unit = pu.name
+        WHERE 1=1 {conditions}
+    """.format(conditions=" AND pu.property = %(property)s" if property else ""), {
+        "today": today(),
+        "cleaning_types": CLEANING_TASK_TYPES,
+        "manual_sources": MANUAL_STATUS_SOURCES,
+        "property": property
+    }, as_dict=1)
+
+
+def reconcile_unit_statuses(property=None, dry_run=False):
+    """
+    Set every unit to its derived status; only drifted units are written (one bulk UPDATE)
+    Scheduled hourly and run by the night audit. Returns the changes made (or that would be).
+    """
+    drift = [row for row in get_expected_statuses(property) if row.status != row.expected_status]
+
+    report = [{
+        "unit": row.unit,
+        "property": row.property,
+        "from_status": row.status,
+        "to_status": row.expected_status
+    } for row in drift]
+
+    if drift and not dry_run:
+        apply_status_changes([(row.unit, row.property, row.status, row.expected_status) for row in drift],
+            source="Reconciliation")
+        frappe.logger().info(f"Unit statuses reconciled: {report}")
+
+    return report
+
+
+@frappe.whitelist()
+def run_unit_status_reconciliation(property=None, dry_run=1):
+    """API: reconcile now (dry_run=1 only reports the drift)"""
+    frappe.only_for(("System Manager", "Hotel Manager"))
+
+    dry_run = frappe.parse_json(dry_run)
+    report = reconcile_unit_statuses(property, dry_run=bool(dry_run))
+    if not dry_run:
+        frappe.db.commit()
+    return {"dry_run": bool(dry_run), "changes": report}
+
+
+# ========================================
+# History queries
+# ========================================
+
+def get_scope_conditions(property=None, units=None, alias="l"):
+    conditions = ""
+    if property:
+        conditions += " AND {0}.property = %(property)s".format(alias)
+    if units:
+        conditions += " AND {0}.unit IN %(units)s".format(alias)
+    return conditions
+
+
+def get_status_at(at, property=None, units=None):
+    """{unit: status} as of `at` - the latest log row per unit at or before it"""
+    values = {"at": get_datetime(at), "property": property, "units": units}
+    rows = frappe.db.sql("""
+        SELECT l.unit, l.status
+        FROM `tabUnit Status Log` l
+        JOIN (
+            SELECT l.unit, MAX(l.ts) as ts
+            FROM `tabUnit Status Log` l
+            WHERE l.ts <= %(at)s {conditions}
+            GROUP BY l.unit
+        ) latest ON latest.unit = l.unit AND latest.ts = l.ts
+    """.format(conditions=get_scope_conditions(property, units)), values)
+    return dict(rows)
+
+
+def get_status_intervals(from_ts, to_ts, property=None, units=None):
+    """
+    Status intervals overlapping [from_ts, to_ts]
+    Reads from each unit's last row at or before from_ts (the anchor) onwards, so
+    the index on (unit, ts) bounds the scan; end_ts is None while still open.
+    """
+    values = {
+        "from_ts": get_datetime(from_ts),
+        "to_ts": get_datetime(to_ts),
+        "property": property,
+        "units": units
+    }
+    conditions = get_scope_conditions(property, units)
+
+    return frappe.db.sql("""
+        WITH anchor AS (
+            SELECT l.unit, MAX(l.ts) as ts
+            FROM `tabUnit Status Log` l
+            WHERE l.ts <= %(from_ts)s {conditions}
+            GROUP BY l.unit
+        )
+        SELECT i.*, pu.unit_type
+        FROM (
+            SELECT
+                l.unit, l.property, l.status,
+                l.ts as start_ts,
+                LEAD(l.ts) OVER (PARTITION BY l.unit ORDER BY l.ts, l.creation) as end_ts
+            FROM `tabUnit Status Log` l
+            LEFT JOIN anchor a ON a.unit = l.unit
+            WHERE l.ts <= %(to_ts)s
+            AND l.ts >= COALESCE(a.ts, %(from_ts)s)
+            {conditions}
+        ) i
+        LEFT JOIN `tabProperty Unit` pu ON pu.name = i.unit
+        WHERE i.end_ts IS NULL OR i.end_ts > %(from_ts)s
+        ORDER BY i.unit, i.start_ts
+    """.format(conditions=conditions), values, as_dict=1)
+
+
+def clip_interval(interval, from_ts, to_ts):
+    """Seconds of the interval inside the window (open intervals run until to_ts / now)"""
+    end = min(interval.end_ts or to_ts, to_ts)
+    start = max(interval.start_ts, from_ts)
+    return max(0.0, (end - start).total_seconds())
+
+
+def check_log_permission():
+    frappe.has_permission("Unit Status Log", "read", throw=True)
+
+
+@frappe.whitelist()
+def get_unit_status_at(at, property=None, unit=None):
+    """API: every unit's status at a point in time ({unit: status})"""
+    check_log_permission()
+    return get_status_at(at, property, [unit] if unit else None)
+
+
+@frappe.whitelist()
+def get_units_in_status(status, from_ts, to_ts, property=None):
+    """API: units that were in `status` at any time in the window, with how long (hours)"""
+    check_log_permission()
+    from_ts, to_ts = get_datetime(from_ts), min(get_datetime(to_ts), now_datetime())
+
+    units = {}
+    for interval in get_status_intervals(from_ts, to_ts, property):
+        if interval.status != status:
+            continue
+        entry = units.setdefault(interval.unit, {
+            "unit": interval.unit, "property": interval.property, "hours": 0.0,
+            "first_seen": max(interval.start_ts, from_ts)
+        })
+        entry["hours"] = flt(entry["hours"] + clip_interval(interval, from_ts, to_ts) / 3600, 2)
+
+    return list(units.values())
+
+
+@frappe.whitelist()
+def get_unit_status_durations(from_ts, to_ts, property=None, unit=None):
+    """API: hours spent in each status per unit within the window ({unit: {status: hours}})"""
+    check_log_permission()
+    from_ts, to_ts = get_datetime(from_ts), min(get_datetime(to_ts), now_datetime())
+
+    durations = {}
+    for interval in get_status_intervals(from_ts, to_ts, property, [unit] if unit else None):
+        statuses = durations.setdefault(interval.unit, {})
+        statuses[interval.status] = flt(
+            statuses.get(interval.status, 0) + clip_interval(interval, from_ts, to_ts) / 3600, 2)
+
+    return durations
+
+
+@frappe.whitelist()
+def get_status_turnaround(from_ts, to_ts, status="Cleaning", property=None, group_by="unit_type"):
+    """
+    API: how long units stay in `status` (e.g. Cleaning turnaround), for stays that
+    ended inside the window - count, average, median, p90 and max hours per group
+    """
+    check_log_permission()
+    if group_by not in ("unit", "unit_type", "property"):
+        frappe.throw(_("Group by must be unit, unit_type or property"))
+
+    from_ts, to_ts = get_datetime(from_ts), get_datetime(to_ts)
+
+    groups = {}
+    for interval in get_status_intervals(from_ts, to_ts, property):
+        if interval.status != status or not interval.end_ts or interval.end_ts > to_ts:
+            continue
+        hours = (interval.end_ts - interval.start_ts).total_seconds() / 3600
+        groups.setdefault(interval.get(group_by), []).append(hours)
+
+    result = []
+    for group, hours in sorted(groups.items(), key=lambda g: str(g[0])):
+        values = np.array(hours)
+        result.append({
+            group_by: group,
+            "count": len(values),
+            "avg_hours": flt(values.mean(), 2),
+            "median_hours": flt(np.median(values), 2),
+            "p90_hours": flt(np.percentile(values, 90), 2),
+            "max_hours": flt(values.max(), 2)
+        })
+
+    return result
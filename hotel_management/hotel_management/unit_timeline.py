@@ -0,0 +1,269 @@
+# -*- coding: utf-8 -*-
+"""
+Unit History Timeline
+Newest-first event feed for a Property Unit, paged with a keyset cursor
+Path: hotel_management/hotel_management/unit_timeline.py
+
+Streams (each already sorted by the database, newest first):
+    reservation   - bookings by check-in date (reservation + check-in events)
+    check-out     - checked-out bookings by check-out date
+    cleaning      - Housekeeping Tasks by completion / scheduled date
+    maintenance   - Maintenance Requests by resolution / reported date
+
+get_timeline() k-way merges the streams with heapq.merge; every stream is a
+generator reading small keyset pages, so only rows that can appear on the
+requested page are fetched. get_timeline_union() is the single-query
+variant (UNION ALL of the same streams, ordered and limited in SQL).
+
+Every event carries a sort key (date, stream rank, reference, sub-event);
+the cursor is the key of the last event shown, so paging back is stable
+while new events are added at the top.
+"""
+
+import heapq
+from itertools import islice
+
+import frappe
+from frappe.utils import cint, getdate
+
+TIMELINE_PAGE_SIZE = 50
+TIMELINE_MAX_PAGE_SIZE = 200
+
+# Stream order for events on the same date (higher = shown first)
+STREAM_RANKS = {
+    "reservation": 0,
+    "cleaning": 1,
+    "maintenance": 2,
+    "check-out": 3,
+}
+
+STREAM_QUERIES = {
+    "reservation": """
+        SELECT DISTINCT
+            r.check_in as sort_date, r.name, r.status, r.customer, r.primary_guest
+        FROM `tabReservation` r
+        JOIN `tabReservation Unit` ru ON ru.parent = r.name
+        WHERE ru.unit = %(unit)s
+        AND r.docstatus IN (0, 1)
+        AND r.check_in IS NOT NULL
+    """,
+    "check-out": """
+        SELECT DISTINCT
+            r.check_out as sort_date, r.name, r.status, r.customer, r.primary_guest
+        FROM `tabReservation` r
+        JOIN `tabReservation Unit` ru ON ru.parent = r.name
+        WHERE ru.unit = %(unit)s
+        AND r.docstatus = 1
+        AND r.status = 'Checked-Out'
+        AND r.check_out IS NOT NULL
+    """,
+    "cleaning": """
+        SELECT * FROM (
+            SELECT
+                IF(status = 'Completed', COALESCE(completion_date, scheduled_date), scheduled_date) as sort_date,
+                name, status, task_type, priority, completed_by
+            FROM `tabHousekeeping Task`
+            WHERE property_unit = %(unit)s
+        ) t
+        WHERE sort_date IS NOT NULL
+    """,
+    "maintenance": """
+        SELECT * FROM (
+            SELECT
+                IF(status = 'Resolved', COALESCE(resolution_date, reported_date), reported_date) as sort_date,
+                name, status, issue_type, priority, resolved_by
+            FROM `tabMaintenance Request`
+            WHERE property_unit = %(unit)s
+        ) t
+        WHERE sort_date IS NOT NULL
+    """,
+}
+
+STREAM_COLUMNS = {
+    "reservation": ("sort_date", "name", "status", "customer", "primary_guest"),
+    "check-out": ("sort_date", "name", "status", "customer", "primary_guest"),
+    "cleaning": ("sort_date", "name", "status", "task_type", "priority", "completed_by"),
+    "maintenance": ("sort_date", "name", "status", "issue_type", "priority", "resolved_by"),
+}
+
+UNION_COLUMNS = ("sort_date", "name", "status", "customer", "primary_guest",
+    "task_type", "issue_type", "priority", "completed_by", "resolved_by")
+
+
+# ========================================
+# Cursor
+# ========================================
+
+def encode_cursor(key):
+    date, rank, name, sub = key
+    return "{0}|{1}|{2}|{3}".format(date, rank, sub, name)
+
+
+def decode_cursor(cursor):
+    if not cursor:
+        return None
+    try:
+        date, rank, sub, name = cursor.split("|", 3)
+        return (getdate(date), cint(rank), name, cint(sub))
+    except ValueError:
+        frappe.throw(frappe._("Invalid timeline cursor"))
+
+
+def keyset_condition(rank, cursor, inclusive=False):
+    """
+    SQL condition for rows of a stream sorted before the cursor
+    Inclusive keeps the cursor's own row - its later sub-events may still be unread
+    """
+    if not cursor:
+        return "", {}
+
+    date, cursor_rank, name, sub = cursor
+    values = {"cursor_date": date, "cursor_name": name}
+    if rank < cursor_rank:
+        return "AND sort_date <= %(cursor_date)s", values
+    if rank > cursor_rank:
+        return "AND sort_date < %(cursor_date)s", values
+    return ("AND (sort_date < %(cursor_date)s OR (sort_date = %(cursor_date)s AND name {0} %(cursor_name)s))"
+        .format("<=" if inclusive else "<")), values
+
+
+# ========================================
+# Events
+# ========================================
+
+def expand_row(stream, row):
+    """One stream row -> its timeline events, newest first"""
+    date = getdate(row.sort_date)
+    rank = STREAM_RANKS[stream]
+
+    def event(sub, event_type, title, details, doctype):
+        return {
+            "key": (date, rank, row.name, sub),
+            "event_type": event_type,
+            "date": str(date),
+            "time": "",
+            "title": title,
+            "details": details,
+            "reference_doctype": doctype,
+            "reference": row.name
+        }
+
+    if stream == "reservation":
+        events = []
+        if row.status in ("Checked-In", "Checked-Out"):
+            events.append(event(1, "check-in", "Guest Checked In",
+                f"{row.primary_guest} checked in", "Reservation"))
+        events.append(event(0, "reservation", f"Reservation {row.name}",
+            f"Customer: {row.customer} | Guest: {row.primary_guest}", "Reservation"))
+        return events
+
+    if stream == "check-out":
+        return [event(0, "check-out", "Guest Checked Out",
+            f"{row.primary_guest} checked out", "Reservation")]
+
+    if stream == "cleaning":
+        return [event(0, "cleaning", f"{row.task_type} Task - {row.status}",
+            f"Priority: {row.priority}" + (f" | Completed by: {row.completed_by}" if row.completed_by else ""),
+            "Housekeeping Task")]
+
+    return [event(0, "maintenance", f"{row.issue_type} Maintenance - {row.status}",
+        f"Priority: {row.priority}" + (f" | Resolved by: {row.resolved_by}" if row.resolved_by else ""),
+        "Maintenance Request")]
+
+
+def iter_stream(stream, unit, cursor, page_size):
+    """Events of one stream older than the cursor, newest first, read in keyset pages"""
+    rank = STREAM_RANKS[stream]
+    position, inclusive = cursor, True
+
+    while True:
+        condition, values = keyset_condition(rank, position, inclusive)
+        rows = frappe.db.sql("""
+            SELECT * FROM ({query}) s
+            WHERE 1=1 {condition}
+            ORDER BY sort_date DESC, name DESC
+            LIMIT %(page_size)s
+        """.format(query=STREAM_QUERIES[stream], condition=condition),
+            dict(values, unit=unit, page_size=page_size), as_dict=1)
+
+        for row in rows:
+            for event in expand_row(stream, row):
+                if cursor is None or event["key"] < cursor:
+                    yield event
+
+        if len(rows) < page_size:
+            return
+
+        last = rows[-1]
+        position, inclusive = (getdate(last.sort_date), rank, last.name, 0), False
+
+
+def build_page(events, limit):
+    """First `limit` events plus the cursor to continue from"""
+    page = list(islice(events, limit + 1))
+    has_more = len(page) > limit
+    page = page[:limit]
+
+    next_cursor = encode_cursor(page[-1]["key"]) if has_more and page else None
+    for event in page:
+        del event["key"]
+
+    return {"events": page, "has_more": has_more, "next_cursor": next_cursor}
+
+
+def get_page_size(limit):
+    return min(cint(limit) or TIMELINE_PAGE_SIZE, TIMELINE_MAX_PAGE_SIZE)
+
+
+# ========================================
+# Timelines
+# ========================================
+
+def get_timeline(unit, cursor=None, limit=None):
+    """k-way merge of the per-stream generators"""
+    limit = get_page_size(limit)
+    position = decode_cursor(cursor)
+
+    # Every stream row yields at least one event, so limit + 2 rows cover a page
+    streams = [iter_stream(stream, unit, position, limit + 2) for stream in STREAM_RANKS]
+    merged = heapq.merge(*streams, key=lambda event: event["key"], reverse=True)
+
+    return build_page(merged, limit)
+
+
+def get_timeline_union(unit, cursor=None, limit=None):
+    """Single query variant: UNION ALL of the streams, ordered and limited by the database"""
+    limit = get_page_size(limit)
+    position = decode_cursor(cursor)
+
+    parts = []
+    values = {"unit": unit, "page_size": limit + 2}
+    for stream, rank in STREAM_RANKS.items():
+        condition, condition_values = keyset_condition(rank, position, inclusive=True)
+        values.update(condition_values)
+
+        # Same column list in every branch; columns a stream lacks are NULL
+        columns = ", ".join(
+            "s.{0}".format(column) if column in STREAM_COLUMNS[stream] else "NULL as {0}".format(column)
+            for column in UNION_COLUMNS)
+        parts.append("""
+            (SELECT '{stream}' as stream, {rank} as stream_rank, {columns}
+            FROM ({query}) s
+            WHERE 1=1 {condition}
+            ORDER BY sort_date DESC, name DESC
+            LIMIT %(page_size)s)
+        """.format(stream=stream, rank=rank, columns=columns, query=STREAM_QUERIES[stream], condition=condition))
+
+    rows = frappe.db.sql("""
+        SELECT * FROM ({union}) timeline
+        ORDER BY sort_date DESC, stream_rank DESC, name DESC
+        LIMIT %(page_size)s
+    """.format(union=" UNION ALL ".join(parts)), values, as_dict=1)
+
+    events = (
+        event
+        for row in rows
+        for event in expand_row(row.stream, row)
+        if position is None or event["key"] < position
+    )
+    return build_page(events, limit)
@@ -0,0 +1,421 @@
+# -*- coding: utf-8 -*-
+"""
+Waitlist Matcher
+Offers freed unit-nights to waiting guests
+Path: hotel_management/hotel_management/waitlist_matcher.py
+
+Triggers:
+    Reservation on_cancel  -> match_freed_units() for the cancelled rows (background job)
+    Night audit            -> run_waitlist_matching(): expire lapsed offers / stale
+                              requests, then match every (property, unit type)
+
+Matching, per (property, unit type):
+    1. Free gaps: for each unit, the free intervals between Confirmed / Checked-In
+       stays and open waitlist offers (one query for all units)
+    2. WaitlistIndex over the Waiting entries: for a gap [start, end) it reports
+       the entries with start <= check_in and check_out <= end in O(log n + k)
+    3. Entries are served by priority, then age; each takes the fitting gap
+       with the least slack, so long gaps are not split by short stays
+
+Matching is serialized per (property, unit type) with a redis lock held until
+the offers commit; a run that finds the lock taken leaves a rerun flag, and
+the holder queues one more run once it releases.
+
+Offers hold the unit for WAITLIST_OFFER_HOURS: until offer_expires, the held
+nights count as taken in Reservation validation, get_available_units and the
+flexible dates search (get_held_stays). The guest is notified from a
+background job after the offers commit.
+"""
+
+from bisect import bisect_left
+
+import frappe
+import numpy as np
+from frappe import _
+from frappe.utils import add_to_date, cint, getdate, now_datetime, today
+
+WAITLIST_OFFER_HOURS = 24
+
+WAITLIST_LOCK_KEY = "hotel_waitlist_matching"
+# Fallback expiry in case the transaction holding the lock never ends
+WAITLIST_LOCK_SECONDS = 600
+
+PRIORITY_RANKS = {"VIP": 0, "High": 1, "Normal": 2, "Low": 3}
+
+
+# ========================================
+# Interval index
+# ========================================
+
+class WaitlistIndex:
+    """
+    Static index over waitlist stays (check_in, check_out)
+    Entries are sorted by check_in; a sparse table gives the minimum check_out
+    of any check_in range in O(1), so a containment query only descends into
+    ranges that hold at least one match.
+    """
+
+    def __init__(self, entries):
+        self.entries = sorted(entries, key=lambda e: (e.check_in, e.check_out, e.name))
+        self.starts = [getdate(e.check_in).toordinal() for e in self.entries]
+        self.ends = np.array([getdate(e.check_out).toordinal() for e in self.entries], dtype=np.int64)
+
+        # table[k][i] = position of the smallest check_out in [i, i + 2**k)
+        self.table = [np.arange(len(self.entries))]
+        width = 1
+        while width * 2 <= len(self.entries):
+            prev = self.table[-1]
+            left, right = prev[:len(prev) - width], prev[width:]
+            self.table.append(np.where(self.ends[left] <= self.ends[right], left, right))
+            width *= 2
+
+    def __len__(self):
+        return len(self.entries)
+
+    def argmin(self, lo, hi):
+        level = (hi - lo).bit_length() - 1
+        left, right = self.table[level][lo], self.table[level][hi - (1 << level)]
+        return left if self.ends[left] <= self.ends[right] else right
+
+    def containing(self, start, end):
+        """Entries whose stay lies inside [start, end) - dates or day ordinals"""
+        start = start if isinstance(start, int) else getdate(start).toordinal()
+        end = end if isinstance(end, int) else getdate(end).toordinal()
+
+        # check_in >= start, and check_in < end since every stay is at least one night
+        ranges = [(bisect_left(self.starts, start), bisect_left(self.starts, end))]
+        found = []
+        while ranges:
+            lo, hi = ranges.pop()
+            if lo >= hi:
+                continue
+            position = int(self.argmin(lo, hi))
+            if self.ends[position] > end:
+                continue
+            found.append(self.entries[position])
+            ranges.append((lo, position))
+            ranges.append((position + 1, hi))
+        return found
+
+
+# ========================================
+# Free gaps
+# ========================================
+
+def get_held_stays(units, start, end, exclude=None):
+    """
+    Open offers on the units overlapping [start, end) -> rows of unit, check_in, check_out
+    An offer past offer_expires holds nothing, even before expire_waitlist marks it
+    exclude: the waitlist entry being booked, which may use its own hold
+    """
+    if not units or not start or not end:
+        return []
+
+    return frappe.db.sql("""
+        SELECT offered_unit as unit, check_in, check_out
+        FROM `tabWaitlist`
+        WHERE offered_unit IN %(units)s
+        AND status = 'Offered'
+        AND offer_expires > %(now)s
+        AND check_in < %(end)s AND check_out > %(start)s
+        AND name != %(exclude)s
+    """, {"units": list(units), "start": start, "end": end, "now": now_datetime(),
+        "exclude": exclude or ""}, as_dict=1)
+
+
+def get_unit_gaps(units, start, end):
+    """
+    {unit: [(gap_start, gap_end), ...]} as day ordinals, clipped to [start, end)
+    Busy = Confirmed / Checked-In stays plus open waitlist offers
+    """
+    if not units:
+        return {}
+
+    busy = frappe.db.sql("""
+        SELECT ru.unit, ru.check_in, ru.check_out
+        FROM `tabReservation Unit` ru
+        JOIN `tabReservation` r ON r.name = ru.parent
+        WHERE ru.unit IN %(units)s
+        AND r.docstatus = 1
+        AND r.status IN ('Confirmed', 'Checked-In')
+        AND ru.check_in < %(end)s AND ru.check_out > %(start)s
+    """, {"units": list(units), "start": start, "end": end}, as_dict=1)
+    busy += get_held_stays(units, start, end)
+
+    intervals = {unit: [] for unit in units}
+    for row in busy:
+        intervals[row.unit].append((getdate(row.check_in).toordinal(), getdate(row.check_out).toordinal()))
+
+    start, end = getdate(start).toordinal(), getdate(end).toordinal()
+    gaps = {}
+    for unit, stays in intervals.items():
+        free, cursor = [], start
+        for stay_start, stay_end in sorted(stays):
+            if stay_start > cursor:
+                free.append((cursor, min(stay_start, end)))
+            cursor = max(cursor, stay_end)
+        if cursor < end:
+            free.append((cursor, end))
+        gaps[unit] = free
+    return gaps
+
+
+# ========================================
+# Matching
+# ========================================
+
+def entry_rank(entry):
+    return (PRIORITY_RANKS.get(entry.priority, 2), entry.creation, entry.name)
+
+
+def assign_offers(index, gaps):
+    """
+    Waiting entries -> [(entry, unit)]
+    Serves entries by rank; each takes the fitting gap with the least slack and
+    splits it, so later entries can still use what is left on either side.
+    """
+    candidates = {}
+    for unit, unit_gaps in gaps.items():
+        for gap in unit_gaps:
+            for entry in index.containing(*gap):
+                candidates.setdefault(entry.name, (entry, []))[1].append(unit)
+
+    free = {unit: list(unit_gaps) for unit, unit_gaps in gaps.items()}
+    offers = []
+    for entry, units in sorted(candidates.values(), key=lambda item: entry_rank(item[0])):
+        check_in, check_out = getdate(entry.check_in).toordinal(), getdate(entry.check_out).toordinal()
+
+        best = None
+        for unit in units:
+            for position, (gap_start, gap_end) in enumerate(free[unit]):
+                if gap_start <= check_in and check_out <= gap_end:
+                    slack = (gap_end - gap_start) - (check_out - check_in)
+                    if best is None or slack < best[0]:
+                        best = (slack, unit, position)
+        if not best:
+            continue
+
+        _slack, unit, position = best
+        gap_start, gap_end = free[unit][position]
+        free[unit][position:position + 1] = [
+            gap for gap in ((gap_start, check_in), (check_out, gap_end)) if gap[0] < gap[1]
+        ]
+        offers.append((entry, unit))
+
+    return offers
+
+
+def get_waiting_entries(property, unit_type):
+    max_occupancy = cint(frappe.db.get_value("Unit Type", unit_type, "max_occupancy"))
+    filters = {
+        "property": property,
+        "unit_type": unit_type,
+        "status": "Waiting",
+        "check_in": [">=", today()]
+    }
+    if max_occupancy:
+        filters["party_size"] = ["<=", max_occupancy]
+
+    return frappe.get_all("Waitlist", filters=filters,
+        fields=["name", "guest", "check_in", "check_out", "party_size", "priority", "creation"])
+
+
+def match_waitlist(property, unit_type, units=None):
+    """
+    Offer free gaps of a unit type to its waiting entries
+    units limits the gaps searched (e.g. the units a cancellation freed)
+    """
+    if not acquire_matching_lock(property, unit_type):
+        return []
+
+    # Lapsed offers go back to Expired before their nights are offered again
+    expire_waitlist()
+
+    entries = get_waiting_entries(property, unit_type)
+    if not entries:
+        return []
+
+    if units is None:
+        units = frappe.get_all("Property Unit",
+            filters={"property": property, "unit_type": unit_type, "status": ["!=", "Maintenance"]},
+            pluck="name")
+
+    index = WaitlistIndex(entries)
+    horizon = max(getdate(e.check_out) for e in entries)
+    offers = assign_offers(index, get_unit_gaps(units, today(), horizon))
+
+    return make_offers(offers)
+
+
+def get_matching_lock_key(property, unit_type):
+    """Full redis key - used with the raw set / delete commands"""
+    return frappe.cache().make_key("{0}|{1}|{2}".format(WAITLIST_LOCK_KEY, property, unit_type))
+
+
+def acquire_matching_lock(property, unit_type):
+    """
+    One matcher per (property, unit type) until its offers commit - two runs
+    reading the same gaps would offer one unit-night twice
+    """
+    cache = frappe.cache()
+    key = get_matching_lock_key(property, unit_type)
+    if not cache.set(key, 1, nx=True, ex=WAITLIST_LOCK_SECONDS):
+        # The running matcher picks this up again after it commits
+        cache.set(key + "|rerun", 1, ex=WAITLIST_LOCK_SECONDS)
+        return False
+
+    frappe.db.after_commit.add(lambda: release_matching_lock(property, unit_type))
+    frappe.db.after_rollback.add(lambda: release_matching_lock(property, unit_type))
+    return True
+
+
+def release_matching_lock(property, unit_type):
+    cache = frappe.cache()
+    key = get_matching_lock_key(property, unit_type)
+    cache.delete(key)
+
+    if cache.delete(key + "|rerun"):
+        # Already past the commit - enqueue directly
+        frappe.enqueue(
+            "hotel_management.hotel_management.waitlist_matcher.match_waitlist",
+            queue="short",
+            property=property,
+            unit_type=unit_type
+        )
+
+
+def make_offers(offers):
+    if not offers:
+        return []
+
+    offered_on = now_datetime()
+    expires = add_to_date(offered_on, hours=WAITLIST_OFFER_HOURS)
+    for entry, unit in offers:
+        frappe.db.set_value("Waitlist", entry.name, {
+            "status": "Offered",
+            "offered_unit": unit,
+            "offered_on": offered_on,
+            "offer_expires": expires
+        })
+
+    names = [entry.name for entry, _unit in offers]
+    frappe.enqueue(
+        "hotel_management.hotel_management.waitlist_matcher.notify_waitlist_offers",
+        queue="short",
+        enqueue_after_commit=True,
+        names=names
+    )
+    return names
+
+
+def match_freed_units(freed):
+    """Background job: freed = [unit, ...] released by a cancellation (out-of-order units are skipped)"""
+    groups = {}
+    for unit in frappe.get_all("Property Unit",
+            filters={"name": ["in", freed], "status": ["!=", "Maintenance"]},
+            fields=["name", "property", "unit_type"]):
+        groups.setdefault((unit.property, unit.unit_type), []).append(unit.name)
+
+    for (property, unit_type), units in groups.items():
+        match_waitlist(property, unit_type, units)
+
+
+# ========================================
+# Triggers
+# ========================================
+
+def queue_waitlist_matching(doc, method=None):
+    """doc_event (Reservation on_cancel): offer the released unit-nights once the cancel commits"""
+    freed = sorted({
+        row.unit for row in doc.get("units_reserved") or []
+        if row.unit and getdate(row.check_out or doc.check_out) > getdate(today())
+    })
+    if not freed:
+        return
+
+    frappe.enqueue(
+        "hotel_management.hotel_management.waitlist_matcher.match_freed_units",
+        queue="short",
+        enqueue_after_commit=True,
+        freed=freed
+    )
+
+
+def enqueue_waitlist_matching(property, unit_type):
+    frappe.enqueue(
+        "hotel_management.hotel_management.waitlist_matcher.match_waitlist",
+        queue="short",
+        enqueue_after_commit=True,
+        property=property,
+        unit_type=unit_type
+    )
+
+
+def expire_waitlist():
+    """Lapsed offers release their hold; requests whose check-in has passed expire"""
+    frappe.db.sql("""
+        UPDATE `tabWaitlist`
+        SET status = 'Expired', modified = %(now)s
+        WHERE (status = 'Offered' AND offer_expires <= %(now)s)
+        OR (status IN ('Waiting', 'Offered') AND check_in < %(today)s)
+    """, {"now": now_datetime(), "today": today()})
+
+
+def run_waitlist_matching():
+    """Night audit step: expire, then match every (property, unit type) with waiting entries"""
+    expire_waitlist()
+
+    groups = frappe.db.sql("""
+        SELECT DISTINCT property, unit_type
+        FROM `tabWaitlist`
+        WHERE status = 'Waiting' AND check_in >= %s
+    """, today(), as_dict=1)
+
+    offered = 0
+    for group in groups:
+        offered += len(match_waitlist(group.property, group.unit_type))
+
+    frappe.logger().info(f"Waitlist matching: {offered} offers across {len(groups)} unit types")
+    return offered
+
+
+# ========================================
+# Notification
+# ========================================
+
+def notify_waitlist_offers(names):
+    """Background job: email each guest and push the offers to the desk"""
+    entries = frappe.db.sql("""
+        SELECT w.name, w.guest_name, w.property, w.unit_type, w.offered_unit,
+            w.check_in, w.check_out, w.offer_expires, g.email
+        FROM `tabWaitlist` w
+        LEFT JOIN `tabGuest` g ON g.name = w.guest
+        WHERE w.name IN %s AND w.status = 'Offered'
+    """, [names], as_dict=1)
+
+    for entry in entries:
+        if entry.email:
+            try:
+                frappe.sendmail(
+                    recipients=[entry.email],
+                    subject=_("A {0} is now available for your stay").format(entry.unit_type),
+                    message=_("""
+                        <p>Dear {0},</p>
+                        <p>A {1} at <strong>{2}</strong> is now available from
+                        <strong>{3}</strong> to <strong>{4}</strong>.</p>
+                        <p>We are holding it for you until {5}.</p>
+                    """).format(entry.guest_name, entry.unit_type, entry.property,
+                        entry.check_in, entry.check_out, entry.offer_expires),
+                    reference_doctype="Waitlist",
+                    reference_name=entry.name
+                )
+            except Exception:
+                frappe.log_error(frappe.get_traceback(), "Waitlist Offer Email Failed")
+
+    if entries:
+        frappe.publish_realtime("waitlist_offers", {
+            "offers": [
+                {"name": e.name, "property": e.property, "unit_type": e.unit_type, "unit": e.offered_unit}
+                for e in entries
+            ]
+        }, after_commit=True)
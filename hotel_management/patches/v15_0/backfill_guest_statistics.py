@@ -0,0 +1,9 @@
+import frappe
+
+
+def execute():
+    """Fill the new Guest.total_nights and re-sync visit/revenue stats"""
+    from hotel_management.hotel_management.doctype.guest.guest import rebuild_guest_statistics
+
+    frappe.reload_doc("hotel_management", "doctype", "guest")
+    rebuild_guest_statistics()
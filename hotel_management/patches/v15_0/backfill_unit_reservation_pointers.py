@@ -0,0 +1,9 @@
+import frappe
+
+
+def execute():
+    """Fill Property Unit current / next reservation pointers"""
+    from hotel_management.hotel_management.doctype.property_unit.property_unit import refresh_unit_reservation_pointers
+
+    frappe.reload_doc("hotel_management", "doctype", "property_unit")
+    refresh_unit_reservation_pointers()
@@ -0,0 +1,16 @@
+import frappe
+
+
+def execute():
+    """Seed the Unit Status Log with every unit's current status so history queries have a starting point"""
+    from hotel_management.hotel_management.doctype.unit_status_log.unit_status_log import write_status_log
+
+    frappe.reload_doc("hotel_management", "doctype", "unit_status_log")
+
+    if frappe.db.count("Unit Status Log"):
+        return
+
+    units = frappe.get_all("Property Unit", fields=["name", "property", "status"])
+    write_status_log(
+        [(unit.name, unit.property, None, unit.status) for unit in units if unit.status],
+        source="Baseline")
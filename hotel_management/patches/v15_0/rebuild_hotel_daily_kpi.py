@@ -0,0 +1,9 @@
+import frappe
+
+
+def execute():
+    """Fill the new Hotel Daily KPI table - the occupancy and revenue screens read only from it"""
+    from hotel_management.hotel_management.doctype.hotel_daily_kpi.hotel_daily_kpi import rebuild_kpis
+
+    frappe.reload_doc("hotel_management", "doctype", "hotel_daily_kpi")
+    rebuild_kpis()
@@ -0,0 +1,70 @@
+// Copyright (c) 2025, VRPnext and Contributors
+// License: MIT
+//
+// Decoder for hotel_management.compact_format responses (format: "compact")
+
+frappe.provide("hotel_management.compact");
+
+$.extend(hotel_management.compact, {
+	is_compact: function (payload) {
+		return !!payload && payload.format === "compact";
+	},
+
+	// {columns, rows, dicts} -> list of objects (verbose payloads pass through)
+	decode_table: function (payload) {
+		if (!hotel_management.compact.is_compact(payload)) return payload;
+
+		let columns = payload.columns;
+		let dicts = payload.dicts || {};
+		return payload.rows.map(row => {
+			let obj = {};
+			for (let i = 0; i < columns.length; i++) {
+				let dict = dicts[columns[i]];
+				obj[columns[i]] = dict ? dict[row[i]] : row[i];
+			}
+			return obj;
+		});
+	},
+
+	// [[value, length], ...] -> flat array of values
+	expand_runs: function (runs) {
+		let values = [];
+		(runs || []).forEach(([value, length]) => {
+			for (let i = 0; i < length; i++) values.push(value);
+		});
+		return values;
+	},
+
+	// get_unit_occupancy_calendar compact payload -> the verbose per-day list
+	decode_occupancy: function (payload) {
+		if (!hotel_management.compact.is_compact(payload)) return payload;
+
+		let reservations = hotel_management.compact.decode_table(payload.reservations);
+		return hotel_management.compact.expand_runs(payload.runs).map((index, day) => {
+			let date = frappe.datetime.add_days(payload.start, day);
+			let res = index >= 0 ? reservations[index] : null;
+			return res
+				? {date: date, is_occupied: true, reservation: res.name, guest: res.primary_guest,
+					status: (res.status || "").toLowerCase(), rate: res.rate_per_night}
+				: {date: date, is_occupied: false, reservation: null, status: "available"};
+		});
+	},
+
+	// get_occupancy_matrix payload -> {dates, units, reservations, cells}
+	// cells[u][d] is the reservation object on day d of unit u (null = free)
+	decode_matrix: function (payload) {
+		let units = hotel_management.compact.decode_table(payload.units);
+		let reservations = hotel_management.compact.decode_table(payload.reservations);
+		let dates = [];
+		for (let d = 0; d < payload.days; d++) dates.push(frappe.datetime.add_days(payload.start, d));
+
+		return {
+			dates: dates,
+			units: units,
+			reservations: reservations,
+			occupied: payload.occupied,
+			cells: payload.runs.map(runs =>
+				hotel_management.compact.expand_runs(runs).map(index => index >= 0 ? reservations[index] : null))
+		};
+	}
+});
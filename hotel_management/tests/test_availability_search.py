@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import numpy as np
+
+from hotel_management.hotel_management.availability_search import find_flexible_stays
+
+
+class TestAvailabilitySearch(unittest.TestCase):
+    def test_find_flexible_stays(self):
+        busy = np.array([
+            [0, 0, 1, 0, 0],
+            [0, 1, 0, 0, 0],
+        ], dtype=bool)
+        price = np.array([
+            [100, 100, 100, 100, 100],
+            [80, 80, 80, 120, 120],
+        ], dtype=float)
+
+        results = find_flexible_stays(busy, price, 2, 3)
+
+        # 2 nights: d0 only unit 0; d2 only unit 1; d3 both (unit 0 cheaper)
+        self.assertIn((0, 2, 1, 200.0), results)
+        self.assertIn((2, 2, 1, 200.0), results)
+        self.assertIn((3, 2, 2, 200.0), results)
+        self.assertNotIn(1, [offset for offset, nights, _n, _t in results if nights == 2])
+        # 3 nights: only unit 1 from d2
+        self.assertEqual([r for r in results if r[1] == 3], [(2, 3, 1, 320.0)])
+
+    def test_matches_brute_force(self):
+        rng = np.random.default_rng(3)
+        busy = rng.random((20, 40)) < 0.3
+        price = rng.integers(50, 150, size=(20, 40)).astype(float)
+
+        expected = []
+        for nights in range(1, 6):
+            for offset in range(40 - nights + 1):
+                free = [u for u in range(20) if not busy[u, offset:offset + nights].any()]
+                if free:
+                    expected.append((offset, nights, len(free),
+                        float(min(price[u, offset:offset + nights].sum() for u in free))))
+
+        self.assertEqual(find_flexible_stays(busy, price, 1, 5), sorted(expected))
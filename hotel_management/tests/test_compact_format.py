@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import frappe
+import numpy as np
+
+from hotel_management.hotel_management.compact_format import encode_row_runs, encode_runs, encode_table
+from hotel_management.hotel_management.doctype.property_unit.property_unit import build_occupancy_matrix
+
+
+class TestCompactFormat(unittest.TestCase):
+    def test_encode_table(self):
+        """Dictionary columns hold indexes, other columns keep their values"""
+        payload = encode_table([
+            {"id": "R1", "unit": "A-101", "status": "Confirmed"},
+            {"id": "R2", "unit": "A-102", "status": "Confirmed"},
+            {"id": "R3", "unit": "A-101", "status": "Checked-In"},
+        ], ["id", "unit", "status"], dict_columns=("unit", "status"))
+
+        self.assertEqual(payload["dicts"]["unit"], ["A-101", "A-102"])
+        self.assertEqual(payload["dicts"]["status"], ["Confirmed", "Checked-In"])
+        self.assertEqual(payload["rows"], [["R1", 0, 0], ["R2", 1, 0], ["R3", 0, 1]])
+
+    def test_encode_runs(self):
+        self.assertEqual(encode_runs([-1, -1, 0, 0, 0, -1, 1]), [[-1, 2], [0, 3], [-1, 1], [1, 1]])
+        self.assertEqual(encode_runs([]), [])
+
+    def test_encode_row_runs(self):
+        matrix = np.array([[-1, -1, 0, 0], [1, 1, 1, 1]])
+        self.assertEqual(encode_row_runs(matrix), [[[-1, 2], [0, 2]], [[1, 4]]])
+        self.assertEqual(encode_row_runs(np.zeros((2, 0))), [[], []])
+
+    def test_build_occupancy_matrix(self):
+        """Stays are clipped to the window, the checkout day stays free, empty units keep a row"""
+        def row(unit, reservation=None, start=None, end=None):
+            return frappe._dict(unit=unit, unit_id=unit, unit_type="Std", floor="1", unit_status="Available",
+                reservation=reservation, primary_guest=None, status="Confirmed", rate_per_night=100,
+                start_idx=start, end_idx=end)
+
+        units, reservations, matrix = build_occupancy_matrix([
+            row("A-101", "R1", -2, 2),
+            row("A-101", "R2", 3, 9),
+            row("A-102"),
+            row("A-103", "R1", 1, 3),
+        ], 5)
+
+        self.assertEqual([u["name"] for u in units], ["A-101", "A-102", "A-103"])
+        self.assertEqual([r["name"] for r in reservations], ["R1", "R2"])
+        self.assertEqual(matrix.tolist(), [
+            [0, 0, -1, 1, 1],
+            [-1, -1, -1, -1, -1],
+            [-1, 0, 0, -1, -1],
+        ])
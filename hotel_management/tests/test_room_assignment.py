@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import frappe
+import numpy as np
+
+from hotel_management.hotel_management.room_assignment import count_orphan_nights, plan_unit_type
+
+
+def stay(row, unit, start, end, assignment="Fixed"):
+    return frappe._dict(row=row, unit=unit, start=start, end=end, assignment=assignment)
+
+
+class TestRoomAssignment(unittest.TestCase):
+    def test_count_orphan_nights(self):
+        grid = np.array([
+            [1, 0, 1, 1, 0, 0, 1],  # one orphan night, then a two-night gap
+            [0, 1, 1, 0, 1, 0, 0],  # open edges are not orphans
+        ], dtype=bool)
+        self.assertEqual(count_orphan_nights(grid), 2)
+        self.assertEqual(count_orphan_nights(grid, max_nights=2), 4)
+
+    def test_closes_orphan_night(self):
+        # U1: stays on nights 0-1 and 3-4 leave night 2 free between them;
+        # the Type Only stay on U2 for night 2 belongs there
+        stays = [
+            stay("R1", "U1", 0, 2),
+            stay("R2", "U1", 3, 5),
+            stay("R3", "U2", 2, 3, "Type Only"),
+            stay("R4", "U2", 4, 6),
+        ]
+        moves, before, after = plan_unit_type(["U1", "U2"], stays, 10)
+
+        self.assertEqual([(s.row, unit) for s, unit in moves], [("R3", "U1")])
+        self.assertEqual((before, after), (2, 0))
+
+    def test_closed_unit_takes_no_moves(self):
+        stays = [
+            stay("R1", "U1", 0, 2),
+            stay("R2", "U1", 3, 5),
+            stay("R3", "U2", 2, 3, "Type Only"),
+            stay("R4", "U2", 4, 6),
+        ]
+        moves, before, after = plan_unit_type(["U1", "U2"], stays, 10, closed={"U1"})
+        self.assertEqual(moves, [])
+        self.assertEqual(before, after)
+
+    def test_keeps_layout_without_gain(self):
+        stays = [stay("R1", "U1", 0, 3, "Movable"), stay("R2", "U2", 5, 8, "Movable")]
+        moves, before, after = plan_unit_type(["U1", "U2"], stays, 10)
+        self.assertEqual(moves, [])
+        self.assertEqual(before, after)
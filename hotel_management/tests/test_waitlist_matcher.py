@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import random
+import unittest
+from datetime import date, timedelta
+
+import frappe
+
+from hotel_management.hotel_management.waitlist_matcher import WaitlistIndex, assign_offers
+
+
+def entry(name, check_in, nights, priority="Normal", creation=None):
+    start = date(2026, 1, 1) + timedelta(days=check_in)
+    return frappe._dict(name=name, check_in=start, check_out=start + timedelta(days=nights),
+        priority=priority, creation=creation or name)
+
+
+def ordinal(day):
+    return (date(2026, 1, 1) + timedelta(days=day)).toordinal()
+
+
+class TestWaitlistMatcher(unittest.TestCase):
+    def test_containing_matches_brute_force(self):
+        rng = random.Random(7)
+        entries = [entry("W%03d" % i, rng.randrange(60), rng.randrange(1, 10)) for i in range(300)]
+        index = WaitlistIndex(entries)
+
+        for _ in range(200):
+            start = rng.randrange(70)
+            end = start + rng.randrange(1, 20)
+            expected = {
+                e.name for e in entries
+                if ordinal(start) <= e.check_in.toordinal() and e.check_out.toordinal() <= ordinal(end)
+            }
+            found = {e.name for e in index.containing(ordinal(start), ordinal(end))}
+            self.assertEqual(found, expected)
+
+    def test_empty_index(self):
+        self.assertEqual(WaitlistIndex([]).containing(ordinal(0), ordinal(5)), [])
+
+    def test_assign_offers_by_priority_and_fit(self):
+        entries = [
+            entry("W1", 2, 3, "Normal", "1"),
+            entry("W2", 2, 3, "VIP", "2"),
+            entry("W3", 5, 2, "Low", "3"),
+        ]
+        # U1 is free for exactly nights 2-4, U2 for nights 0-9
+        gaps = {"U1": [(ordinal(2), ordinal(5))], "U2": [(ordinal(0), ordinal(10))]}
+        offers = {e.name: unit for e, unit in assign_offers(WaitlistIndex(entries), gaps)}
+
+        # VIP takes the tight gap, the next request falls back to U2,
+        # and the remainder of U2 still fits W3
+        self.assertEqual(offers, {"W2": "U1", "W1": "U2", "W3": "U2"})